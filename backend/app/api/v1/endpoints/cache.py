@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from app.services import media_downloader
+from app.services.result_cache import get_result_cache
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/stats")
+def get_cache_stats():
+    """
+    단계별(separation / transcription / translation) 결과 캐시 hit, miss, 절약된 bytes 와
+    URL 다운로드 캐시 통계(downloads)를 반환합니다.
+    (동기 Redis 클라이언트를 사용하므로 def 로 선언하여 스레드 풀에서 실행)
+    """
+    downloads = media_downloader.stats() if settings.DOWNLOAD_CACHE_ENABLED else None
+    if not settings.RESULT_CACHE_ENABLED:
+        return {"enabled": False, "downloads": downloads}
+    return {"enabled": True, **get_result_cache().stats(), "downloads": downloads}
@@ -1,20 +1,48 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from app.schemas.job import JobCreate, JobStatus
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from app.schemas.job import JobCreate, JobStatus, UploadCreate, UploadStatus
+from app.services import uploads
 from app.worker.tasks import create_karaoke_job
-from app.core.redis import get_redis_client
+from app.core import job_store
+from app.core.progress_hub import progress_hub
+from app.core.redis import get_async_redis
 from app.core.config import settings
 from datetime import datetime
 from pathlib import Path
-import uuid
+from typing import Optional
+import asyncio
 import json
+import logging
+import uuid
 import os
 import shutil
 
+logger = logging.getLogger(__name__)
+
 # 프로젝트 기준 리소스 경로 (backend/resource/)
 RESOURCE_DIR = Path(__file__).parent.parent.parent.parent.parent / "resource"
 
 router = APIRouter()
-redis_client = get_redis_client()
+
+
+def _save_upload(src, file_path: str) -> None:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(src, buffer, length=1024 * 1024)
 
 
 @router.post("/upload")
@@ -24,21 +52,97 @@ async def upload_file(file: UploadFile = File(...)):
     Returns the server-side file path to be used in create_job.
     """
     try:
-        os.makedirs(settings.TEMP_DIR, exist_ok=True)
-        file_path = os.path.join(settings.TEMP_DIR, file.filename)
-
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 같은 이름의 업로드가 서로 덮어쓰지 않도록 업로드마다 디렉터리를 분리
+        name = os.path.basename((file.filename or "").replace("\\", "/")) or "upload"
+        file_path = os.path.join(uploads.upload_dir(), uuid.uuid4().hex, name)
+        # 디스크 쓰기는 스레드 풀에서 실행하여 이벤트 루프를 막지 않음
+        await run_in_threadpool(_save_upload, file.file, file_path)
 
         return {"filename": file.filename, "file_path": file_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
 
+def _upload_status(session: dict) -> dict:
+    return {
+        "uploadId": session["id"],
+        "filename": session["filename"],
+        "size": session["size"],
+        "offset": session["offset"],
+        "status": session["status"],
+        "chunkSize": settings.UPLOAD_CHUNK_SIZE,
+        "sha256": session.get("sha256"),
+        "filePath": session.get("file_path"),
+    }
+
+
+@router.post("/uploads", response_model=UploadStatus, status_code=201)
+async def create_upload(upload: UploadCreate, redis=Depends(get_async_redis)):
+    """
+    재개 가능한 청크 업로드 세션을 생성합니다.
+    이후 PATCH /uploads/{upload_id} 로 Upload-Offset 헤더와 함께 바이트를 이어 보냅니다.
+    """
+    try:
+        session = await uploads.create_upload(redis, upload.filename, upload.size)
+    except uploads.UploadConflict as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return _upload_status(session)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatus)
+async def get_upload(upload_id: str, redis=Depends(get_async_redis)):
+    """
+    업로드 진행 상황. 중단된 업로드는 offset 부터 다시 보내면 됩니다.
+    """
+    session = await uploads.get_upload(redis, upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return _upload_status(session)
+
+
+@router.patch("/uploads/{upload_id}", response_model=UploadStatus)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    redis=Depends(get_async_redis),
+):
+    """
+    요청 본문(raw bytes)을 Upload-Offset 위치부터 이어 씁니다.
+    본문은 스트리밍으로 받아 최종 파일에 바로 기록하고, 해시도 도착하는 대로 갱신합니다.
+    오프셋이 맞지 않으면 409 와 함께 서버의 현재 오프셋(Upload-Offset 헤더)을 반환합니다.
+    """
+    try:
+        session = await uploads.append_chunk(redis, upload_id, upload_offset, request.stream())
+    except uploads.UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except uploads.UploadConflict as e:
+        raise HTTPException(
+            status_code=409, detail=str(e), headers={"Upload-Offset": str(e.offset)}
+        )
+    except ClientDisconnect:
+        # 받은 바이트까지는 기록됨 → 클라이언트는 GET 으로 오프셋을 확인하고 재개
+        return Response(status_code=400)
+    return _upload_status(session)
+
+
 @router.post("", response_model=JobStatus)
-async def create_job(job: JobCreate):
+async def create_job(job: JobCreate, redis=Depends(get_async_redis)):
     job_id = str(uuid.uuid4())
 
+    # Determine file path (mock, url or chunked upload)
+    file_path = job.mediaUrl if job.mediaUrl else ""
+    use_mock = job.useMockData
+    source_hash = None
+    source_ref = None
+    if job.uploadId:
+        upload = await uploads.get_upload(redis, job.uploadId)
+        if not upload or upload["status"] != "complete":
+            raise HTTPException(status_code=409, detail="Upload is not complete")
+        file_path = upload["file_path"]
+        source_hash = upload["sha256"]
+        source_ref = upload.get("ref")
+
     # Initial job data
     job_data = {
         "id": job_id,
@@ -51,56 +155,148 @@ async def create_job(job: JobCreate):
         "createdAt": datetime.now().isoformat(),
     }
 
-    # Store in Redis
-    redis_client.set(f"job:{job_id}", json.dumps(job_data))
-
-    # Determine file path (mock or url)
-    file_path = job.mediaUrl if job.mediaUrl else ""
-    use_mock = job.useMockData
+    # Store in Redis (HASH)
+    await job_store.create_job_async(redis, job_data)
 
     # 파일이 없으면 기본 리소스 파일 사용 (개발/테스트용)
     if not file_path:
         default_resource = RESOURCE_DIR / "odoriko.m4a"
         if default_resource.exists():
-            # 임시 디렉토리에 복사하여 업로드 시뮬레이션
-            os.makedirs(settings.TEMP_DIR, exist_ok=True)
-            filename = default_resource.name
-            target_path = os.path.join(settings.TEMP_DIR, filename)
-            shutil.copy(default_resource, target_path)
-            file_path = target_path
-            print(f"Using default resource: {file_path}")
+            # 리소스 파일을 그대로 전달 (fetch_media 가 산출물 저장소에 링크/복사, TEMP_DIR 사본 없음)
+            file_path = str(default_resource)
+            logger.info("Using default resource: %s", file_path)
 
             # 실제 파일이 있으므로 실제 처리 모드로 전환
             use_mock = False
         else:
-            print(f"Default resource not found: {default_resource}")
+            logger.warning("Default resource not found: %s", default_resource)
 
     # Force mock data only if we still don't have a file
     if not file_path:
         use_mock = True
 
-    # Start Worker
-    create_karaoke_job(job_id, file_path, use_mock=use_mock)
+    # Start Worker (브로커 전송은 동기 I/O 이므로 스레드 풀에서 실행)
+    await run_in_threadpool(
+        create_karaoke_job,
+        job_id,
+        file_path,
+        use_mock=use_mock,
+        target_languages=job.targetLanguages,
+        source_hash=source_hash,
+        source_ref=source_ref,
+    )
 
     return job_data
 
 
 @router.get("/{job_id}", response_model=JobStatus)
-async def get_job(job_id: str):
-    job_data = redis_client.get(f"job:{job_id}")
+async def get_job(job_id: str, redis=Depends(get_async_redis)):
+    job_data = await job_store.get_job_async(redis, job_id)
     if not job_data:
         raise HTTPException(status_code=404, detail="Job not found")
-    return json.loads(job_data)
+    return job_data
+
+
+async def _progress_events(job_id: str, queue: asyncio.Queue, snapshot: dict):
+    """
+    현재 상태 스냅샷을 먼저 보내고, 이후 진행 이벤트를 순서대로 내보냅니다.
+    이벤트가 없으면 PROGRESS_KEEPALIVE_SECONDS 마다 None (keep-alive) 을 내보내고,
+    작업이 끝나면 (COMPLETED / FAILED) 종료합니다.
+    """
+    event = job_store.progress_event(job_id, snapshot)
+    yield event
+    while event.get("status") not in job_store.TERMINAL_STATUSES:
+        try:
+            event = await asyncio.wait_for(
+                queue.get(), timeout=settings.PROGRESS_KEEPALIVE_SECONDS
+            )
+        except asyncio.TimeoutError:
+            yield None
+            continue
+        yield event
+
+
+async def _subscribe(redis, job_id: str):
+    # 구독을 먼저 등록한 뒤 스냅샷을 읽어야 그 사이의 이벤트를 놓치지 않음
+    queue = await progress_hub.subscribe(job_id)
+    snapshot = await job_store.get_job_async(redis, job_id)
+    if not snapshot:
+        progress_hub.unsubscribe(job_id, queue)
+    return queue, snapshot
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, redis=Depends(get_async_redis)):
+    """
+    Server-Sent Events 로 작업 진행 상황(status, progress, detail)을 실시간 전송합니다.
+    """
+    queue, snapshot = await _subscribe(redis, job_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        try:
+            async for event in _progress_events(job_id, queue, snapshot):
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            # 클라이언트 연결이 끊기면 StreamingResponse 가 제너레이터를 취소함
+            progress_hub.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{job_id}/ws")
+async def job_progress_ws(
+    websocket: WebSocket, job_id: str, redis=Depends(get_async_redis)
+):
+    """
+    WebSocket 으로 작업 진행 상황을 실시간 전송합니다 (SSE 와 같은 이벤트 형식).
+    """
+    await websocket.accept()
+    queue, snapshot = await _subscribe(redis, job_id)
+    if not snapshot:
+        await websocket.close(code=4404, reason="Job not found")
+        return
+
+    try:
+        async for event in _progress_events(job_id, queue, snapshot):
+            await websocket.send_json(event if event is not None else {"type": "keep-alive"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        progress_hub.unsubscribe(job_id, queue)
 
 
 @router.get("", response_model=list[JobStatus])
-async def list_jobs():
-    keys = redis_client.keys("job:*")
-    jobs = []
-    for key in keys:
-        data = redis_client.get(key)
-        if data:
-            jobs.append(json.loads(data))
-    # Sort by createdAt desc
-    jobs.sort(key=lambda x: x.get("createdAt", 0), reverse=True)
+async def list_jobs(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    redis=Depends(get_async_redis),
+):
+    """
+    최신 작업부터 limit 개를 반환합니다 (createdAt 내림차순).
+    다음 페이지가 있으면 X-Next-Cursor 헤더 값을 cursor 로 넘겨 이어서 조회합니다.
+    """
+    try:
+        job_store.parse_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    jobs, next_cursor = await job_store.list_jobs_async(
+        redis,
+        limit=limit,
+        cursor=cursor,
+        status=status.upper() if status else None,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return jobs
@@ -11,6 +11,10 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 100  # API 프로세스당 asyncio 커넥션 풀 크기
+    REDIS_POOL_TIMEOUT: float = 5  # 풀이 가득 찼을 때 커넥션 대기 시간 (초)
+    # 작업 상태 보존 기간 (초). 지나면 작업 HASH 만료 + 목록 인덱스에서 제거, 0 이면 만료 없음
+    JOB_RETENTION_SECONDS: int = 30 * 24 * 3600
 
     # Supabase
     SUPABASE_URL: Optional[str] = None
@@ -23,9 +27,24 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: Optional[str] = None
     R2_BUCKET_NAME: str = "karaoke-assets"
     R2_PUBLIC_URL: Optional[str] = None  # e.g., https://pub-xxx.r2.dev
+    # S3 호환 스토리지 전송 설정
+    S3_ENDPOINT_URL: Optional[str] = None  # MinIO / moto 등 로컬 S3 (없으면 R2 endpoint)
+    S3_REGION: str = "auto"
+    S3_MAX_POOL_CONNECTIONS: int = 32
+    S3_MULTIPART_THRESHOLD: int = 16 * 1024**2
+    S3_MULTIPART_CHUNKSIZE: int = 16 * 1024**2  # 최소 5MB
+    S3_MAX_CONCURRENCY: int = 8  # 동시에 전송하는 파트 수
+    # 렌더링 중 fragmented MP4 를 스트리밍 업로드 (인코딩과 업로드를 겹침)
+    STORAGE_STREAMING_UPLOAD: bool = False
 
     # Gemini / LLM
     GEMINI_API_KEY: Optional[str] = None
+    GEMINI_MODEL: str = "gemini-pro"
+    LINGUISTICS_CHUNK_SIZE: int = 20  # 요청 1건당 최대 라인 수
+    LINGUISTICS_CONCURRENCY: int = 4  # 동시 요청 수
+    LINGUISTICS_MAX_RETRIES: int = 3
+    LINGUISTICS_RETRY_BASE_DELAY: float = 1.0  # 초, 지수 백오프 기준값
+    LINGUISTICS_LINE_CACHE_TTL: int = 90 * 24 * 3600  # 라인 번역 캐시 유지 기간 (초)
 
     # OpenAI (임베딩 생성용)
     OPENAI_API_KEY: Optional[str] = None
@@ -34,11 +53,106 @@ class Settings(BaseSettings):
     # Paths
     TEMP_DIR: str = "/tmp/karaoke-gen"
 
+    # 청크 업로드 (재개 가능)
+    UPLOAD_DIR: Optional[str] = None  # 기본값: {TEMP_DIR}/uploads
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024**2  # 클라이언트 권장 청크 크기
+    UPLOAD_MAX_BYTES: int = 2 * 1024**3
+    UPLOAD_SESSION_TTL: int = 24 * 3600  # 미완료 업로드 세션 유지 기간 (초)
+    UPLOAD_LOCK_TTL: int = 60  # 청크 쓰기 락 (쓰는 동안 갱신, 프로세스가 죽으면 이 시간 후 재개 가능)
+
+    # 작업 산출물 저장소 (Celery 단계 간에 ref 로 전달, app/services/artifacts.py)
+    ARTIFACT_BACKEND: str = "local"  # local | s3
+    ARTIFACT_DIR: Optional[str] = None  # local 백엔드, 기본값: {TEMP_DIR}/artifacts
+    ARTIFACT_S3_PREFIX: str = "artifacts/"  # s3 백엔드 (R2_BUCKET_NAME 안의 경로)
+    ARTIFACT_CACHE_DIR: Optional[str] = None  # s3 백엔드 노드 로컬 사본, 기본값: {TEMP_DIR}/artifact-cache
+    ARTIFACT_TTL: int = 24 * 3600  # 작업 종료 후 산출물 유지 기간 (초)
+    ARTIFACT_MAX_BYTES: int = 50 * 1024**3  # 넘으면 종료된 작업 산출물부터 TTL 전에 정리
+    ARTIFACT_GC_INTERVAL: int = 600  # collect_artifacts 실행 간격 (초, celery beat)
+    ARTIFACT_GC_GRACE: int = 3600  # 참조가 없어진 blob 도 이 시간 안에 접근됐으면 유지
+
+    # URL 다운로드 캐시 (추출기 영상 id 기준, app/services/media_downloader.py)
+    DOWNLOAD_CACHE_ENABLED: bool = True
+    DOWNLOAD_CACHE_TTL: int = 7 * 24 * 3600  # 마지막 사용 후 다운로드 원본 유지 기간 (초)
+    DOWNLOAD_LOCK_TIMEOUT: int = 900  # 같은 URL 동시 요청이 진행 중인 다운로드를 기다리는 최대 시간 (초)
+
+    # Worker 큐 라우팅
+    # GPU 워커가 배치된 단계 (콤마 구분, 예: "separation,transcription") → "<queue>-gpu" 큐로 라우팅
+    GPU_QUEUES: str = ""
+    # 작업 최대 실행 시간 (초, 넘으면 강제 종료). Redis 브로커의 visibility_timeout 은 이보다 길게 잡아
+    # 실행 중인 acks_late 작업이 다른 워커로 재전달되지 않도록 함 (app/worker/celery_app.py)
+    TASK_TIME_LIMIT: int = 3 * 3600
+    # threads 풀 워커의 메모리 예산 (MB, 0 = 제한 없음). 넘으면 실행 중인 작업을 마치고 종료 → 재시작
+    # (prefork 워커는 --max-memory-per-child 사용, app/worker/topology.py)
+    WORKER_MAX_MEMORY_MB: int = 0
+
+    # Worker 모델 상주 설정
+    # 워커 프로세스 시작 시 미리 로드할 모델 (콤마 구분, 예: "whisper")
+    WORKER_PRELOAD_MODELS: str = ""
+
+    # WhisperX
+    WHISPER_MODEL: str = "large-v2"
+    WHISPER_BATCH_SIZE: int = 16
+    ALIGN_MODEL_CACHE_SIZE: int = 3  # 언어별 정렬 모델 LRU 최대 개수
+    WHISPER_PRELOAD_ALIGN_LANGUAGES: str = ""  # 예: "ja,en,ko"
+    # 여러 작업의 VAD 청크를 모아 배치 전사 (배치 크기는 WHISPER_BATCH_SIZE)
+    TRANSCRIPTION_BATCHING: bool = True
+    TRANSCRIPTION_BATCH_MAX_WAIT_MS: int = 200
+
+    # VAD (vocals stem 의 무음 구간은 전사 생략)
+    VAD_ENABLED: bool = True
+    VAD_FRAME_MS: float = 30
+    VAD_HOP_MS: float = 10
+    VAD_THRESHOLD_DB: float = -50  # 절대 임계값 (dBFS)
+    VAD_RELATIVE_DB: float = 35  # 상위 5% 에너지 대비 동적 범위
+    VAD_MIN_SPEECH_SECONDS: float = 0.25
+    VAD_MIN_SILENCE_SECONDS: float = 1.5  # 이보다 짧은 무음은 하나의 구간으로 병합
+    VAD_PAD_SECONDS: float = 0.3
+    # 30초를 넘는 음성 구간은 한계 직전 이 범위에서 에너지가 가장 낮은 지점(숨/단어 사이)에서 나눔
+    VAD_SPLIT_SEARCH_SECONDS: float = 5
+
+    # 렌더링 (preview / standard / archive, app/services/render_profiles.py)
+    RENDER_PROFILE: str = "standard"
+    # 고화질 렌더 전에 저해상도 미리보기를 먼저 게시
+    RENDER_PREVIEW_ENABLED: bool = True
+    # 단색 배경일 때 자막이 바뀌는 프레임만 렌더링 (VFR 출력)
+    RENDER_STATIC_FAST_PATH: bool = True
+    # 변화 프레임이 이보다 많으면 fast path 대신 모든 프레임을 렌더링
+    RENDER_STATIC_FAST_PATH_MAX_FRAMES: int = 20000
+    # 영상과 함께 업로드할 사이드카 자막 포맷 (쉼표 구분, ass/srt/vtt/lrc, 빈 값 = 끄기)
+    SUBTITLE_EXPORT_FORMATS: str = "srt,vtt,lrc"
+
+    # Demucs (음원 분리)
+    DEMUCS_MODEL: str = "htdemucs"
+    DEMUCS_SEGMENT: Optional[float] = None  # 초 단위, None 이면 모델 기본값
+    DEMUCS_OVERLAP: float = 0.25
+    DEMUCS_SHIFTS: int = 1
+    DEMUCS_THREADS: int = 0  # CPU 추론 스레드 수, 0 이면 torch 기본값
+    # 중간 stem 포맷 (auto, flac, npy, wav, mp3), auto: ARTIFACT_BACKEND=s3 → flac, local → npy (mmap)
+    DEMUCS_OUTPUT_FORMAT: str = "auto"
+    # 긴 트랙 청크 병렬 분리
+    DEMUCS_CHUNK_THRESHOLD_SECONDS: float = 600  # 이 길이를 넘으면 청크 모드
+    DEMUCS_CHUNK_SECONDS: float = 120
+    DEMUCS_CHUNK_OVERLAP_SECONDS: float = 5
+    DEMUCS_CHUNK_WORKERS: int = 2
+
+    # 결과 캐시 (분리/전사/번역 결과 재사용)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_DIR: Optional[str] = None  # 기본값: {TEMP_DIR}/cache
+    RESULT_CACHE_MAX_BYTES: int = 20 * 1024**3  # 20GB
+
+    # 진행 상황 스트리밍 (SSE / WebSocket)
+    PROGRESS_KEEPALIVE_SECONDS: float = 15  # 이벤트가 없을 때 keep-alive 전송 간격
+    PROGRESS_QUEUE_SIZE: int = 32  # 연결별 대기 이벤트 수 (넘치면 오래된 이벤트부터 버림)
+
     def model_post_init(self, __context):
         if not self.REDIS_URL:
             self.REDIS_URL = (
                 f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
             )
+        if not 0 <= self.DEMUCS_CHUNK_OVERLAP_SECONDS < self.DEMUCS_CHUNK_SECONDS:
+            raise ValueError(
+                "DEMUCS_CHUNK_SECONDS must be greater than DEMUCS_CHUNK_OVERLAP_SECONDS (>= 0)"
+            )
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,342 @@
+"""
+Redis 작업 상태 저장소
+
+작업 상태는 JSON 문자열이 아닌 Redis HASH (job:{id}) 로 저장합니다.
+- 진행률 갱신은 변경된 필드만 HSET 하므로 GET → 병합 → SET 왕복과 동시 쓰기 경합이 없습니다.
+- HSET 과 진행 이벤트 PUBLISH (job:{id}:events) 는 Lua 스크립트로 원자적으로 실행됩니다.
+- 큰 값(result 등)은 필드 단위 JSON 으로 저장되어, 다른 필드 갱신 시 재직렬화되지 않습니다.
+
+목록 조회용 인덱스 (KEYS 스캔 대신):
+- jobs:index              ZSET job_id -> createdAt (epoch 초)
+- jobs:status:{status}    ZSET job_id -> createdAt (상태 필터용 보조 인덱스)
+상태가 바뀌면 update 스크립트가 보조 인덱스를 함께 옮깁니다.
+작업 HASH 는 JOB_RETENTION_SECONDS 후 만료되고, 인덱스의 만료된 항목은 조회 시 정리됩니다.
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+
+JOB_KEY = "job:{job_id}"
+JOB_CHANNEL = "job:{job_id}:events"
+JOBS_INDEX = "jobs:index"
+JOBS_STATUS_INDEX = "jobs:status:{status}"
+
+# 필드별 직렬화 규칙 (나머지는 문자열 그대로)
+JSON_FIELDS = {"result"}
+INT_FIELDS = {"progress"}
+FLOAT_FIELDS = {"updated_at"}
+
+STATUSES = ("PENDING", "PROCESSING", "COMPLETED", "FAILED")
+# 더 이상 진행 이벤트가 발생하지 않는 상태
+TERMINAL_STATUSES = {"COMPLETED", "FAILED"}
+
+# KEYS[1] = job hash, KEYS[2] = jobs:index
+# ARGV[1] = channel, ARGV[2] = event payload, ARGV[3] = job id, ARGV[4] = status index prefix,
+# ARGV[5] = retention seconds (0 = 만료 없음), ARGV[6..] = field/value pairs
+_UPDATE_SCRIPT = """
+local old = redis.call('HGET', KEYS[1], 'status')
+redis.call('HSET', KEYS[1], unpack(ARGV, 6))
+local new = redis.call('HGET', KEYS[1], 'status')
+if new and old ~= new then
+    local score = redis.call('ZSCORE', KEYS[2], ARGV[3])
+    if old then redis.call('ZREM', ARGV[4] .. old, ARGV[3]) end
+    if score then redis.call('ZADD', ARGV[4] .. new, score, ARGV[3]) end
+end
+if tonumber(ARGV[5]) > 0 and redis.call('TTL', KEYS[1]) == -1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+end
+redis.call('PUBLISH', ARGV[1], ARGV[2])
+return 1
+"""
+
+
+def job_key(job_id: str) -> str:
+    return JOB_KEY.format(job_id=job_id)
+
+
+def job_channel(job_id: str) -> str:
+    return JOB_CHANNEL.format(job_id=job_id)
+
+
+def status_index(status: str) -> str:
+    return JOBS_STATUS_INDEX.format(status=status)
+
+
+def encode_fields(fields: dict) -> dict:
+    """
+    Python 값을 HASH 필드 문자열로 변환합니다 (None 값은 제외).
+    """
+    encoded = {}
+    for name, value in fields.items():
+        if value is None:
+            continue
+        if name in JSON_FIELDS:
+            encoded[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            encoded[name] = str(value)
+    return encoded
+
+
+def decode_fields(raw: dict) -> dict:
+    decoded = {}
+    for name, value in raw.items():
+        if name in JSON_FIELDS:
+            decoded[name] = json.loads(value)
+        elif name in INT_FIELDS:
+            decoded[name] = int(float(value))
+        elif name in FLOAT_FIELDS:
+            decoded[name] = float(value)
+        else:
+            decoded[name] = value
+    return decoded
+
+
+def create_job(redis_client, job_data: dict) -> None:
+    pipe = redis_client.pipeline()
+    _queue_create(pipe, job_data)
+    pipe.execute()
+
+
+def update_job(redis_client, job_id: str, fields: dict) -> None:
+    """
+    변경된 필드만 원자적으로 HSET 하고, 같은 내용을 진행 이벤트로 PUBLISH 합니다.
+    """
+    encoded = encode_fields({"id": job_id, **fields})
+    event = progress_event(job_id, fields)
+
+    args = [
+        job_channel(job_id),
+        json.dumps(event, ensure_ascii=False),
+        job_id,
+        status_index(""),
+        max(settings.JOB_RETENTION_SECONDS, 0),
+    ]
+    for name, value in encoded.items():
+        args += [name, value]
+    # register_script 는 EVALSHA 를 사용하고, 스크립트가 없을 때만 본문을 전송
+    redis_client.register_script(_UPDATE_SCRIPT)(
+        keys=[job_key(job_id), JOBS_INDEX], args=args
+    )
+
+
+def progress_event(job_id: str, fields: dict) -> dict:
+    """
+    진행 이벤트 payload. 큰 result 는 제외하고 진행 정보만 실어 구독자 부하를 줄입니다.
+    """
+    event = {k: v for k, v in fields.items() if v is not None and k not in JSON_FIELDS}
+    event["id"] = job_id
+    if fields.get("result") is not None:
+        event["has_result"] = True
+    return event
+
+
+def get_job(redis_client, job_id: str) -> Optional[dict]:
+    key = job_key(job_id)
+    try:
+        raw = redis_client.hgetall(key)
+    except Exception:
+        raw = None
+    if raw:
+        return decode_fields(raw)
+
+    # 이전 형식 (JSON 문자열) 으로 저장된 작업 호환
+    legacy = redis_client.get(key) if raw is None else None
+    return json.loads(legacy) if legacy else None
+
+
+def list_jobs(
+    redis_client, limit: int = 50, cursor: str = None, status: str = None
+) -> tuple:
+    """
+    createdAt 내림차순으로 작업을 조회합니다 (커서 기반 페이지네이션).
+    cursor 는 이전 페이지 마지막 작업의 "createdAt 점수:job_id" 이며, 다음 페이지가 없으면 None 을 반환합니다.
+    같은 createdAt 의 작업은 job_id 역순으로 이어지므로 페이지 경계에서 빠지거나 중복되지 않습니다.
+    Returns (jobs, next_cursor)
+    """
+    index = status_index(status) if status else JOBS_INDEX
+    if settings.JOB_RETENTION_SECONDS > 0:
+        redis_client.zremrangebyscore(index, "-inf", _retention_cutoff())
+
+    pipe = redis_client.pipeline(transaction=False)
+    _queue_page(pipe, index, cursor, limit)
+    entries = _page_entries(pipe.execute(), cursor, limit)
+    if not entries:
+        return [], None
+
+    # 작업 HASH 는 파이프라인 한 번으로 일괄 조회
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id, _ in entries:
+        pipe.hgetall(job_key(job_id))
+    jobs, expired, next_cursor = _collect_page(entries, pipe.execute(), limit)
+
+    if expired:
+        pipe = redis_client.pipeline()
+        _queue_remove_from_indexes(pipe, expired)
+        pipe.execute()
+    return jobs, next_cursor
+
+
+def rebuild_index(redis_client) -> int:
+    """
+    인덱스가 없는 기존 작업(이전 JSON 문자열 형식 포함)을 SCAN 으로 찾아 인덱스를 만듭니다.
+    JSON 문자열 형식의 작업은 HASH 형식으로 변환합니다. Returns 색인된 작업 수
+    """
+    count = 0
+    for key in redis_client.scan_iter(match=job_key("*"), count=500):
+        key_type = redis_client.type(key)
+        if key_type == "string":
+            job_data = json.loads(redis_client.get(key))
+            redis_client.delete(key)
+            create_job(redis_client, job_data)
+        elif key_type == "hash":
+            job_data = decode_fields(redis_client.hgetall(key))
+            job_data.setdefault("id", key.split(":", 1)[1])
+            score = _created_score(job_data)
+            pipe = redis_client.pipeline()
+            pipe.zadd(JOBS_INDEX, {job_data["id"]: score})
+            if job_data.get("status"):
+                pipe.zadd(status_index(job_data["status"]), {job_data["id"]: score})
+            pipe.execute()
+        else:
+            continue
+        count += 1
+    return count
+
+
+def _created_score(job_data: dict) -> float:
+    created = job_data.get("createdAt")
+    if isinstance(created, (int, float)):
+        return float(created)
+    try:
+        return datetime.fromisoformat(created).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def _queue_create(pipe, job_data: dict) -> None:
+    job_id = job_data["id"]
+    score = _created_score(job_data)
+    pipe.hset(job_key(job_id), mapping=encode_fields(job_data))
+    if settings.JOB_RETENTION_SECONDS > 0:
+        pipe.expire(job_key(job_id), settings.JOB_RETENTION_SECONDS)
+    pipe.zadd(JOBS_INDEX, {job_id: score})
+    if job_data.get("status"):
+        pipe.zadd(status_index(job_data["status"]), {job_id: score})
+
+
+def _queue_remove_from_indexes(pipe, job_ids: list) -> None:
+    pipe.zrem(JOBS_INDEX, *job_ids)
+    for status in STATUSES:
+        pipe.zrem(status_index(status), *job_ids)
+
+
+def _retention_cutoff() -> str:
+    # 보존 기간이 지난 (HASH 가 만료된) 작업의 인덱스 점수 상한 (exclusive)
+    return f"({time.time() - settings.JOB_RETENTION_SECONDS}"
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """
+    "score:job_id" 커서를 (score, job_id) 로 변환합니다. 형식이 잘못되면 ValueError.
+    """
+    if not cursor:
+        return None
+    score, _, job_id = cursor.partition(":")
+    return float(score), job_id or None
+
+
+def _format_cursor(score: float, job_id: str) -> str:
+    return f"{score!r}:{job_id}"
+
+
+def _queue_page(pipe, index: str, cursor: Optional[str], limit: int) -> None:
+    """
+    커서 다음 페이지 조회 명령을 파이프라인에 추가합니다.
+    커서 점수와 같은 점수의 작업들(동점)과, 그보다 작은 점수의 작업 limit 개를 함께 조회합니다.
+    """
+    parsed = parse_cursor(cursor)
+    if parsed is None:
+        pipe.zrevrangebyscore(index, "+inf", "-inf", start=0, num=limit, withscores=True)
+        return
+    score = repr(parsed[0])
+    pipe.zrevrangebyscore(index, score, score, withscores=True)
+    pipe.zrevrangebyscore(index, f"({score}", "-inf", start=0, num=limit, withscores=True)
+
+
+def _page_entries(results: list, cursor: Optional[str], limit: int) -> list:
+    parsed = parse_cursor(cursor)
+    if parsed is None:
+        return results[0]
+    # ZREVRANGEBYSCORE 는 동점을 member 역순으로 반환하므로, 커서 job_id 보다 작은 것만 남은 항목
+    _, last_id = parsed
+    ties = [(job_id, score) for job_id, score in results[0] if last_id and job_id < last_id]
+    return (ties + results[1])[:limit]
+
+
+def _collect_page(entries: list, raws: list, limit: int) -> tuple:
+    """
+    Returns (jobs, expired_job_ids, next_cursor)
+    """
+    jobs = []
+    expired = []
+    for (job_id, _), raw in zip(entries, raws):
+        if raw:
+            jobs.append(decode_fields(raw))
+        else:
+            expired.append(job_id)
+    next_cursor = _format_cursor(entries[-1][1], entries[-1][0]) if len(entries) == limit else None
+    return jobs, expired, next_cursor
+
+
+# ===== asyncio 클라이언트 (API 프로세스용, redis.asyncio) =====
+
+
+async def create_job_async(redis_client, job_data: dict) -> None:
+    pipe = redis_client.pipeline()
+    _queue_create(pipe, job_data)
+    await pipe.execute()
+
+
+async def get_job_async(redis_client, job_id: str) -> Optional[dict]:
+    key = job_key(job_id)
+    try:
+        raw = await redis_client.hgetall(key)
+    except Exception:
+        raw = None
+    if raw:
+        return decode_fields(raw)
+
+    legacy = await redis_client.get(key) if raw is None else None
+    return json.loads(legacy) if legacy else None
+
+
+async def list_jobs_async(
+    redis_client, limit: int = 50, cursor: str = None, status: str = None
+) -> tuple:
+    """
+    list_jobs 의 asyncio 버전. Returns (jobs, next_cursor)
+    """
+    index = status_index(status) if status else JOBS_INDEX
+    if settings.JOB_RETENTION_SECONDS > 0:
+        await redis_client.zremrangebyscore(index, "-inf", _retention_cutoff())
+
+    pipe = redis_client.pipeline(transaction=False)
+    _queue_page(pipe, index, cursor, limit)
+    entries = _page_entries(await pipe.execute(), cursor, limit)
+    if not entries:
+        return [], None
+
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id, _ in entries:
+        pipe.hgetall(job_key(job_id))
+    jobs, expired, next_cursor = _collect_page(entries, await pipe.execute(), limit)
+
+    if expired:
+        pipe = redis_client.pipeline()
+        _queue_remove_from_indexes(pipe, expired)
+        await pipe.execute()
+    return jobs, next_cursor
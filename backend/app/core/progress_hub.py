@@ -0,0 +1,114 @@
+"""
+작업 진행 이벤트 허브 (API 프로세스당 1개)
+
+워커는 job_store.update_job 에서 job:{id}:events 채널로 진행 이벤트를 PUBLISH 합니다.
+API 프로세스는 공용 asyncio Redis 풀(core/redis.py)에서 PSUBSCRIBE job:*:events 연결 하나만 유지하고,
+받은 이벤트를 해당 작업을 구독 중인 SSE / WebSocket 연결의 asyncio.Queue 로 나눠줍니다.
+연결 수가 늘어도 Redis 구독/연결 수는 늘지 않으며, 대기 중인 연결은 Queue 하나만 차지합니다.
+"""
+
+import asyncio
+import json
+from typing import Dict, Optional, Set
+
+from app.core import job_store
+from app.core.config import settings
+from app.core.redis import get_async_redis_client
+
+# "job:{job_id}:events" → ("job:", ":events")
+_CHANNEL_PREFIX, _CHANNEL_SUFFIX = job_store.JOB_CHANNEL.split("{job_id}")
+
+
+class ProgressHub:
+    def __init__(self, redis_client=None, queue_size: int = None):
+        self.redis = redis_client
+        self.queue_size = queue_size or settings.PROGRESS_QUEUE_SIZE
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    async def subscribe(self, job_id: str) -> asyncio.Queue:
+        """
+        작업의 진행 이벤트를 받을 Queue 를 등록합니다. 첫 구독 시 Redis 리스너를 시작하고,
+        PSUBSCRIBE 가 완료될 때까지 (최대 5초) 기다려 호출 측 스냅샷 이후의 이벤트를 놓치지 않게 합니다.
+        """
+        self._ensure_listener()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            print("[ProgressHub] Subscription not ready, continuing without waiting")
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(job_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[job_id]
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ===== 내부 구현 =====
+
+    def _ensure_listener(self) -> None:
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        pattern = job_store.job_channel("*")
+        delay = 1.0
+        while True:
+            # API 와 같은 커넥션 풀에서 구독 전용 커넥션 하나를 사용
+            pubsub = (self.redis or get_async_redis_client()).pubsub()
+            try:
+                await pubsub.psubscribe(pattern)
+                self._ready.set()
+                print(f"[ProgressHub] Subscribed to {pattern}")
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis 연결이 끊기면 재연결 (그동안의 이벤트는 클라이언트가 스냅샷으로 복구)
+                print(f"[ProgressHub] Subscription lost ({e}), reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                self._ready.clear()
+                await pubsub.aclose()
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        job_id = channel[len(_CHANNEL_PREFIX) : len(channel) - len(_CHANNEL_SUFFIX)]
+        queues = self._subscribers.get(job_id)
+        if not queues:
+            return
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            return
+
+        for queue in queues:
+            if queue.full():
+                # 느린 클라이언트: 진행 상황은 최신 값만 의미가 있으므로 오래된 이벤트를 버림
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+progress_hub = ProgressHub()
@@ -1,5 +1,43 @@
+from typing import Optional
+
 import redis
+import redis.asyncio as aioredis
 from app.core.config import settings
 
+_async_client: Optional[aioredis.Redis] = None
+
+
 def get_redis_client():
     return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+def get_async_redis_client() -> aioredis.Redis:
+    """
+    API 프로세스 공용 asyncio Redis 클라이언트 (커넥션 풀 1개를 프로세스 전체에서 공유).
+    풀이 가득 차면 예외 대신 REDIS_POOL_TIMEOUT 초까지 빈 커넥션을 기다립니다.
+    """
+    global _async_client
+    if _async_client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+        )
+        _async_client = aioredis.Redis(connection_pool=pool)
+    return _async_client
+
+
+async def get_async_redis() -> aioredis.Redis:
+    """
+    FastAPI 의존성: Depends(get_async_redis)
+    """
+    return get_async_redis_client()
+
+
+async def close_async_redis_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        await _async_client.connection_pool.disconnect()
+        _async_client = None
@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core import job_store
 from app.core.config import settings
-from app.api.v1.endpoints import jobs
+from app.core.redis import close_async_redis_client, get_redis_client
+from app.core.progress_hub import progress_hub
+from app.api.v1.endpoints import jobs, cache
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -15,9 +18,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor"],  # 작업 목록 페이지네이션 커서
 )
 
 app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
+app.include_router(cache.router, prefix=f"{settings.API_V1_STR}/cache", tags=["cache"])
+
+@app.on_event("startup")
+def build_job_index():
+    # 인덱스 도입 이전 작업이 있으면 최초 1회 색인 (SCAN 기반)
+    redis_client = get_redis_client()
+    if not redis_client.exists(job_store.JOBS_INDEX):
+        count = job_store.rebuild_index(redis_client)
+        print(f"Indexed {count} existing jobs")
+
+@app.on_event("shutdown")
+async def close_redis():
+    await progress_hub.close()
+    await close_async_redis_client()
 
 @app.get("/")
 def read_root():
@@ -10,6 +10,7 @@ class JobCreate(BaseModel):
     targetLanguages: List[str]
     template: str
     mediaUrl: Optional[str] = None
+    uploadId: Optional[str] = None  # 완료된 청크 업로드 (mediaUrl 대신 사용)
     useMockData: bool = False
 
 class JobStatus(BaseModel):
@@ -24,3 +25,17 @@ class JobStatus(BaseModel):
     result: Optional[dict] = None
     error: Optional[str] = None
     createdAt: Union[datetime, float, str]
+
+class UploadCreate(BaseModel):
+    filename: str
+    size: int
+
+class UploadStatus(BaseModel):
+    uploadId: str
+    filename: str
+    size: int
+    offset: int
+    status: str  # uploading | complete
+    chunkSize: int
+    sha256: Optional[str] = None
+    filePath: Optional[str] = None
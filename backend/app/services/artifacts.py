@@ -0,0 +1,465 @@
+"""
+작업 산출물 저장소 (artifact store)
+
+단계 사이의 중간 파일(원본, vocals / instrumental stem, AAC 트랙, 배경, 가사 npz, 출력 영상)을
+TEMP_DIR 의 절대 경로 대신 ref 로 주고받습니다.
+
+- 콘텐츠 주소 이름: ref = "blobs/<sha256 앞 2자리>/<sha256><확장자>".
+  같은 내용은 한 번만 저장되며, 이름이 같은 서로 다른 파일이 충돌하지 않습니다.
+- 백엔드 (ARTIFACT_BACKEND)
+  - local: ARTIFACT_DIR 아래 파일 (같은 볼륨을 공유하는 워커용)
+  - s3: S3 호환 스토리지 (R2_BUCKET_NAME/ARTIFACT_S3_PREFIX). 노드마다 ARTIFACT_CACHE_DIR 에
+    내려받은 사본을 두므로, 공유 볼륨 없이 여러 노드의 워커가 중간 파일을 공유합니다.
+- 참조 카운트 (Redis)
+  - artifacts:job:{job_id}  HASH 이름 -> ref   (작업이 쓰는 산출물)
+  - artifacts:refs          HASH ref -> 참조하는 (작업, 이름) 수
+  - artifacts:index         ZSET ref -> 마지막 접근 시각, artifacts:sizes / artifacts:total_bytes
+  - artifacts:released      ZSET job_id -> 참조 해제 예정 시각 (작업 종료 + ARTIFACT_TTL)
+  - artifacts:pinned        ZSET job_id -> 참조 해제 예정 시각 (용량 상한으로 앞당기지 않음)
+- 결과 파일 (keep_result): 스토리지가 없을 때의 출력 영상/자막은 가짜 작업 "results:<job_id>" 로
+  작업 기록 보존 기간(JOB_RETENTION_SECONDS) 동안 고정됩니다.
+- GC (collect_garbage, ARTIFACT_GC_INTERVAL 마다 collect_artifacts 작업으로 실행)
+  1. 해제 예정 시각이 지난 작업의 참조를 해제합니다.
+  2. 참조가 0 이고 ARTIFACT_GC_GRACE 동안 접근되지 않은 blob 을 삭제합니다.
+  3. 총 용량이 ARTIFACT_MAX_BYTES 를 넘으면 종료된 작업을 오래된 순서로 TTL 전에 해제합니다.
+     진행 중인 작업과 고정된 결과 파일은 삭제하지 않습니다.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.services import storage
+from app.services.result_cache import hash_file
+from app.services.subtitle_generator import LyricsTable
+
+JOB_ARTIFACTS = "artifacts:job:{job_id}"
+ARTIFACT_REFS = "artifacts:refs"
+ARTIFACT_INDEX = "artifacts:index"
+ARTIFACT_SIZES = "artifacts:sizes"
+ARTIFACT_TOTAL = "artifacts:total_bytes"
+RELEASED_JOBS = "artifacts:released"
+PINNED_JOBS = "artifacts:pinned"
+RESULT_HOLDER = "results:{job_id}"  # 결과 파일 참조를 유지하는 가짜 작업 id
+
+# KEYS = job hash, refs, sizes, index, total
+# ARGV = name, ref, size, now
+# Returns 1 이면 처음 등록된 blob (백엔드에 저장 필요)
+_ADD_REF_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+local created = redis.call('HSETNX', KEYS[3], ARGV[2], ARGV[3])
+if created == 1 then redis.call('INCRBY', KEYS[5], ARGV[3]) end
+redis.call('ZADD', KEYS[4], ARGV[4], ARGV[2])
+if previous ~= ARGV[2] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+    if previous then redis.call('HINCRBY', KEYS[2], previous, -1) end
+end
+return created
+"""
+
+# KEYS = job hash, refs, sizes, index
+# ARGV = name, ref, now
+# 이미 저장된 blob 에만 참조를 추가합니다. Returns blob 크기 (GC 로 삭제됐으면 -1)
+_ATTACH_SCRIPT = """
+local size = redis.call('HGET', KEYS[3], ARGV[2])
+if not size then return -1 end
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+redis.call('ZADD', KEYS[4], ARGV[3], ARGV[2])
+if previous ~= ARGV[2] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+    if previous then redis.call('HINCRBY', KEYS[2], previous, -1) end
+end
+return tonumber(size)
+"""
+
+# KEYS = job hash, refs, released
+# ARGV = job id
+_RELEASE_SCRIPT = """
+local refs = redis.call('HVALS', KEYS[1])
+for _, ref in ipairs(refs) do redis.call('HINCRBY', KEYS[2], ref, -1) end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+return #refs
+"""
+
+# KEYS = refs, sizes, index, total
+# ARGV = ref, 접근 기준 시각 (이후에 접근된 blob 은 삭제하지 않음)
+# Returns 삭제한 blob 크기 (삭제하지 않으면 -1)
+_FORGET_SCRIPT = """
+if tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0') > 0 then return -1 end
+local accessed = redis.call('ZSCORE', KEYS[3], ARGV[1])
+if accessed and tonumber(accessed) > tonumber(ARGV[2]) then return -1 end
+local size = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('DECRBY', KEYS[4], size)
+return size
+"""
+
+
+# ===== 백엔드 =====
+
+
+class LocalBackend:
+    """
+    로컬(또는 공유 볼륨) 디렉터리. 가능하면 하드 링크로 저장하여 복사를 피합니다.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or settings.ARTIFACT_DIR or os.path.join(settings.TEMP_DIR, "artifacts")
+
+    def path(self, ref: str) -> str:
+        return os.path.join(self.root, ref)
+
+    def put(self, src: str, ref: str, move: bool = False) -> None:
+        _place(src, self.path(ref), move)
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self.path(ref))
+
+    def fetch(self, ref: str) -> str:
+        path = self.path(ref)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Artifact not found: {ref}")
+        return path
+
+    def delete(self, ref: str) -> None:
+        try:
+            os.remove(self.path(ref))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, max_age: float) -> None:
+        pass  # 원본이므로 GC 가 ref 단위로만 삭제
+
+
+class S3Backend:
+    """
+    S3 호환 스토리지 + 노드 로컬 사본. 같은 노드의 다음 단계는 다시 내려받지 않습니다.
+    """
+
+    def __init__(self, prefix: str = None, cache_dir: str = None):
+        self.bucket = settings.R2_BUCKET_NAME
+        self.prefix = prefix if prefix is not None else settings.ARTIFACT_S3_PREFIX
+        self.cache = LocalBackend(
+            cache_dir
+            or settings.ARTIFACT_CACHE_DIR
+            or os.path.join(settings.TEMP_DIR, "artifact-cache")
+        )
+
+    def put(self, src: str, ref: str, move: bool = False) -> None:
+        storage.get_s3_client().upload_file(
+            src, self.bucket, self.prefix + ref, Config=storage.transfer_config()
+        )
+        self.cache.put(src, ref, move)
+
+    def exists(self, ref: str) -> bool:
+        if self.cache.exists(ref):
+            return True
+        try:
+            storage.get_s3_client().head_object(Bucket=self.bucket, Key=self.prefix + ref)
+            return True
+        except Exception:
+            return False
+
+    def fetch(self, ref: str) -> str:
+        path = self.cache.path(ref)
+        if os.path.exists(path):
+            os.utime(path)  # prune 기준 (마지막 사용 시각)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            storage.get_s3_client().download_file(
+                self.bucket, self.prefix + ref, tmp_path, Config=storage.transfer_config()
+            )
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return path
+
+    def delete(self, ref: str) -> None:
+        storage.get_s3_client().delete_object(Bucket=self.bucket, Key=self.prefix + ref)
+        self.cache.delete(ref)
+
+    def prune(self, max_age: float) -> None:
+        """
+        노드 로컬 사본 중 max_age 초 동안 사용되지 않은 파일을 지웁니다 (원본은 S3 에 남음).
+        다른 노드에서 GC 된 blob 의 사본도 이 방식으로 정리됩니다.
+        """
+        cutoff = time.time() - max_age
+        for directory, _, files in os.walk(self.cache.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def _place(src: str, dst: str, move: bool) -> None:
+    """
+    src 를 dst 에 원자적으로 놓습니다 (move 면 rename, 아니면 하드 링크, 실패 시 복사).
+    """
+    if os.path.exists(dst):
+        if move:
+            os.remove(src)
+        return
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    try:
+        if move:
+            shutil.move(src, tmp_path)
+        else:
+            try:
+                os.link(src, tmp_path)
+            except OSError:
+                shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+_backend = None
+_redis_client = None
+
+
+def _redis():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = get_redis_client()
+    return _redis_client
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.ARTIFACT_BACKEND == "s3":
+            _backend = S3Backend()
+        elif settings.ARTIFACT_BACKEND == "local":
+            _backend = LocalBackend()
+        else:
+            raise ValueError(f"Unknown ARTIFACT_BACKEND '{settings.ARTIFACT_BACKEND}' (local, s3)")
+    return _backend
+
+
+# ===== 저장 / 조회 =====
+
+
+def make_ref(digest: str, extension: str = "") -> str:
+    return f"blobs/{digest[:2]}/{digest}{extension}"
+
+
+def ref_digest(ref: str) -> str:
+    return os.path.basename(ref).split(".", 1)[0]
+
+
+def put_file(
+    job_id: str,
+    path: str,
+    name: str,
+    move: bool = False,
+    digest: str = None,
+    redis_client=None,
+) -> str:
+    """
+    파일을 저장하고 작업 job_id 의 산출물 name 으로 등록합니다. Returns ref
+    move=True 면 원본 파일을 옮기거나(이미 있는 내용이면) 지웁니다.
+    digest 는 이미 계산된 SHA-256 (예: 청크 업로드의 source_hash) 이 있으면 재계산을 생략합니다.
+    """
+    redis_client = redis_client or _redis()
+    ref = make_ref(digest or hash_file(path), os.path.splitext(path)[1].lower())
+    if digest and attach(job_id, name, ref, redis_client) and get_backend().exists(ref):
+        # 이미 저장된 내용 (같은 업로드로 만든 다른 작업 등): 참조만 추가
+        if move and os.path.exists(path):
+            os.remove(path)
+        return ref
+    size = os.path.getsize(path)
+
+    # 참조를 먼저 등록하여, 저장 중인 blob 을 GC 가 지우지 않도록 함
+    created = redis_client.register_script(_ADD_REF_SCRIPT)(
+        keys=[_job_key(job_id), ARTIFACT_REFS, ARTIFACT_SIZES, ARTIFACT_INDEX, ARTIFACT_TOTAL],
+        args=[name, ref, size, time.time()],
+    )
+    backend = get_backend()
+    if created or not backend.exists(ref):
+        try:
+            backend.put(path, ref, move=move)
+        except Exception:
+            # 다음 put_file 이 다시 저장하도록 blob 등록을 되돌림
+            pipe = redis_client.pipeline()
+            pipe.hdel(ARTIFACT_SIZES, ref)
+            pipe.zrem(ARTIFACT_INDEX, ref)
+            if created:
+                pipe.decrby(ARTIFACT_TOTAL, size)
+            pipe.execute()
+            raise
+        if created and int(redis_client.get(ARTIFACT_TOTAL) or 0) > settings.ARTIFACT_MAX_BYTES:
+            collect_garbage(redis_client=redis_client)
+    elif move:
+        os.remove(path)
+    return ref
+
+
+def attach(job_id: str, name: str, ref: str, redis_client=None) -> bool:
+    """
+    이미 저장된 blob ref 를 작업 job_id 의 산출물 name 으로 등록합니다 (파일 해시/전송 없음).
+    blob 이 GC 로 삭제됐으면 False 를 반환합니다.
+    """
+    size = (redis_client or _redis()).register_script(_ATTACH_SCRIPT)(
+        keys=[_job_key(job_id), ARTIFACT_REFS, ARTIFACT_SIZES, ARTIFACT_INDEX],
+        args=[name, ref, time.time()],
+    )
+    return size >= 0
+
+
+def local_path(ref: str, redis_client=None) -> str:
+    """
+    ref 의 로컬 파일 경로 (s3 백엔드는 필요하면 내려받음).
+    """
+    redis_client = redis_client or _redis()
+    redis_client.zadd(ARTIFACT_INDEX, {ref: time.time()}, xx=True)
+    return get_backend().fetch(ref)
+
+
+def get_ref(job_id: str, name: str, redis_client=None) -> Optional[str]:
+    return (redis_client or _redis()).hget(_job_key(job_id), name)
+
+
+def save_lyrics(job_id: str, lyrics, name: str = "lyrics") -> str:
+    """
+    가사(세그먼트 dict 또는 LyricsTable)를 평탄한 배열 npz 로 저장하고 ref 를 반환합니다.
+    """
+    table = LyricsTable.from_segments(lyrics)
+    os.makedirs(settings.TEMP_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=settings.TEMP_DIR, suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **table.to_arrays())
+        return put_file(job_id, tmp_path, name, move=True)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_lyrics(ref: str) -> LyricsTable:
+    with np.load(local_path(ref), allow_pickle=False) as arrays:
+        return LyricsTable.from_arrays({name: arrays[name] for name in arrays.files})
+
+
+def keep_result(job_id: str, path: str, name: str, redis_client=None) -> str:
+    """
+    작업 결과 파일을 저장소로 옮기고, 작업 기록이 남아 있는 동안(JOB_RETENTION_SECONDS) 고정합니다.
+    Returns ref
+    """
+    holder = RESULT_HOLDER.format(job_id=job_id)
+    ref = put_file(holder, path, name, move=True, redis_client=redis_client)
+    if settings.JOB_RETENTION_SECONDS > 0:
+        # 보존 기간이 없으면(0 이하) 작업 기록처럼 해제하지 않음
+        release_job(
+            holder, ttl=settings.JOB_RETENTION_SECONDS, pinned=True, redis_client=redis_client
+        )
+    return ref
+
+
+def artifact_size(ref: str, redis_client=None) -> int:
+    return int((redis_client or _redis()).hget(ARTIFACT_SIZES, ref) or 0)
+
+
+# ===== 수명 관리 =====
+
+
+def release_job(job_id: str, ttl: float = None, pinned: bool = False, redis_client=None) -> None:
+    """
+    작업이 끝났음을 표시합니다. ttl 초(기본 ARTIFACT_TTL) 후 GC 가 작업의 참조를 해제합니다.
+    pinned=True 면 용량 상한을 넘어도 ttl 전에 해제하지 않습니다.
+    """
+    ttl = settings.ARTIFACT_TTL if ttl is None else ttl
+    (redis_client or _redis()).zadd(
+        PINNED_JOBS if pinned else RELEASED_JOBS, {job_id: time.time() + ttl}
+    )
+
+
+def collect_garbage(now: float = None, redis_client=None) -> dict:
+    """
+    만료된 작업 참조를 해제하고, 참조가 없는 blob 을 삭제하고, 용량 상한을 적용합니다.
+    Returns {"released_jobs", "deleted", "freed_bytes", "total_bytes"}
+    """
+    redis_client = redis_client or _redis()
+    now = now or time.time()
+    stats = {"released_jobs": 0, "deleted": 0, "freed_bytes": 0}
+
+    # 1. 해제 예정 시각이 지난 작업
+    for schedule in (RELEASED_JOBS, PINNED_JOBS):
+        for job_id in redis_client.zrangebyscore(schedule, "-inf", now):
+            _release_refs(redis_client, job_id, schedule)
+            stats["released_jobs"] += 1
+
+    # 2. 참조 없는 blob
+    _delete_unreferenced(redis_client, now - settings.ARTIFACT_GC_GRACE, stats)
+
+    # 3. 용량 상한: 종료된 작업을 해제 예정 순서대로 앞당겨 해제
+    while int(redis_client.get(ARTIFACT_TOTAL) or 0) > settings.ARTIFACT_MAX_BYTES:
+        oldest = redis_client.zrange(RELEASED_JOBS, 0, 0)
+        if not oldest:
+            print(
+                "[Artifacts] Over quota, but every remaining artifact belongs to a running job "
+                "or a retained result"
+            )
+            break
+        _release_refs(redis_client, oldest[0], RELEASED_JOBS)
+        stats["released_jobs"] += 1
+        _delete_unreferenced(redis_client, now, stats)
+
+    get_backend().prune(settings.ARTIFACT_TTL)
+    stats["total_bytes"] = int(redis_client.get(ARTIFACT_TOTAL) or 0)
+    if stats["deleted"]:
+        print(
+            f"[Artifacts] GC released {stats['released_jobs']} jobs, deleted {stats['deleted']} "
+            f"blobs ({stats['freed_bytes']} bytes)"
+        )
+    return stats
+
+
+def _job_key(job_id: str) -> str:
+    return JOB_ARTIFACTS.format(job_id=job_id)
+
+
+def _release_refs(redis_client, job_id: str, schedule: str) -> None:
+    redis_client.register_script(_RELEASE_SCRIPT)(
+        keys=[_job_key(job_id), ARTIFACT_REFS, schedule], args=[job_id]
+    )
+
+
+def _delete_unreferenced(redis_client, accessed_before: float, stats: dict) -> None:
+    forget = redis_client.register_script(_FORGET_SCRIPT)
+    backend = get_backend()
+    for ref, count in redis_client.hgetall(ARTIFACT_REFS).items():
+        if int(count) > 0:
+            continue
+        size = forget(
+            keys=[ARTIFACT_REFS, ARTIFACT_SIZES, ARTIFACT_INDEX, ARTIFACT_TOTAL],
+            args=[ref, accessed_before],
+        )
+        if size < 0:
+            continue
+        try:
+            backend.delete(ref)
+        except Exception as e:
+            print(f"[Artifacts] Failed to delete {ref}: {e}")
+        stats["deleted"] += 1
+        stats["freed_bytes"] += size
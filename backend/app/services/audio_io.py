@@ -0,0 +1,241 @@
+"""
+스트리밍 오디오 디코딩 / 인메모리 리샘플링
+
+ffmpeg 의 stdout 파이프(float32 PCM)를 바로 NumPy 버퍼로 읽어,
+중간 WAV 파일(_proc.wav) 없이 한 번의 디코딩으로 모든 소비자에게 오디오를 제공합니다.
+
+- Demucs: 44.1kHz stereo (decode_audio 결과 그대로)
+- WhisperX: 16kHz mono (to_whisper_input 으로 메모리 내 변환)
+
+중간 stem 저장 포맷 (DEMUCS_OUTPUT_FORMAT, save_stem / load_stem):
+- flac: 24-bit 무손실 압축. 노드 간 전송/저장 크기가 가장 작음 (ARTIFACT_BACKEND=s3 기본값)
+        피크가 1 을 넘는 stem 은 잘리지 않도록 32-bit float WAV 로 대신 저장합니다.
+- npy : float32 원본 그대로. 디코딩 없이 mmap 으로 바로 읽음 (ARTIFACT_BACKEND=local 기본값)
+        2-D 는 [samples, channels] (interleaved) @ DEMUCS_SAMPLE_RATE 이므로 ffmpeg 도
+        헤더만 건너뛰고 raw f32le 로 직접 읽습니다. 1-D 는 WhisperX 입력 (16kHz mono).
+- wav : 16-bit PCM (이전 방식), mp3: 손실 압축 - 두 포맷은 피크가 1 을 넘으면 전체를 줄여 저장
+stem 은 vocals / instrumental 모두 DEMUCS_SAMPLE_RATE stereo 로 저장하고,
+WhisperX 입력(16kHz mono) 변환은 전사 단계(load_whisper_input)에서 합니다.
+"""
+
+import subprocess
+import threading
+
+import numpy as np
+
+from app.core.config import settings
+
+DEMUCS_SAMPLE_RATE = 44100
+WHISPER_SAMPLE_RATE = 16000
+
+_READ_SIZE = 1024 * 1024
+
+
+def decode_audio(
+    input_path: str, sample_rate: int = DEMUCS_SAMPLE_RATE, channels: int = 2
+) -> np.ndarray:
+    """
+    입력 미디어를 ffmpeg 로 디코딩하여 float32 [channels, samples] 배열로 반환합니다.
+    디스크에는 아무것도 쓰지 않습니다.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-nostats",
+        "-threads",
+        "0",
+        "-i",
+        input_path,
+        "-vn",
+        "-f",
+        "f32le",
+        "-acodec",
+        "pcm_f32le",
+        "-ac",
+        str(channels),
+        "-ar",
+        str(sample_rate),
+        "-",
+    ]
+    try:
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        error_msg = (
+            "FFmpeg not found. Please install ffmpeg (e.g., sudo apt install ffmpeg)."
+        )
+        print(error_msg)
+        raise Exception(error_msg)
+
+    # stderr 는 별도 스레드에서 비움 (stdout 을 읽는 동안 stderr 파이프가 가득 차 ffmpeg 가 멈추지 않도록)
+    stderr_chunks = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+    )
+    stderr_reader.start()
+
+    # stdout 을 청크 단위로 하나의 버퍼에 누적 (파이프 버퍼가 가득 차 ffmpeg 가 멈추지 않도록)
+    buffer = bytearray()
+    while True:
+        chunk = process.stdout.read(_READ_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+    process.wait()
+    stderr_reader.join()
+    stderr = b"".join(stderr_chunks)
+
+    if process.returncode != 0:
+        raise Exception(f"Failed to decode audio: {stderr.decode(errors='ignore')[-500:]}")
+
+    # 정수 프레임만 사용 (마지막 불완전 샘플 방지)
+    frame_bytes = 4 * channels
+    usable = len(buffer) - (len(buffer) % frame_bytes)
+    audio = np.frombuffer(buffer, dtype=np.float32, count=usable // 4)
+    # interleaved [samples, channels] → [channels, samples]
+    return audio.reshape(-1, channels).T.copy()
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    메모리 내 리샘플링 ([..., samples] float32).
+    """
+    if orig_sr == target_sr:
+        return audio
+
+    import torch
+    import torchaudio.functional as F
+
+    tensor = torch.from_numpy(np.ascontiguousarray(audio))
+    return F.resample(tensor, orig_sr, target_sr).numpy()
+
+
+def to_whisper_input(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    [channels, samples] 오디오를 WhisperX 입력 형식 (16kHz mono float32 1-D) 으로 변환합니다.
+    """
+    mono = audio.mean(axis=0) if audio.ndim == 2 else audio
+    return resample(mono.astype(np.float32), sample_rate, WHISPER_SAMPLE_RATE)
+
+
+def load_whisper_input(path: str) -> np.ndarray:
+    """
+    to_whisper_input 결과를 저장한 .npy 파일이면 그대로 mmap 하고,
+    그 외 포맷은 ffmpeg 로 16kHz mono 디코딩합니다.
+    """
+    if path.endswith(".npy"):
+        audio = load_stem(path)
+        if audio.ndim == 1:
+            return audio
+        return to_whisper_input(audio, DEMUCS_SAMPLE_RATE)
+    return decode_audio(path, sample_rate=WHISPER_SAMPLE_RATE, channels=1)[0]
+
+
+# ===== 중간 stem 저장 =====
+
+
+def stem_format() -> str:
+    """
+    DEMUCS_OUTPUT_FORMAT ("auto" 면 산출물 백엔드 기준: s3 → flac, local → npy)
+    """
+    fmt = settings.DEMUCS_OUTPUT_FORMAT
+    if fmt == "auto":
+        return "flac" if settings.ARTIFACT_BACKEND == "s3" else "npy"
+    return fmt
+
+
+# 포맷별 ffmpeg 인코더 옵션 (npy 는 ffmpeg 를 거치지 않음)
+_STEM_CODECS = {
+    "flac": ["-c:a", "flac", "-sample_fmt", "s32", "-bits_per_raw_sample", "24"],
+    "wav": ["-c:a", "pcm_s16le"],
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "320k"],
+}
+# 무손실 포맷이 표현할 수 없는 피크(> 1.0)를 가진 stem 의 대체 포맷 (확장자, 인코더 옵션)
+_FLOAT_WAV = ("wav", ["-c:a", "pcm_f32le"])
+# 손실/16-bit 포맷: 피크가 1 을 넘으면 전체를 줄여 클리핑을 막음 (demucs clip='rescale')
+_RESCALED_FORMATS = {"wav", "mp3"}
+
+
+def save_stem(audio: np.ndarray, path: str, sample_rate: int, fmt: str = None) -> str:
+    """
+    [channels, samples] 또는 1-D float32 오디오를 path + 확장자로 저장합니다. Returns 저장 경로
+    npy / flac 은 값을 바꾸지 않습니다 (flac 범위를 넘는 stem 은 float WAV 로 저장).
+    """
+    fmt = fmt or stem_format()
+    if fmt == "npy":
+        output_path = f"{path}.npy"
+        # 2-D 는 interleaved [samples, channels] 로 저장 (ffmpeg raw 입력과 같은 배치)
+        np.save(output_path, np.ascontiguousarray(audio.T, dtype=np.float32))
+        return output_path
+    if fmt not in _STEM_CODECS:
+        raise ValueError(f"Unknown stem format '{fmt}' (flac, npy, wav, mp3)")
+
+    audio = audio.astype(np.float32, copy=False)
+    peak = float(np.abs(audio).max()) if audio.size else 0.0
+    extension, codec = fmt, _STEM_CODECS[fmt]
+    if peak > 1.0:
+        if fmt in _RESCALED_FORMATS:
+            audio = audio / peak
+        else:
+            extension, codec = _FLOAT_WAV
+    output_path = f"{path}.{extension}"
+    channels = 1 if audio.ndim == 1 else audio.shape[0]
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-y",
+        "-f",
+        "f32le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+        "-i",
+        "-",
+        *codec,
+        output_path,
+    ]
+    result = subprocess.run(
+        cmd, input=np.ascontiguousarray(audio.T).tobytes(), capture_output=True
+    )
+    if result.returncode != 0:
+        raise Exception(f"Failed to encode stem: {result.stderr.decode(errors='ignore')[-500:]}")
+    return output_path
+
+
+def load_stem(path: str, sample_rate: int = DEMUCS_SAMPLE_RATE, channels: int = 2) -> np.ndarray:
+    """
+    stem 을 [channels, samples] (1-D npy 는 그대로) float32 로 읽습니다.
+    npy 는 copy-on-write mmap 의 view 를 반환하므로 디코딩/복사 없이 필요한 페이지만 읽힙니다.
+    """
+    if path.endswith(".npy"):
+        audio = np.load(path, mmap_mode="c")
+        return audio if audio.ndim == 1 else audio.T
+    return decode_audio(path, sample_rate=sample_rate, channels=channels)
+
+
+def ffmpeg_input_options(path: str) -> dict:
+    """
+    ffmpeg-python input() 옵션. 2-D npy stem 은 헤더를 건너뛴 raw f32le 로 읽도록 지정합니다.
+    """
+    if not path.endswith(".npy"):
+        return {}
+    audio = np.load(path, mmap_mode="r")
+    channels = 1 if audio.ndim == 1 else audio.shape[1]
+    return {
+        "f": "f32le",
+        "ar": WHISPER_SAMPLE_RATE if audio.ndim == 1 else DEMUCS_SAMPLE_RATE,
+        "ac": channels,
+        "skip_initial_bytes": audio.offset,
+    }
+
+
+def npy_duration(path: str) -> float:
+    audio = np.load(path, mmap_mode="r")
+    rate = WHISPER_SAMPLE_RATE if audio.ndim == 1 else DEMUCS_SAMPLE_RATE
+    return audio.shape[0] / rate
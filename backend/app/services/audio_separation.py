@@ -1,42 +1,235 @@
 import os
-import subprocess
+import time
+import numpy as np
+import torch
 from app.core.config import settings
+from app.services import audio_io
+from app.services.chunking import run_chunks, split_windows
+from app.services.model_registry import registry
 
+# 저장되는 stem 형식이 바뀌면 올림 (분리 결과 캐시 키에 포함)
+# 2: vocals 도 DEMUCS_SAMPLE_RATE stereo, 정규화 없음 (1: vocals 16kHz mono, 피크 정규화)
+STEM_VERSION = 2
 
-def separate_audio(input_path: str, output_dir: str = None) -> dict:
+# torch 기본 intra-op 스레드 수 (청크 분리 후 다음 작업에서 되돌리기 위해 기억)
+_DEFAULT_THREADS = torch.get_num_threads()
+
+
+def _get_device() -> str:
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _configure_threads(workers: int = 1) -> None:
+    """
+    torch intra-op 스레드 수는 프로세스 전역 설정이므로 분리 시작 전에 한 번만 정합니다.
+    청크를 workers 개 동시에 추론하면 각 청크가 intra-op 스레드를 쓰므로, 합이 코어 수를 넘지 않게 나눕니다.
+    """
+    if _get_device() != "cpu":
+        return
+    total = settings.DEMUCS_THREADS if settings.DEMUCS_THREADS > 0 else _DEFAULT_THREADS
+    torch.set_num_threads(max(1, total // max(1, workers)))
+
+
+def get_separator_model():
+    """
+    워커 프로세스에 상주하는 Demucs 모델을 반환합니다.
+    Returns (model, load_seconds) - 이미 로드되어 있으면 load_seconds 는 0.
+    """
+    from demucs.pretrained import get_model
+
+    model_name = settings.DEMUCS_MODEL
+    device = _get_device()
+
+    def _load():
+        print(f"Loading Demucs model: {model_name}")
+        model = get_model(model_name)
+        model.to(device)
+        model.eval()
+        return model
+
+    return registry.get(f"demucs:{model_name}", _load)
+
+
+def preload_models():
+    """
+    worker_process_init 시점에 호출되어 Demucs 모델을 미리 로드합니다.
+    """
+    try:
+        get_separator_model()
+    except ImportError:
+        print("Demucs not installed. Skipping model preload.")
+
+
+def separate_tensor(
+    wav: torch.Tensor, model, stats: tuple = None, shifts: int = None
+) -> dict:
+    """
+    [channels, samples] 텐서를 vocals / instrumental 두 stem 으로 분리합니다.
+    (demucs CLI 의 --two-stems=vocals 와 동일한 결과)
+    stats 에 (mean, std) 를 주면 해당 값으로 정규화합니다 (청크 분리 시 전체 트랙 기준 통계 사용).
+    """
+    from demucs.apply import apply_model
+
+    device = _get_device()
+
+    # Demucs CLI 와 동일하게 입력을 정규화한 뒤 추론하고, 결과를 다시 원래 스케일로 되돌림
+    if stats is None:
+        ref = wav.mean(0)
+        stats = (ref.mean(), ref.std())
+    mean, std = stats
+    mix = (wav - mean) / (std + 1e-8)
+
+    with torch.no_grad():
+        sources = apply_model(
+            model,
+            mix[None],
+            shifts=settings.DEMUCS_SHIFTS if shifts is None else shifts,
+            split=True,
+            overlap=settings.DEMUCS_OVERLAP,
+            segment=settings.DEMUCS_SEGMENT,
+            device=device,
+            progress=False,
+        )[0]
+    sources = sources * (std + 1e-8) + mean
+
+    vocals_idx = model.sources.index("vocals")
+    vocals = sources[vocals_idx]
+    # vocals 를 제외한 나머지 stem 합 = 반주 (no_vocals)
+    instrumental = sources.sum(0) - vocals
+
+    return {"vocals": vocals.cpu(), "instrumental": instrumental.cpu()}
+
+
+def separate_tensor_chunked(
+    wav: torch.Tensor, model, samplerate: int, shifts: int = None
+) -> dict:
+    """
+    긴 트랙을 겹치는 청크로 나누어 병렬 분리한 뒤 overlap-add 로 합칩니다.
+    정규화는 전체 트랙 통계를 공유합니다.
+
+    같은 프로세스 안에서 실행합니다 (Celery prefork 자식 프로세스는 daemon 이라 프로세스 풀을 만들 수 없음).
+    모델 추론의 중간 텐서는 청크 길이로 제한되고, 청크 출력은 끝나는 대로 누적 버퍼에 더한 뒤 버리므로
+    트랙 전체 크기의 메모리는 입력과 출력 stem 뿐입니다.
+    (PyTorch 연산은 GIL 을 해제하므로 청크 추론이 workers 개 병렬로 진행됩니다)
+    """
+    num_samples = wav.shape[-1]
+    chunk_size = int(settings.DEMUCS_CHUNK_SECONDS * samplerate)
+    overlap = int(settings.DEMUCS_CHUNK_OVERLAP_SECONDS * samplerate)
+    windows = split_windows(num_samples, chunk_size, overlap)
+
+    ref = wav.mean(0)
+    stats = (ref.mean(), ref.std())
+
+    def _run(start, end):
+        stems = separate_tensor(wav[:, start:end], model, stats=stats, shifts=shifts)
+        return {name: stem.numpy() for name, stem in stems.items()}
+
+    workers = max(1, min(settings.DEMUCS_CHUNK_WORKERS, len(windows)))
+    print(f"Chunked separation: {len(windows)} chunks, {workers} workers")
+    _configure_threads(workers)
+    try:
+        stems = run_chunks(_run, windows, num_samples, overlap, workers)
+    finally:
+        _configure_threads()
+    return {name: torch.from_numpy(stem) for name, stem in stems.items()}
+
+
+def verify_chunked_separation(audio: np.ndarray, sample_rate: int = audio_io.DEMUCS_SAMPLE_RATE) -> dict:
+    """
+    같은 입력에 대해 청크 분리와 단일 분리 결과를 비교합니다 (정확도 검증용).
+    랜덤 시프트를 끄고(shifts=0) 비교하며, stem 별 최대 오차와 SDR(dB)을 반환합니다.
+    """
+    from demucs.audio import convert_audio
+
+    model, _ = get_separator_model()
+    wav = convert_audio(
+        torch.from_numpy(audio), sample_rate, model.samplerate, model.audio_channels
+    )
+    reference = separate_tensor(wav, model, shifts=0)
+    chunked = separate_tensor_chunked(wav, model, model.samplerate, shifts=0)
+
+    report = {}
+    for name in ("vocals", "instrumental"):
+        ref = reference[name].numpy()
+        err = chunked[name].numpy() - ref
+        sdr = 10 * np.log10((np.sum(ref**2) + 1e-12) / (np.sum(err**2) + 1e-12))
+        report[name] = {
+            "max_abs_error": float(np.max(np.abs(err))),
+            "sdr_db": float(sdr),
+        }
+    return report
+
+
+def separate_audio(
+    source,
+    output_dir: str = None,
+    return_tensors: bool = False,
+    sample_rate: int = audio_io.DEMUCS_SAMPLE_RATE,
+    name: str = None,
+) -> dict:
     """
     Separates audio into vocals and instrumental using Demucs.
+    모델은 워커에 상주하며, apply_model 을 직접 호출하여 CLI 재진입과 가중치 재로드를 피합니다.
+
+    source 는 audio_io.decode_audio 결과 배열([channels, samples]) 또는 미디어 경로입니다.
+    vocals / instrumental 모두 DEMUCS_SAMPLE_RATE stereo 로, 정규화 없이 저장합니다
+    (16kHz mono 변환은 전사 단계에서 audio_io.load_whisper_input 이 수행).
+    저장 포맷은 DEMUCS_OUTPUT_FORMAT (audio_io.stem_format: flac / npy / wav / mp3) 입니다.
+    return_tensors=True 이면 stem 텐서도 함께 반환합니다 (디스크 재읽기 불필요).
     """
+    from demucs.audio import convert_audio
+
     if output_dir is None:
         output_dir = os.path.join(settings.TEMP_DIR, "separated")
 
-    os.makedirs(output_dir, exist_ok=True)
+    if isinstance(source, str):
+        name = name or os.path.basename(source).split(".")[0]
+        source = audio_io.decode_audio(source, sample_rate=sample_rate)
 
-    # Construct Demucs command
-    # demucs -n htdemucs --two-stems=vocals input_path -o output_dir
-    # Note: In a real environment, we might call the python API directly to avoid shell overhead,
-    # or use the CLI command via subprocess as it handles loading nicely.
-    # The plan suggests: demucs.separate.main(["--two-stems", "vocals", "-n", "htdemucs", input_path])
+    model, load_seconds = get_separator_model()
 
-    # Mocking implementation for now as we might not have GPU in this environment
-    # print(f"Mock: Running Demucs on {input_path}")
-
-    # In real implementation:
-    import demucs.separate
-
-    demucs.separate.main(
-        ["-n", "htdemucs", "--two-stems", "vocals", "-o", output_dir, input_path]
+    wav = convert_audio(
+        torch.from_numpy(source), sample_rate, model.samplerate, model.audio_channels
     )
 
-    # print(f"Mock: Running Demucs on {input_path}")
-    filename = os.path.basename(input_path).split(".")[0]
+    # 긴 트랙은 청크 병렬 분리 (메모리 상한 + 코어 수 비례 지연시간)
+    duration = wav.shape[-1] / model.samplerate
+    chunked = duration > settings.DEMUCS_CHUNK_THRESHOLD_SECONDS
+
+    started = time.perf_counter()
+    if chunked:
+        stems = separate_tensor_chunked(wav, model, model.samplerate)
+    else:
+        _configure_threads()
+        stems = separate_tensor(wav, model)
+    inference_seconds = time.perf_counter() - started
 
-    model_name = "htdemucs"
+    # Output structure: output_dir/model_name/name/{vocals,no_vocals}.<flac|npy|wav|mp3>
+    base_out = os.path.join(output_dir, settings.DEMUCS_MODEL, name or "audio")
+    os.makedirs(base_out, exist_ok=True)
 
-    # Expected output paths (Demucs structure: output_dir/model_name/filename/vocals.wav)
-    base_out = os.path.join(output_dir, model_name, filename)
-    vocals_path = os.path.join(base_out, "vocals.wav")
-    instrumental_path = os.path.join(base_out, "no_vocals.wav")
+    # 중간 포맷으로 바로 저장 (audio_io.save_stem: flac 24-bit / float32 npy / wav)
+    paths = {}
+    for stem, filename in (("vocals", "vocals"), ("instrumental", "no_vocals")):
+        audio = audio_io.resample(
+            stems[stem].numpy(), model.samplerate, audio_io.DEMUCS_SAMPLE_RATE
+        )
+        paths[stem] = audio_io.save_stem(
+            audio, os.path.join(base_out, filename), audio_io.DEMUCS_SAMPLE_RATE
+        )
+    vocals_path, instrumental_path = paths["vocals"], paths["instrumental"]
 
-    # Return dummy paths for now if not running actual inference
-    return {"vocals": vocals_path, "instrumental": instrumental_path}
+    result = {
+        "vocals": vocals_path,
+        "instrumental": instrumental_path,
+        "metrics": {
+            "model_load_seconds": round(load_seconds, 3),
+            "inference_seconds": round(inference_seconds, 3),
+            "warm": load_seconds == 0,
+            "chunked": chunked,
+        },
+    }
+    if return_tensors:
+        result["tensors"] = stems
+        result["samplerate"] = model.samplerate
+    return result
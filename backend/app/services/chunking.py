@@ -0,0 +1,115 @@
+"""
+긴 트랙 청크 분리용 윈도우 분할 + crossfade overlap-add
+
+모델/torch 에 의존하지 않는 numpy 연산만 모아 두었습니다 (audio_separation 에서 사용).
+청크 출력은 완료되는 대로 트랙 길이의 누적 버퍼에 더한 뒤 버리므로,
+동시에 메모리에 있는 청크 출력은 동시 실행 수(workers)만큼으로 제한됩니다.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+
+def split_windows(num_samples: int, chunk_size: int, overlap: int) -> list:
+    """
+    [0, num_samples) 를 overlap 만큼 겹치는 (start, end) 윈도우 목록으로 나눕니다.
+    chunk_size 가 overlap 보다 커야 윈도우가 앞으로 진행합니다.
+    """
+    if overlap < 0 or chunk_size <= overlap:
+        raise ValueError(
+            f"chunk_size ({chunk_size}) must be greater than overlap ({overlap}) "
+            "(DEMUCS_CHUNK_SECONDS > DEMUCS_CHUNK_OVERLAP_SECONDS >= 0)"
+        )
+    if num_samples <= chunk_size:
+        return [(0, num_samples)]
+
+    stride = chunk_size - overlap
+    windows = []
+    start = 0
+    while True:
+        end = min(start + chunk_size, num_samples)
+        windows.append((start, end))
+        if end >= num_samples:
+            break
+        start += stride
+    return windows
+
+
+def crossfade_weights(start: int, end: int, num_samples: int, overlap: int) -> np.ndarray:
+    """
+    윈도우 양 끝의 겹침 구간에 선형 램프를 적용한 가중치.
+    트랙의 시작/끝 경계에서는 램프를 적용하지 않습니다.
+    """
+    length = end - start
+    weights = np.ones(length, dtype=np.float32)
+    ramp_len = min(overlap, length)
+    if ramp_len > 0:
+        ramp = np.linspace(0.0, 1.0, ramp_len + 2, dtype=np.float32)[1:-1]
+        if start > 0:
+            weights[:ramp_len] = ramp
+        if end < num_samples:
+            weights[-ramp_len:] = np.minimum(weights[-ramp_len:], ramp[::-1])
+    return weights
+
+
+class OverlapAdd:
+    """
+    청크 결과([channels, chunk_samples])를 도착 순서와 관계없이 누적하는 crossfade overlap-add 버퍼.
+    """
+
+    def __init__(self, channels: int, num_samples: int, overlap: int):
+        self.num_samples = num_samples
+        self.overlap = overlap
+        self.output = np.zeros((channels, num_samples), dtype=np.float32)
+        self.total_weight = np.zeros(num_samples, dtype=np.float32)
+
+    def add(self, chunk: np.ndarray, start: int, end: int) -> None:
+        weights = crossfade_weights(start, end, self.num_samples, self.overlap)
+        self.output[:, start:end] += chunk * weights
+        self.total_weight[start:end] += weights
+
+    def result(self) -> np.ndarray:
+        self.output /= np.maximum(self.total_weight, 1e-8)
+        return self.output
+
+
+def overlap_add(chunks: list, windows: list, num_samples: int, overlap: int) -> np.ndarray:
+    """
+    청크별 분리 결과([channels, chunk_samples])를 crossfade overlap-add 로 이어붙입니다.
+    """
+    buffer = OverlapAdd(chunks[0].shape[0], num_samples, overlap)
+    for chunk, (start, end) in zip(chunks, windows):
+        buffer.add(chunk, start, end)
+    return buffer.result()
+
+
+def run_chunks(run_chunk, windows: list, num_samples: int, overlap: int, workers: int = 1) -> dict:
+    """
+    윈도우마다 run_chunk(start, end) -> {stem 이름: [channels, samples]} 를 최대 workers 개씩 동시에 실행하고,
+    끝난 청크부터 stem 별 OverlapAdd 버퍼에 더합니다. Returns {stem 이름: [channels, num_samples]}
+    """
+    buffers = {}
+    pending = {}
+    remaining = iter(windows)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+
+        def _submit_next():
+            window = next(remaining, None)
+            if window is not None:
+                pending[executor.submit(run_chunk, *window)] = window
+
+        for _ in range(max(1, workers)):
+            _submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = pending.pop(future)
+                for name, chunk in future.result().items():
+                    if name not in buffers:
+                        buffers[name] = OverlapAdd(chunk.shape[0], num_samples, overlap)
+                    buffers[name].add(chunk, start, end)
+                _submit_next()
+
+    return {name: buffer.result() for name, buffer in buffers.items()}
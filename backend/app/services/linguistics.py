@@ -1,76 +1,257 @@
+import hashlib
 import json
+import random
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
 import google.generativeai as genai
 from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.services.result_cache import get_result_cache, make_key
+
+# 라인 단위 번역 캐시 키: (정규화된 라인, 원어, 목표어 또는 romanized, 모델) 해시
+LINE_CACHE_KEY = "linecache:{digest}"
+
+
+ROMANIZED = "romanized"
+
 
-def translate_and_romanize(lyrics_segments: list, target_lang: str = "ko") -> list:
+def translate_and_romanize(
+    lyrics_segments: list,
+    target_langs=("ko",),
+    cache_key: str = None,
+    source_lang: str = None,
+) -> list:
     """
-    Translates lyrics and adds romanization using Google Gemini.
+    Translates lyrics into every target language and adds romanization using Google Gemini.
+    cache_key 가 주어지면 결과 캐시(translation 단계)를 먼저 조회하고, 성공한 결과만 저장합니다.
+
+    - 로마자 발음은 목표 언어와 무관하므로 한 번만 생성합니다.
+    - 목표 언어별 번역은 모두 동시에 요청하며, segment["translations"][lang] 에 저장합니다.
+      segment["translated"] 는 첫 번째 목표 언어 번역입니다 (기존 호환).
+    - 곡 안에서 중복되는 라인(후렴 등)은 한 번만 요청합니다.
+    - 라인 단위 영구 캐시(Redis)에 있는 라인은 요청하지 않습니다.
+    - 나머지 라인은 일정 크기 청크로 나누어 동시에 요청하며, 청크별로 재시도/백오프합니다.
+      실패한 청크만 mock 텍스트로 대체됩니다.
     """
+    if isinstance(target_langs, str):
+        target_langs = [target_langs]
+    target_langs = list(dict.fromkeys(target_langs)) or ["ko"]
+
     if not settings.GEMINI_API_KEY:
         print("Warning: GEMINI_API_KEY not found. Returning original lyrics without translation.")
-        return _add_mock_translation(lyrics_segments)
+        return _add_mock_translation(lyrics_segments, target_langs)
 
-    try:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        model = genai.GenerativeModel('gemini-pro')
+    # We only send text to save tokens, then map back to segments
+    lines = [seg['text'].strip() for seg in lyrics_segments]
+
+    # If no lyrics, return empty
+    if not lines:
+        return lyrics_segments
+
+    # 필드별 결과: ROMANIZED 또는 목표 언어 코드 → 라인별 텍스트 목록
+    fields = [ROMANIZED] + target_langs
+    results = {}
+
+    # 1. 곡 단위 결과 캐시 (필드별로 저장되므로 언어가 추가되어도 기존 결과 재사용)
+    cache = get_result_cache() if cache_key else None
+    field_keys = {}
+    if cache:
+        for field in fields:
+            field_keys[field] = make_key(cache_key, field=field, model=settings.GEMINI_MODEL)
+            cached = cache.get_json("translation", field_keys[field])
+            if cached and len(cached) == len(lines):
+                results[field] = cached
+
+    pending_fields = [field for field in fields if field not in results]
+    if pending_fields:
+        try:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            model = genai.GenerativeModel(settings.GEMINI_MODEL)
+            processed, failed_fields = _process_fields(model, lines, pending_fields, source_lang)
+            results.update(processed)
+            if cache:
+                for field in pending_fields:
+                    if field not in failed_fields:
+                        cache.put_json("translation", field_keys[field], processed[field])
+        except Exception as e:
+            print(f"Error during Gemini processing: {e}")
+            return _add_mock_translation(lyrics_segments, target_langs)
+
+    # 2. Merge back into segments
+    for i, segment in enumerate(lyrics_segments):
+        segment["romanized"] = results[ROMANIZED][i]
+        segment["translations"] = {lang: results[lang][i] for lang in target_langs}
+        segment["translated"] = segment["translations"][target_langs[0]]
+
+    return lyrics_segments
+
+
+def _process_fields(model, lines: list, fields: list, source_lang: str) -> tuple:
+    """
+    여러 필드(로마자 + 목표 언어들)의 라인을 하나의 스레드 풀에서 동시에 처리합니다.
+    Returns ({field: [text per line]}, failed_fields)
+    """
+    plans = {}
+    jobs = []
+    for field in fields:
+        # 곡 내 중복 제거 (정규화된 라인 기준, 첫 등장 라인을 대표로 사용)
+        line_keys = [_line_cache_key(line, source_lang, field) for line in lines]
+        unique = {}
+        for key, line in zip(line_keys, lines):
+            unique.setdefault(key, line)
 
-        # Prepare payload for LLM
-        # We only send text to save tokens, then map back to segments
-        lines = [seg['text'].strip() for seg in lyrics_segments]
+        # 라인 캐시 조회 (MGET 한 번)
+        values = _get_cached_lines(list(unique.keys()))
+        missing = [key for key in unique if key not in values]
+        print(
+            f"Linguistics[{field}]: {len(lines)} lines, {len(unique)} unique, "
+            f"{len(unique) - len(missing)} cached, {len(missing)} to request"
+        )
 
-        # If no lyrics, return empty
-        if not lines:
-            return lyrics_segments
+        plans[field] = {"line_keys": line_keys, "values": values}
+        chunk_size = max(settings.LINGUISTICS_CHUNK_SIZE, 1)
+        for i in range(0, len(missing), chunk_size):
+            keys = missing[i : i + chunk_size]
+            jobs.append((field, keys, [unique[key] for key in keys]))
 
-        prompt = f"""
+    failed_fields = set()
+    if jobs:
+        workers = max(1, min(settings.LINGUISTICS_CONCURRENCY, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = executor.map(
+                lambda job: _request_chunk(model, job[2], job[0]), jobs
+            )
+            for (field, keys, _), response in zip(jobs, responses):
+                if response is None:
+                    failed_fields.add(field)
+                    continue
+                chunk_values = dict(zip(keys, response))
+                plans[field]["values"].update(chunk_values)
+                _set_cached_lines(chunk_values)
+
+    results = {}
+    for field, plan in plans.items():
+        texts = []
+        for key, line in zip(plan["line_keys"], lines):
+            value = plan["values"].get(key)
+            if value is None:
+                # 재시도 후에도 실패한 청크의 라인만 mock 으로 대체
+                prefix = "[Rom]" if field == ROMANIZED else "[Trans]"
+                value = f"{prefix} {line}"
+            texts.append(value)
+        results[field] = texts
+    return results, failed_fields
+
+
+def _request_chunk(model, lines: list, field: str):
+    """
+    라인 청크 하나를 번역(또는 로마자 변환)합니다. 응답 JSON 이 깨졌거나 라인 수가 맞지 않으면
+    지수 백오프(+jitter)로 재시도하고, 끝내 실패하면 None 을 반환합니다.
+    Returns [text, ...] (lines 와 같은 순서)
+    """
+    if field == ROMANIZED:
+        task = "Provide Romanization (pronunciation in Latin letters) for each original line."
+    else:
+        task = (
+            f"Translate each lyrics line into {field}. "
+            "Maintain the poetic rhythm and syllable count as much as possible."
+        )
+
+    prompt = f"""
         You are a professional lyricist translator.
-        1. Translate the following lyrics lines into {target_lang}.
-        2. Provide Romanization (pronunciation) for the original text.
-        3. Maintain the poetic rhythm and syllable count as much as possible.
+        {task}
 
         Input Lyrics:
         {json.dumps(lines, ensure_ascii=False)}
 
-        Output must be a valid JSON array of objects with keys: "original", "translated", "romanized".
+        Output must be a valid JSON array with exactly {len(lines)} objects, in the same order,
+        with keys: "original", "output".
         Example:
         [
-            {{"original": "Hello", "translated": "안녕", "romanized": "Hello"}}
+            {{"original": "Hello", "output": "안녕"}}
         ]
         """
 
-        response = model.generate_content(prompt)
+    for attempt in range(settings.LINGUISTICS_MAX_RETRIES + 1):
+        try:
+            response = model.generate_content(prompt)
+            processed_data = _parse_json_response(response.text)
+            if not isinstance(processed_data, list) or len(processed_data) != len(lines):
+                raise ValueError(
+                    f"Misaligned response: expected {len(lines)} items, got "
+                    f"{len(processed_data) if isinstance(processed_data, list) else type(processed_data).__name__}"
+                )
+            return [str(data.get("output", "")) for data in processed_data]
+        except Exception as e:
+            if attempt >= settings.LINGUISTICS_MAX_RETRIES:
+                print(f"Gemini chunk ({field}) failed after {attempt + 1} attempts: {e}")
+                return None
+            delay = settings.LINGUISTICS_RETRY_BASE_DELAY * (2**attempt)
+            delay += random.uniform(0, delay / 2)
+            print(f"Gemini chunk ({field}) attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
 
-        # Parse JSON from response
-        # Gemini sometimes adds markdown code blocks, strip them
-        clean_text = response.text.strip()
-        if clean_text.startswith("```json"):
-            clean_text = clean_text[7:]
-        if clean_text.endswith("```"):
-            clean_text = clean_text[:-3]
 
-        processed_data = json.loads(clean_text)
+def _parse_json_response(text: str):
+    # Gemini sometimes adds markdown code blocks, strip them
+    clean_text = text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    elif clean_text.startswith("```"):
+        clean_text = clean_text[3:]
+    if clean_text.endswith("```"):
+        clean_text = clean_text[:-3]
+    return json.loads(clean_text)
 
-        # Merge back into segments
-        # Assuming LLM returns 1:1 mapping. If not, we might need heuristic matching.
-        # For robustness, we iterate through min length
 
-        for i, segment in enumerate(lyrics_segments):
-            if i < len(processed_data):
-                data = processed_data[i]
-                segment["translated"] = data.get("translated", "")
-                segment["romanized"] = data.get("romanized", "")
-            else:
-                segment["translated"] = ""
-                segment["romanized"] = ""
+def _normalize_line(line: str) -> str:
+    return unicodedata.normalize("NFKC", " ".join(line.split())).casefold()
 
-        return lyrics_segments
 
+def _line_cache_key(line: str, source_lang: str, field: str) -> str:
+    """
+    field 는 목표 언어 코드 또는 ROMANIZED 입니다.
+    """
+    payload = json.dumps(
+        [_normalize_line(line), source_lang or "", field, settings.GEMINI_MODEL],
+        ensure_ascii=False,
+    )
+    return LINE_CACHE_KEY.format(digest=hashlib.sha256(payload.encode()).hexdigest())
+
+
+def _get_cached_lines(keys: list) -> dict:
+    """
+    MGET 한 번으로 캐시된 라인 번역을 가져옵니다. Returns {key: translation}
+    """
+    if not keys:
+        return {}
+    try:
+        values = get_redis_client().mget(keys)
     except Exception as e:
-        print(f"Error during Gemini processing: {e}")
-        return _add_mock_translation(lyrics_segments)
+        print(f"Line cache lookup failed: {e}")
+        return {}
+    return {key: json.loads(value) for key, value in zip(keys, values) if value}
+
+
+def _set_cached_lines(translations: dict) -> None:
+    try:
+        pipe = get_redis_client().pipeline()
+        for key, data in translations.items():
+            pipe.set(
+                key,
+                json.dumps(data, ensure_ascii=False),
+                ex=settings.LINGUISTICS_LINE_CACHE_TTL,
+            )
+        pipe.execute()
+    except Exception as e:
+        print(f"Line cache update failed: {e}")
+
 
-def _add_mock_translation(segments: list) -> list:
+def _add_mock_translation(segments: list, target_langs=("ko",)) -> list:
     for seg in segments:
-        seg["translated"] = f"[Trans] {seg['text']}"
+        seg["translations"] = {lang: f"[Trans] {seg['text']}" for lang in target_langs}
+        seg["translated"] = seg["translations"][target_langs[0]]
         seg["romanized"] = f"[Rom] {seg['text']}"
     return segments
@@ -1,38 +1,234 @@
+"""
+미디어 다운로드 (yt-dlp) + 다운로드 캐시
+
+- 재인코딩 없음: bestaudio 스트림을 원래 컨테이너(m4a / webm 등) 그대로 저장합니다.
+  디코딩은 separation 단계에서 ffmpeg 로 한 번만 수행되므로 MP3 변환은 손실 + 시간 낭비였습니다.
+- 캐시 키: 추출기(extractor) 의 영상 id ("Youtube:<id>").
+  youtu.be / watch?v= / shorts 등 URL 형태가 달라도 같은 키가 되며, URL 에서 바로 계산하므로 네트워크 요청이 없습니다.
+  추출기가 id 를 알 수 없는 URL 은 URL 해시로 대신합니다.
+- 저장: 다운로드한 파일은 산출물 저장소(artifacts) 의 blob 이 되고, Redis 인덱스가 키 -> ref 를 가리킵니다.
+  가짜 작업 "download:<키>" 가 blob 참조를 잡고 있어, 마지막 사용 후 DOWNLOAD_CACHE_TTL 동안 GC 되지 않습니다
+  (용량 상한 초과 시에는 종료된 작업과 같은 순서로 먼저 해제될 수 있음).
+- 동시 요청: 같은 키의 다운로드는 Redis 락으로 하나만 실행하고, 나머지는 끝날 때까지 기다린 뒤 결과를 공유합니다.
+- 통계: downloads:stats HASH (hits / coalesced / misses / bytes_downloaded / bytes_saved)
+"""
+
+import functools
+import hashlib
 import os
+import shutil
+import tempfile
+import time
+
 import yt_dlp
+from redis.exceptions import LockError
+
 from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.services import artifacts
+
+DOWNLOAD_KEY = "downloads:source:{key}"  # STRING: 캐시 키 -> 산출물 ref
+DOWNLOAD_LOCK = "downloads:lock:{key}"
+DOWNLOAD_STATS = "downloads:stats"
+HOLDER_JOB = "download:{key}"  # 캐시 blob 참조를 유지하는 가짜 작업 id
+
+
+@functools.lru_cache(maxsize=1)
+def _extractor_classes() -> tuple:
+    """
+    전용 추출기 목록 (프로세스당 한 번 생성). 모든 URL 에 맞는 Generic 은 제외하고
+    canonical_key 가 마지막에 URL 해시로 대신합니다.
+    """
+    return tuple(
+        ie for ie in yt_dlp.extractor.gen_extractor_classes() if ie.ie_key() != "Generic"
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def canonical_key(url: str) -> str:
+    """
+    URL 을 처리할 추출기와 영상 id 로 캐시 키를 만듭니다 (네트워크 요청 없음).
+    """
+    url = url.strip()
+    for ie in _extractor_classes():
+        if not ie.suitable(url):
+            continue
+        video_id = ie.get_temp_id(url)
+        if video_id:
+            return f"{ie.ie_key()}:{video_id}"
+        break
+    return f"url:{hashlib.sha256(url.encode()).hexdigest()}"
 
 
-def download_media(url: str, output_dir: str = None) -> str:
+def download_media(url: str, output_dir: str = None) -> tuple:
     """
-    Downloads media from a URL using yt-dlp.
-    Returns the path to the downloaded file.
+    Downloads the best audio stream from a URL using yt-dlp (no re-encode).
+    Returns (file_path, info) - info: {"key", "bytes", "download_seconds", "transcode_seconds"}
+    transcode_seconds 는 yt-dlp 후처리(컨테이너 fixup 등) 시간입니다.
     """
     if output_dir is None:
         output_dir = os.path.join(settings.TEMP_DIR, "downloads")
 
     os.makedirs(output_dir, exist_ok=True)
 
+    downloaded_bytes = 0
+    postprocess_started = {}
+    transcode_seconds = 0.0
+
+    def on_progress(d):
+        nonlocal downloaded_bytes
+        if d["status"] == "finished":
+            downloaded_bytes += d.get("downloaded_bytes") or d.get("total_bytes") or 0
+
+    def on_postprocess(d):
+        nonlocal transcode_seconds
+        if d["status"] == "started":
+            postprocess_started[d["postprocessor"]] = time.perf_counter()
+        elif d["status"] == "finished" and d["postprocessor"] in postprocess_started:
+            transcode_seconds += time.perf_counter() - postprocess_started.pop(d["postprocessor"])
+
     ydl_opts = {
         "format": "bestaudio/best",
-        "postprocessors": [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "192",
-            }
-        ],
         "outtmpl": os.path.join(output_dir, "%(id)s.%(ext)s"),
+        "progress_hooks": [on_progress],
+        "postprocessor_hooks": [on_postprocess],
         "quiet": True,
         "no_warnings": True,
     }
 
+    started = time.perf_counter()
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info_dict = ydl.extract_info(url, download=True)
-        video_id = info_dict.get("id", None)
-        ext = "mp3"  # Since we convert to mp3
+        downloads = info_dict.get("requested_downloads") or []
+        if downloads and downloads[0].get("filepath"):
+            file_path = downloads[0]["filepath"]
+        else:
+            file_path = ydl.prepare_filename(info_dict)
+
+    extractor, video_id = info_dict.get("extractor_key"), info_dict.get("id")
+    return file_path, {
+        "key": f"{extractor}:{video_id}" if extractor and video_id else None,
+        "bytes": downloaded_bytes or os.path.getsize(file_path),
+        "download_seconds": round(time.perf_counter() - started - transcode_seconds, 3),
+        "transcode_seconds": round(transcode_seconds, 3),
+    }
+
+
+def fetch_to_artifacts(job_id: str, url: str, name: str = "original", redis_client=None) -> tuple:
+    """
+    URL 의 미디어를 작업 job_id 의 산출물 name 으로 등록합니다.
+    캐시에 있으면 다운로드 없이 기존 blob 을 참조하고, 같은 URL 을 다른 워커가 받는 중이면 기다립니다.
+    Returns (ref, metrics) - metrics["cache"]: hit | coalesced | miss | disabled
+    """
+    if not settings.DOWNLOAD_CACHE_ENABLED:
+        ref, metrics = _download(job_id, url, name)
+        return ref, {**metrics, "cache": "disabled"}
+
+    redis_client = redis_client or get_redis_client()
+    key = canonical_key(url)
+    started = time.perf_counter()
+
+    ref = _lookup(redis_client, key, job_id, name)
+    if ref:
+        return ref, _record_hit(redis_client, key, ref, "hit", started)
+
+    # 같은 키의 다운로드는 하나만 실행 (락 만료 = 다운로드 최대 시간)
+    lock = redis_client.lock(
+        DOWNLOAD_LOCK.format(key=key),
+        timeout=settings.DOWNLOAD_LOCK_TIMEOUT,
+        blocking_timeout=settings.DOWNLOAD_LOCK_TIMEOUT,
+    )
+    waited = not lock.acquire(blocking=False)
+    acquired = not waited or lock.acquire()
+    if not acquired:
+        print(f"[Downloader] Timed out waiting for in-flight download of {key}, downloading anyway")
+    try:
+        ref = _lookup(redis_client, key, job_id, name)
+        if ref:
+            return ref, _record_hit(
+                redis_client, key, ref, "coalesced" if waited else "hit", started
+            )
+
+        ref, metrics = _download(job_id, url, name, redis_client)
+        # 다운로드 후 알게 된 추출기 id 로도 인덱스 (URL 해시 키로 받은 경우 등)
+        for cache_key in {key, metrics.pop("key")} - {None}:
+            _index(redis_client, cache_key, ref)
+        pipe = redis_client.pipeline()
+        pipe.hincrby(DOWNLOAD_STATS, "misses", 1)
+        pipe.hincrby(DOWNLOAD_STATS, "bytes_downloaded", metrics["bytes"])
+        pipe.execute()
+        return ref, {**metrics, "cache": "miss", "key": key}
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except LockError:
+                pass  # 다운로드가 락 만료보다 오래 걸림
+
+
+def stats(redis_client=None) -> dict:
+    raw = (redis_client or get_redis_client()).hgetall(DOWNLOAD_STATS) or {}
+    return {
+        field: int(raw.get(field, 0))
+        for field in ("hits", "coalesced", "misses", "bytes_downloaded", "bytes_saved")
+    }
+
 
-        filename = f"{video_id}.{ext}"
-        file_path = os.path.join(output_dir, filename)
+# ===== 내부 구현 =====
 
-        return file_path
+
+def _download(job_id: str, url: str, name: str, redis_client=None) -> tuple:
+    # 작업마다 별도 디렉터리 (다른 노드의 같은 id 다운로드와 파일 이름이 겹치지 않도록)
+    downloads_dir = os.path.join(settings.TEMP_DIR, "downloads")
+    os.makedirs(downloads_dir, exist_ok=True)
+    output_dir = tempfile.mkdtemp(dir=downloads_dir)
+    try:
+        file_path, info = download_media(url, output_dir)
+        ref = artifacts.put_file(job_id, file_path, name, move=True, redis_client=redis_client)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    print(
+        f"[Downloader] Downloaded {info['key']} ({info['bytes']} bytes, "
+        f"{info['download_seconds']}s, transcode {info['transcode_seconds']}s)"
+    )
+    return ref, {**info, "size": artifacts.artifact_size(ref, redis_client)}
+
+
+def _lookup(redis_client, key: str, job_id: str, name: str):
+    """
+    캐시된 blob 을 작업에 등록하고 ref 를 반환합니다. 없거나 GC 된 blob 이면 None.
+    """
+    index_key = DOWNLOAD_KEY.format(key=key)
+    ref = redis_client.get(index_key)
+    if not ref:
+        return None
+    if not artifacts.attach(job_id, name, ref, redis_client=redis_client):
+        redis_client.delete(index_key)
+        return None
+    return ref
+
+
+def _index(redis_client, key: str, ref: str) -> None:
+    # 가짜 작업이 참조를 잡고, 사용할 때마다 해제 시각을 DOWNLOAD_CACHE_TTL 뒤로 미룸
+    holder = HOLDER_JOB.format(key=key)
+    artifacts.attach(holder, "original", ref, redis_client=redis_client)
+    artifacts.release_job(holder, ttl=settings.DOWNLOAD_CACHE_TTL, redis_client=redis_client)
+    redis_client.set(DOWNLOAD_KEY.format(key=key), ref, ex=settings.DOWNLOAD_CACHE_TTL)
+
+
+def _record_hit(redis_client, key: str, ref: str, cache: str, started: float) -> dict:
+    _index(redis_client, key, ref)
+    size = artifacts.artifact_size(ref, redis_client)
+    pipe = redis_client.pipeline()
+    pipe.hincrby(DOWNLOAD_STATS, "hits" if cache == "hit" else "coalesced", 1)
+    pipe.hincrby(DOWNLOAD_STATS, "bytes_saved", size)
+    pipe.execute()
+    print(f"[Downloader] Cache {cache}: {key} -> {ref}")
+    return {
+        "cache": cache,
+        "key": key,
+        "bytes": 0,
+        "size": size,
+        "download_seconds": round(time.perf_counter() - started, 3),
+        "transcode_seconds": 0.0,
+    }
@@ -0,0 +1,110 @@
+"""
+워커 프로세스 단위 모델 레지스트리
+
+Celery 워커 프로세스가 살아있는 동안 무거운 ML 모델(Whisper, 정렬 모델, Demucs 등)을
+메모리에 유지하여, 작업마다 디스크에서 모델을 다시 로드하는 비용을 없앱니다.
+
+- 단일 모델: `get()` 으로 이름별 1개 인스턴스를 유지합니다.
+- LRU 풀: `get_lru()` 로 언어별 정렬 모델처럼 키가 여러 개인 모델을 크기 제한과 함께 유지합니다.
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+
+class ModelRegistry:
+    """
+    프로세스 전역 모델 캐시.
+    반환값은 항상 (model, load_seconds) 튜플이며, 캐시 히트 시 load_seconds 는 0 입니다.
+    """
+
+    def __init__(self):
+        self._models: dict = {}
+        self._pools: dict = {}
+        self._lock = threading.RLock()
+
+    def get(self, name: str, loader: Callable[[], Any]) -> Tuple[Any, float]:
+        """
+        이름으로 모델을 조회하고, 없으면 loader 로 로드하여 보관합니다.
+        """
+        with self._lock:
+            if name in self._models:
+                return self._models[name], 0.0
+
+            started = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - started
+            self._models[name] = model
+            print(f"[ModelRegistry] Loaded '{name}' in {load_seconds:.2f}s")
+            return model, load_seconds
+
+    def get_lru(
+        self,
+        pool: str,
+        key: Hashable,
+        loader: Callable[[], Any],
+        max_size: int,
+    ) -> Tuple[Any, float]:
+        """
+        LRU 풀에서 모델을 조회합니다. 풀 크기가 max_size 를 넘으면
+        가장 오래 사용되지 않은 모델을 제거(evict)합니다.
+        """
+        with self._lock:
+            entries = self._pools.setdefault(pool, OrderedDict())
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key], 0.0
+
+            started = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - started
+            entries[key] = model
+            print(f"[ModelRegistry] Loaded '{pool}:{key}' in {load_seconds:.2f}s")
+
+            evicted = False
+            while len(entries) > max(max_size, 1):
+                old_key, _ = entries.popitem(last=False)
+                print(f"[ModelRegistry] Evicted '{pool}:{old_key}'")
+                evicted = True
+
+            if evicted:
+                _release_memory()
+
+            return model, load_seconds
+
+    def loaded(self) -> dict:
+        """
+        현재 로드된 모델 목록 (디버깅/메트릭 용도)
+        """
+        with self._lock:
+            return {
+                "models": list(self._models.keys()),
+                "pools": {name: list(p.keys()) for name, p in self._pools.items()},
+            }
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._pools.clear()
+        _release_memory()
+
+
+def _release_memory():
+    """
+    제거된 모델의 메모리를 즉시 반환합니다 (GPU 사용 시 CUDA 캐시 포함).
+    """
+    gc.collect()
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+# 워커 프로세스마다 하나씩 존재하는 전역 레지스트리
+registry = ModelRegistry()
@@ -0,0 +1,274 @@
+"""
+콘텐츠 주소 기반(Content-addressed) 결과 캐시
+
+같은 곡이 반복 제출될 때 Demucs / WhisperX / Gemini 를 다시 실행하지 않도록,
+디코딩된 PCM 의 해시 + 모델 이름 + 파라미터를 키로 단계별 결과를 저장합니다.
+
+- 데이터: 로컬 디스크 (RESULT_CACHE_DIR/<stage>/<key>/)
+- 인덱스: Redis (마지막 접근 시각 ZSET + 엔트리 크기 HASH) → 용량 기준 LRU 제거
+- 통계: 단계별 hit / miss / bytes_saved (Redis HASH)
+- 원본 파일 해시 → separation 키 매핑: 이미 처리한 파일은 디코딩 없이 캐시를 찾습니다.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+
+INDEX_KEY = "cache:index"  # ZSET: "<stage>/<key>" -> 마지막 접근 시각
+SIZE_KEY = "cache:sizes"  # HASH: "<stage>/<key>" -> bytes
+TOTAL_KEY = "cache:total_bytes"
+STATS_KEY = "cache:stats:{stage}"  # HASH: hits, misses, bytes_saved
+SOURCE_KEY = "cache:source:{key}"  # STRING: make_key(원본 파일 해시, 파라미터) -> separation 키
+SOURCES_KEY = "cache:sources:{key}"  # SET: separation 키 -> 이를 가리키는 SOURCE_KEY 들 (제거 시 함께 삭제)
+
+STAGES = ("separation", "transcription", "translation")
+
+# 설정으로 드러나지 않는 전사 로직(청크 분할, 언어 감지 등)이 바뀌면 올림 → 이전 전사 캐시 무효화
+TRANSCRIPTION_VERSION = 2
+
+
+def hash_audio_content(audio: np.ndarray, sample_rate: int) -> str:
+    """
+    디코딩된 PCM 배열([channels, samples] float32)을 해시합니다.
+    컨테이너/메타데이터가 달라도 같은 오디오면 같은 해시가 됩니다.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{audio.shape[0]}:{audio.dtype}:{sample_rate}".encode())
+    digest.update(np.ascontiguousarray(audio).data)
+    return digest.hexdigest()
+
+
+def hash_file(path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    원본 파일 바이트의 SHA-256 (청크 업로드 시 계산되는 해시와 동일).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(content_hash: str, **params) -> str:
+    """
+    콘텐츠 해시와 모델/파라미터 조합으로 캐시 키를 생성합니다.
+    """
+    payload = json.dumps({"content": content_hash, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def transcription_params(language: str = None) -> dict:
+    """
+    전사 결과에 영향을 주는 설정 전체 (transcription 캐시 키 파라미터).
+    VAD / 청크 분할 / 배치 설정을 바꾸면 키가 달라져 이전 설정의 전사 결과를 재사용하지 않습니다.
+    """
+    return {
+        "version": TRANSCRIPTION_VERSION,
+        "model": settings.WHISPER_MODEL,
+        "language": language,
+        "batching": settings.TRANSCRIPTION_BATCHING,
+        "batch_size": settings.WHISPER_BATCH_SIZE,
+        "vad": {
+            "enabled": settings.VAD_ENABLED,
+            "frame_ms": settings.VAD_FRAME_MS,
+            "hop_ms": settings.VAD_HOP_MS,
+            "threshold_db": settings.VAD_THRESHOLD_DB,
+            "relative_db": settings.VAD_RELATIVE_DB,
+            "min_speech_seconds": settings.VAD_MIN_SPEECH_SECONDS,
+            "min_silence_seconds": settings.VAD_MIN_SILENCE_SECONDS,
+            "pad_seconds": settings.VAD_PAD_SECONDS,
+            "split_search_seconds": settings.VAD_SPLIT_SEARCH_SECONDS,
+        },
+    }
+
+
+class ResultCache:
+    def __init__(self, root: str = None, max_bytes: int = None, redis_client=None):
+        self.root = root or settings.RESULT_CACHE_DIR or os.path.join(
+            settings.TEMP_DIR, "cache"
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else settings.RESULT_CACHE_MAX_BYTES
+        self.redis = redis_client or get_redis_client()
+
+    # ===== 조회 =====
+
+    def get_files(self, stage: str, key: str, record_miss: bool = True) -> Optional[dict]:
+        """
+        캐시된 파일 경로 dict 를 반환합니다. 없으면 None (miss).
+        record_miss=False: miss 면 다른 키로 다시 조회하는 경우 (단계마다 miss 는 한 번만 집계)
+        """
+        entry_dir = self._entry_dir(stage, key)
+        manifest = self._read_manifest(entry_dir)
+        if manifest is None or not all(
+            os.path.exists(os.path.join(entry_dir, name)) for name in manifest["files"].values()
+        ):
+            if record_miss:
+                self._record(stage, hit=False)
+            return None
+
+        self._touch(stage, key)
+        self._record(stage, hit=True, size=manifest["size"])
+        return {
+            field: os.path.join(entry_dir, name)
+            for field, name in manifest["files"].items()
+        }
+
+    def get_json(self, stage: str, key: str) -> Optional[dict]:
+        entry_dir = self._entry_dir(stage, key)
+        manifest = self._read_manifest(entry_dir)
+        if manifest is None or "data" not in manifest:
+            self._record(stage, hit=False)
+            return None
+
+        self._touch(stage, key)
+        self._record(stage, hit=True, size=manifest["size"])
+        return manifest["data"]
+
+    # ===== 저장 =====
+
+    def put_files(self, stage: str, key: str, files: dict) -> dict:
+        """
+        {field: source_path} 파일들을 캐시에 복사하고 캐시 내 경로를 반환합니다.
+        """
+        entry_dir = self._entry_dir(stage, key)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        stored = {}
+        size = 0
+        for field, src in files.items():
+            name = f"{field}{os.path.splitext(src)[1]}"
+            dst = os.path.join(entry_dir, name)
+            if os.path.abspath(src) != os.path.abspath(dst):
+                shutil.copyfile(src, dst)
+            stored[field] = name
+            size += os.path.getsize(dst)
+
+        self._write_manifest(entry_dir, {"files": stored, "size": size})
+        self._index(stage, key, size)
+        return {field: os.path.join(entry_dir, name) for field, name in stored.items()}
+
+    def put_json(self, stage: str, key: str, data) -> None:
+        entry_dir = self._entry_dir(stage, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        size = len(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        self._write_manifest(entry_dir, {"files": {}, "data": data, "size": size})
+        self._index(stage, key, size)
+
+    # ===== 원본 파일 매핑 =====
+
+    def get_source_key(self, source_key: str) -> Optional[str]:
+        return self.redis.get(SOURCE_KEY.format(key=source_key))
+
+    def put_source_key(self, source_key: str, separation_key: str) -> None:
+        """
+        저장된 separation 엔트리에만 연결합니다. 엔트리가 제거되면 매핑도 함께 삭제됩니다 (_evict).
+        """
+        pipe = self.redis.pipeline()
+        pipe.set(SOURCE_KEY.format(key=source_key), separation_key)
+        pipe.sadd(SOURCES_KEY.format(key=separation_key), source_key)
+        pipe.execute()
+
+    # ===== 통계 =====
+
+    def stats(self) -> dict:
+        result = {}
+        for stage in STAGES:
+            raw = self.redis.hgetall(STATS_KEY.format(stage=stage)) or {}
+            result[stage] = {
+                "hits": int(raw.get("hits", 0)),
+                "misses": int(raw.get("misses", 0)),
+                "bytes_saved": int(raw.get("bytes_saved", 0)),
+            }
+        result["total_bytes"] = int(self.redis.get(TOTAL_KEY) or 0)
+        result["max_bytes"] = self.max_bytes
+        result["entries"] = self.redis.zcard(INDEX_KEY)
+        return result
+
+    # ===== 내부 구현 =====
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key)
+
+    def _read_manifest(self, entry_dir: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(entry_dir, "manifest.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_manifest(self, entry_dir: str, manifest: dict) -> None:
+        # 임시 파일에 쓰고 rename 하여 다른 워커가 반쯤 쓰인 manifest 를 읽지 않도록 함
+        tmp_path = os.path.join(entry_dir, f"manifest.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(entry_dir, "manifest.json"))
+
+    def _touch(self, stage: str, key: str) -> None:
+        self.redis.zadd(INDEX_KEY, {f"{stage}/{key}": time.time()})
+
+    def _record(self, stage: str, hit: bool, size: int = 0) -> None:
+        stats_key = STATS_KEY.format(stage=stage)
+        pipe = self.redis.pipeline()
+        if hit:
+            pipe.hincrby(stats_key, "hits", 1)
+            pipe.hincrby(stats_key, "bytes_saved", size)
+        else:
+            pipe.hincrby(stats_key, "misses", 1)
+        pipe.execute()
+
+    def _index(self, stage: str, key: str, size: int) -> None:
+        member = f"{stage}/{key}"
+        previous = int(self.redis.hget(SIZE_KEY, member) or 0)
+        pipe = self.redis.pipeline()
+        pipe.zadd(INDEX_KEY, {member: time.time()})
+        pipe.hset(SIZE_KEY, member, size)
+        pipe.incrby(TOTAL_KEY, size - previous)
+        pipe.execute()
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        총 용량이 max_bytes 를 넘으면 가장 오래 접근되지 않은 엔트리부터 삭제합니다.
+        """
+        while int(self.redis.get(TOTAL_KEY) or 0) > self.max_bytes:
+            oldest = self.redis.zpopmin(INDEX_KEY, 1)
+            if not oldest:
+                break
+            member = oldest[0][0]
+            size = int(self.redis.hget(SIZE_KEY, member) or 0)
+            stage, key = member.split("/", 1)
+            sources = SOURCES_KEY.format(key=key)
+            pipe = self.redis.pipeline()
+            pipe.hdel(SIZE_KEY, member)
+            pipe.decrby(TOTAL_KEY, size)
+            if stage == "separation":
+                for source_key in self.redis.smembers(sources):
+                    pipe.delete(SOURCE_KEY.format(key=source_key))
+                pipe.delete(sources)
+            pipe.execute()
+
+            shutil.rmtree(self._entry_dir(stage, key), ignore_errors=True)
+            print(f"[ResultCache] Evicted {member} ({size} bytes)")
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    프로세스 단위 캐시 인스턴스. 비활성화 상태면 None 을 반환합니다.
+    """
+    global _cache
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
@@ -0,0 +1,191 @@
+"""
+오브젝트 스토리지 (Cloudflare R2 / S3 호환) 업로드
+
+- boto3 클라이언트는 워커 프로세스당 한 번만 생성하여 재사용합니다 (커넥션 풀 공유).
+- 파일 업로드는 튜닝된 TransferConfig 로 멀티파트 파트를 병렬 전송합니다.
+- StreamingMultipartUpload 는 FFmpeg 가 fragmented MP4 를 쓰는 동안 완성된 파트부터 업로드하여
+  인코딩과 업로드를 겹칩니다.
+- S3_ENDPOINT_URL 로 MinIO / moto server 같은 로컬 S3 로 대상을 바꿀 수 있습니다.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+# S3 멀티파트 최소 파트 크기 (마지막 파트 제외)
+MIN_PART_SIZE = 5 * 1024**2
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def storage_enabled() -> bool:
+    return bool(
+        settings.R2_ACCESS_KEY_ID
+        and settings.R2_SECRET_ACCESS_KEY
+        and settings.R2_BUCKET_NAME
+    )
+
+
+def endpoint_url() -> str:
+    # Cloudflare R2 endpoint URL (S3_ENDPOINT_URL 이 있으면 우선)
+    return settings.S3_ENDPOINT_URL or f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com"
+
+
+def get_s3_client():
+    """
+    프로세스 단위 boto3 S3 클라이언트 (스레드 안전, 멀티파트 병렬 전송과 커넥션 풀 공유).
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            import boto3
+            from botocore.config import Config
+
+            _client = boto3.client(
+                "s3",
+                aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+                endpoint_url=endpoint_url(),
+                region_name=settings.S3_REGION,  # R2는 항상 auto
+                config=Config(
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 5, "mode": "adaptive"},
+                ),
+            )
+        return _client
+
+
+def transfer_config():
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=max(settings.S3_MULTIPART_CHUNKSIZE, MIN_PART_SIZE),
+        max_concurrency=settings.S3_MAX_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+def output_key(job_id: str, filename: str) -> str:
+    return f"outputs/{job_id}/{filename}"
+
+
+def public_url(key: str) -> str:
+    if settings.R2_PUBLIC_URL:
+        return f"{settings.R2_PUBLIC_URL}/{key}"
+    # Fallback: S3 compatible URL (접근 불가할 수 있음)
+    return f"{endpoint_url()}/{settings.R2_BUCKET_NAME}/{key}"
+
+
+def upload_file(file_path: str, key: str, content_type: str = "video/mp4") -> str:
+    """
+    로컬 파일을 업로드하고 공개 URL 을 반환합니다 (임계값 이상이면 병렬 멀티파트).
+    """
+    print(f"Uploading {file_path} to r2://{settings.R2_BUCKET_NAME}/{key}")
+    get_s3_client().upload_file(
+        file_path,
+        settings.R2_BUCKET_NAME,
+        key,
+        ExtraArgs={"ContentType": content_type},  # R2는 ACL 미지원
+        Config=transfer_config(),
+    )
+    return public_url(key)
+
+
+class StreamingMultipartUpload:
+    """
+    크기를 미리 알 수 없는 바이트 스트림을 멀티파트로 업로드합니다.
+    write() 로 받은 바이트가 파트 크기만큼 모이면 백그라운드 스레드에서 UploadPart 를 보내고,
+    complete() 에서 마지막 파트를 보낸 뒤 CompleteMultipartUpload 합니다.
+    동시에 전송 중인 파트 수는 S3_MAX_CONCURRENCY 로 제한되어 메모리 사용량이 고정됩니다.
+    """
+
+    def __init__(self, key: str, content_type: str = "video/mp4", part_size: int = None):
+        self.key = key
+        self.part_size = max(part_size or settings.S3_MULTIPART_CHUNKSIZE, MIN_PART_SIZE)
+        self.client = get_s3_client()
+        self.bucket = settings.R2_BUCKET_NAME
+        self.upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+        self.bytes_uploaded = 0
+
+        self._buffer = bytearray()
+        self._futures = []
+        self._slots = threading.BoundedSemaphore(settings.S3_MAX_CONCURRENCY)
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.S3_MAX_CONCURRENCY, thread_name_prefix="s3-part"
+        )
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self._submit(part)
+
+    def complete(self) -> str:
+        try:
+            if self._buffer or not self._futures:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            parts = [future.result() for future in self._futures]
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._executor.shutdown(wait=False)
+        print(
+            f"Streamed {self.bytes_uploaded} bytes in {len(parts)} parts "
+            f"to r2://{self.bucket}/{self.key}"
+        )
+        return public_url(self.key)
+
+    def abort(self) -> None:
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+        except Exception as e:
+            print(f"Failed to abort multipart upload {self.upload_id}: {e}")
+
+    def _submit(self, data: bytes) -> None:
+        part_number = len(self._futures) + 1
+        self.bytes_uploaded += len(data)
+        # 전송 중인 파트가 가득 차면 빈 자리가 날 때까지 대기 (버퍼 메모리 상한)
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(self._upload_part, part_number, data))
+
+    def _upload_part(self, part_number: int, data: bytes) -> dict:
+        try:
+            response = self.client.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=data,
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        finally:
+            self._slots.release()
+
+
+def open_streaming_upload(job_id: str, filename: str) -> Optional[StreamingMultipartUpload]:
+    """
+    스트리밍 업로드가 켜져 있고 스토리지가 설정되어 있으면 업로드 객체를, 아니면 None 을 반환합니다.
+    """
+    if not (settings.STORAGE_STREAMING_UPLOAD and storage_enabled()):
+        return None
+    return StreamingMultipartUpload(output_key(job_id, filename))
@@ -1,12 +1,15 @@
-import datetime
+"""
+가사 자막 생성 (ASS / SRT / WebVTT / LRC)
 
-def generate_ass_subtitle(lyrics_data: dict, output_path: str):
-    """
-    Generates an ASS subtitle file from lyrics data (segments).
-    Supports triple subtitles: Original (Karaoke), Translated, Romanized.
-    """
+세그먼트 dict 목록을 먼저 열(column) 단위 LyricsTable 로 한 번 변환합니다.
+- 시각은 정수 centisecond 배열(int32)로 한 번에 반올림 변환 (float 나머지 연산 없음)
+- 단어는 평탄한 배열 + 세그먼트별 offset 으로 보관
+각 출력 포맷은 같은 테이블에서 줄 목록을 만들고 마지막에 한 번만 join 합니다.
+"""
+
+import numpy as np
 
-    header = """[Script Info]
+ASS_HEADER = """[Script Info]
 ScriptType: v4.00+
 PlayResX: 1080
 PlayResY: 1920
@@ -23,69 +26,383 @@ Style: Translated,Arial,60,&H00AAAAAA,&H000000FF,&H00000000,&H80000000,0,0,0,0,1
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 """
 
-    segments = lyrics_data.get("segments", [])
-    if not segments and isinstance(lyrics_data, list):
-        segments = lyrics_data
 
-    events = []
+class LyricsTable:
+    """
+    열 단위 가사 표현.
+    - seg_start / seg_end: 세그먼트 시작/끝 (int32 centiseconds)
+    - word_offsets: 세그먼트 i 의 단어는 words[word_offsets[i]:word_offsets[i + 1]]
+    - word_start / word_end: 단어 시작/끝 (int32 centiseconds)
+    - texts / romanized / translated: 세그먼트별 문자열 (없으면 "")
+    - translations: 목표 언어 → 세그먼트별 번역 목록
+    - language: 원문 언어 (WhisperX 감지 결과)
+    단어 타임스탬프가 없는 세그먼트는 라인 전체를 단어 하나로 취급합니다.
+    to_arrays() / from_arrays() 로 평탄한 배열(npz) 과 상호 변환합니다 (app/services/artifacts.py).
+    """
 
-    for seg in segments:
-        start_time = _format_time(seg.get("start", 0))
-        end_time = _format_time(seg.get("end", 0))
+    def __init__(
+        self,
+        seg_start,
+        seg_end,
+        word_offsets,
+        word_start,
+        word_end,
+        words: list,
+        texts: list,
+        romanized: list,
+        translated: list,
+        translations: dict = None,
+        language: str = None,
+    ):
+        self.seg_start = seg_start
+        self.seg_end = seg_end
+        self.word_offsets = word_offsets
+        self.word_start = word_start
+        self.word_end = word_end
+        self.words = words
+        self.texts = texts
+        self.romanized = romanized
+        self.translated = translated
+        self.translations = translations or {}
+        self.language = language
 
-        # 1. Original Text with Karaoke Effect (\k)
-        karaoke_text = ""
-        words = seg.get("words", [])
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def from_segments(cls, lyrics_data, language: str = None) -> "LyricsTable":
+        """
+        WhisperX 세그먼트({"segments": [...]} 또는 list) 또는 LyricsTable 에서 테이블을 만듭니다.
+        language 가 주어지면 seg["translations"][language] 를 번역으로 사용합니다.
+        """
+        if isinstance(lyrics_data, LyricsTable):
+            return lyrics_data.with_language(language) if language else lyrics_data
+        segments = lyrics_data.get("segments", []) if isinstance(lyrics_data, dict) else lyrics_data
 
-        if words:
-            # WhisperX provides word-level timestamps
-            # We need to calculate duration for each word in centiseconds
-            current_time = seg.get("start", 0)
+        seg_times = []
+        word_times = []
+        counts = []
+        words = []
+        texts = []
+        romanized = []
+        translated = []
+        translations = {}
+        for i, seg in enumerate(segments):
+            start = seg.get("start", 0)
+            end = seg.get("end", 0)
+            seg_times.append((start, end))
+            texts.append(seg.get("text", "").strip())
+            romanized.append(seg.get("romanized") or "")
+            translated.append(seg.get("translated") or "")
+            for lang, text in (seg.get("translations") or {}).items():
+                translations.setdefault(lang, [""] * len(segments))[i] = text or ""
 
-            for word in words:
-                w_start = word.get("start", current_time)
+            seg_words = seg.get("words") or []
+            if not seg_words:
+                # Fallback if no word timestamps (e.g. from mock or simple STT)
+                seg_words = [{"word": texts[-1], "start": start, "end": end}]
+            # 타임스탬프가 빠진 단어(숫자 등)는 이전 단어 끝에서 시작
+            current = start
+            for word in seg_words:
+                w_start = word.get("start", current)
                 w_end = word.get("end", w_start + 0.5)
-                duration_cs = int((w_end - w_start) * 100)
-
-                # Gap handling (if gap between words is large, insert space or wait?)
-                # For simplicity, we just append \k
-                karaoke_text += f"{{\\k{duration_cs}}}{word['word']} "
-                current_time = w_end
-        else:
-            # Fallback if no word timestamps (e.g. from mock or simple STT)
-            duration = seg.get("end", 0) - seg.get("start", 0)
-            duration_cs = int(duration * 100)
-            # Simple fill for the whole line
-            text = seg.get("text", "")
-            karaoke_text = f"{{\\k{duration_cs}}}{text}"
-
-        events.append(f"Dialogue: 0,{start_time},{end_time},Original,,0,0,0,,{karaoke_text}")
+                word_times.append((w_start, w_end))
+                words.append(word.get("word", "").strip())
+                current = w_end
+            counts.append(len(seg_words))
+
+        seg_cs = _to_cs(seg_times).reshape(-1, 2)
+        word_cs = _to_cs(word_times).reshape(-1, 2)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        table = cls(
+            seg_cs[:, 0],
+            seg_cs[:, 1],
+            offsets,
+            word_cs[:, 0],
+            word_cs[:, 1],
+            words,
+            texts,
+            romanized,
+            translated,
+            translations,
+            lyrics_data.get("language") if isinstance(lyrics_data, dict) else None,
+        )
+        return table.with_language(language) if language else table
+
+    def with_language(self, language: str) -> "LyricsTable":
+        """
+        translated 열을 language 번역으로 바꾼 테이블 (배열은 공유). 번역이 빈 라인은 기존 값을 유지합니다.
+        """
+        column = self.translations.get(language)
+        if column is None:
+            return self
+        translated = [text or fallback for text, fallback in zip(column, self.translated)]
+        return LyricsTable(
+            self.seg_start,
+            self.seg_end,
+            self.word_offsets,
+            self.word_start,
+            self.word_end,
+            self.words,
+            self.texts,
+            self.romanized,
+            translated,
+            self.translations,
+            self.language,
+        )
+
+    def to_arrays(self) -> dict:
+        """
+        평탄한 배열 dict (np.savez 용, pickle 없음).
+        문자열 열은 UTF-8 바이트 하나 + int32 문자 offset 으로 저장합니다.
+        """
+        arrays = {
+            "seg_start": self.seg_start,
+            "seg_end": self.seg_end,
+            "word_offsets": self.word_offsets,
+            "word_start": self.word_start,
+            "word_end": self.word_end,
+            "language": np.array(self.language or ""),
+        }
+        columns = {
+            "words": self.words,
+            "texts": self.texts,
+            "romanized": self.romanized,
+            "translated": self.translated,
+        }
+        columns.update({f"translations.{lang}": column for lang, column in self.translations.items()})
+        for name, column in columns.items():
+            arrays[f"{name}.data"], arrays[f"{name}.offsets"] = _pack_strings(column)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "LyricsTable":
+        prefix = "translations."
+        translations = {
+            name[len(prefix) : -len(".data")]: _unpack_strings(
+                arrays[name], arrays[name[: -len(".data")] + ".offsets"]
+            )
+            for name in arrays
+            if name.startswith(prefix) and name.endswith(".data")
+        }
+
+        def column(name):
+            return _unpack_strings(arrays[f"{name}.data"], arrays[f"{name}.offsets"])
+
+        return cls(
+            arrays["seg_start"],
+            arrays["seg_end"],
+            arrays["word_offsets"],
+            arrays["word_start"],
+            arrays["word_end"],
+            column("words"),
+            column("texts"),
+            column("romanized"),
+            column("translated"),
+            translations,
+            str(arrays["language"]) or None,
+        )
+
+    def karaoke_durations(self) -> np.ndarray:
+        """
+        \\k 태그 길이 (centiseconds): 단어마다 end - start.
+        """
+        return np.maximum(self.word_end - self.word_start, 0)
+
+    def change_times_cs(self) -> np.ndarray:
+        """
+        자막 화면이 바뀌는 시각 (centiseconds, 정렬/중복 제거): 세그먼트 시작/끝 + \\k 음절 전환 시각.
+        \\k 는 세그먼트 시작부터 길이를 누적하므로 음절은 시작 + 누적 길이에서 바뀝니다 (sweep 없음).
+        """
+        elapsed = np.cumsum(self.karaoke_durations(), dtype=np.int64)
+        # 세그먼트별 누적이 되도록 앞 세그먼트까지의 합을 뺌
+        before = np.concatenate(([0], elapsed))[self.word_offsets[:-1]]
+        seg_base = np.repeat(self.seg_start - before, np.diff(self.word_offsets))
+        return np.unique(np.concatenate(([0], self.seg_start, self.seg_end, seg_base + elapsed)))
+
+
+# ===== 출력 포맷 =====
+
+
+def render_ass(table: LyricsTable) -> str:
+    """
+    Supports triple subtitles: Original (Karaoke), Translated, Romanized.
+    """
+    starts = _ass_times(table.seg_start)
+    ends = _ass_times(table.seg_end)
+    word_k = table.karaoke_durations()
+    tokens = [f"{{\\k{k}}}{word}" for k, word in zip(word_k.tolist(), table.words)]
+    offsets = table.word_offsets.tolist()
+
+    events = []
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        # 1. Original Text with Karaoke Effect (\k)
+        karaoke_text = " ".join(tokens[offsets[i] : offsets[i + 1]])
+        events.append(f"Dialogue: 0,{start},{end},Original,,0,0,0,,{karaoke_text}")
 
         # 2. Romanized (Pronunciation)
-        if "romanized" in seg and seg["romanized"]:
-            events.append(f"Dialogue: 0,{start_time},{end_time},Romanized,,0,0,0,,{seg['romanized']}")
+        if table.romanized[i]:
+            events.append(f"Dialogue: 0,{start},{end},Romanized,,0,0,0,,{table.romanized[i]}")
 
         # 3. Translated
-        if "translated" in seg and seg["translated"]:
-            events.append(f"Dialogue: 0,{start_time},{end_time},Translated,,0,0,0,,{seg['translated']}")
+        if table.translated[i]:
+            events.append(f"Dialogue: 0,{start},{end},Translated,,0,0,0,,{table.translated[i]}")
+
+    return ASS_HEADER + "\n".join(events)
+
+
+def render_srt(table: LyricsTable) -> str:
+    starts = _clock_times(table.seg_start, ",")
+    ends = _clock_times(table.seg_end, ",")
+    cues = [
+        f"{i + 1}\n{start} --> {end}\n{_cue_text(table, i)}\n"
+        for i, (start, end) in enumerate(zip(starts, ends))
+    ]
+    return "\n".join(cues)
+
+
+def render_vtt(table: LyricsTable) -> str:
+    """
+    WebVTT. 원문 줄에는 단어 시작 시각 태그(<00:00:01.500>)를 넣어 플레이어가 karaoke 표시를 할 수 있게 합니다.
+    """
+    starts = _clock_times(table.seg_start, ".")
+    ends = _clock_times(table.seg_end, ".")
+    word_times = _clock_times(table.word_start, ".")
+    offsets = table.word_offsets.tolist()
+
+    cues = ["WEBVTT\n"]
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        lo, hi = offsets[i], offsets[i + 1]
+        original = table.words[lo]
+        if hi - lo > 1:
+            original = " ".join(
+                [original]
+                + [f"<{t}>{w}" for t, w in zip(word_times[lo + 1 : hi], table.words[lo + 1 : hi])]
+            )
+        cues.append(f"{start} --> {end}\n{_cue_text(table, i, original)}\n")
+    return "\n".join(cues)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(header + "\n".join(events))
 
+def render_lrc(table: LyricsTable) -> str:
+    """
+    Enhanced LRC: [mm:ss.xx] 라인 시작 + <mm:ss.xx> 단어 시작. 번역/로마자는 LRC 에 넣지 않습니다.
+    """
+    starts = _lrc_times(table.seg_start)
+    ends = _lrc_times(table.seg_end)
+    word_times = _lrc_times(table.word_start)
+    offsets = table.word_offsets.tolist()
+
+    lines = []
+    for i, start in enumerate(starts):
+        lo, hi = offsets[i], offsets[i + 1]
+        words = " ".join(f"<{t}>{w}" for t, w in zip(word_times[lo:hi], table.words[lo:hi]))
+        lines.append(f"[{start}]{words} <{ends[i]}>")
+    return "\n".join(lines) + "\n"
+
+
+# 포맷 이름 → 렌더 함수 / 파일 확장자 / 업로드 Content-Type
+FORMATS = {
+    "ass": {"render": render_ass, "extension": "ass", "content_type": "text/x-ssa"},
+    "srt": {"render": render_srt, "extension": "srt", "content_type": "application/x-subrip"},
+    "vtt": {"render": render_vtt, "extension": "vtt", "content_type": "text/vtt"},
+    "lrc": {"render": render_lrc, "extension": "lrc", "content_type": "text/plain"},
+}
+
+
+def generate_subtitle(lyrics_data, output_path: str, fmt: str = "ass", language: str = None):
+    """
+    lyrics_data (세그먼트 또는 LyricsTable) 를 fmt 포맷 자막 파일로 씁니다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown subtitle format '{fmt}' (available: {', '.join(FORMATS)})")
+    content = FORMATS[fmt]["render"](LyricsTable.from_segments(lyrics_data, language=language))
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(content)
     return output_path
 
-def _format_time(seconds: float) -> str:
+
+def generate_ass_subtitle(lyrics_data, output_path: str, language: str = None):
+    """
+    Generates an ASS subtitle file from lyrics data (segments).
+    If language is given, the translation for that language (seg["translations"]) is used.
+    """
+    return generate_subtitle(lyrics_data, output_path, "ass", language=language)
+
+
+def subtitle_change_times(lyrics_data) -> list:
+    """
+    자막 화면이 바뀌는 시각(초) 목록: 이벤트 시작/끝과 \\k 음절 전환 시각.
+    """
+    return (LyricsTable.from_segments(lyrics_data).change_times_cs() / 100).tolist()
+
+
+# ===== 시각 변환 (벡터 연산) =====
+
+
+def _to_cs(seconds) -> np.ndarray:
     """
-    Format seconds to ASS time format: H:MM:SS.cs
-    e.g. 1:02:30.55
+    초 → 정수 centiseconds (반올림). float 나머지 연산의 절삭 오차(1.23 → 1.22)가 없습니다.
     """
-    td = datetime.timedelta(seconds=seconds)
-    # total_seconds includes days, need to handle carefully or just use simple math
+    return np.rint(np.asarray(seconds, dtype=np.float64) * 100).astype(np.int32).ravel()
+
+
+# "00".."99" - 시각 필드마다 정수 포맷팅 대신 조회 (f"{x:02d}" 보다 수 배 빠름)
+_PAD2 = tuple(f"{i:02d}" for i in range(100))
+
+
+def _pad2(values: np.ndarray) -> list:
+    return [_PAD2[v] if v < 100 else str(v) for v in values.tolist()]
+
+
+def _split_cs(cs: np.ndarray) -> tuple:
+    cs = np.maximum(cs, 0)
+    return cs // 360000, cs // 6000 % 60, cs // 100 % 60, cs % 100
+
+
+def _ass_times(cs: np.ndarray) -> list:
     # ASS format is h:mm:ss.cc (centiseconds)
+    h, m, s, c = _split_cs(cs)
+    return [
+        f"{a}:{b}:{d}.{e}"
+        for a, b, d, e in zip(h.tolist(), _pad2(m), _pad2(s), _pad2(c))
+    ]
+
+
+def _clock_times(cs: np.ndarray, separator: str) -> list:
+    # SRT: HH:MM:SS,mmm / WebVTT: HH:MM:SS.mmm
+    h, m, s, c = (_pad2(a) for a in _split_cs(cs))
+    return [f"{a}:{b}:{d}{separator}{e}0" for a, b, d, e in zip(h, m, s, c)]
+
+
+def _lrc_times(cs: np.ndarray) -> list:
+    # LRC: mm:ss.xx (분은 60 을 넘을 수 있음)
+    cs = np.maximum(cs, 0)
+    m, s, c = (_pad2(a) for a in (cs // 6000, cs // 100 % 60, cs % 100))
+    return [f"{a}:{b}.{e}" for a, b, e in zip(m, s, c)]
+
+
+def _pack_strings(strings: list) -> tuple:
+    # 문자열 목록 → (UTF-8 바이트 uint8 배열, 문자 단위 int32 offsets)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int32)
+    np.cumsum([len(text) for text in strings], out=offsets[1:])
+    return np.frombuffer("".join(strings).encode("utf-8"), dtype=np.uint8), offsets
+
+
+def _unpack_strings(data: np.ndarray, offsets: np.ndarray) -> list:
+    text = data.tobytes().decode("utf-8")
+    bounds = offsets.tolist()
+    return [text[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
 
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    cs = int((seconds % 1) * 100)
 
-    return f"{hours}:{minutes:02d}:{secs:02d}.{cs:02d}"
+def _cue_text(table: LyricsTable, i: int, original: str = None) -> str:
+    if original is None:
+        original = table.texts[i] or " ".join(
+            table.words[table.word_offsets[i] : table.word_offsets[i + 1]]
+        )
+    lines = [original]
+    if table.romanized[i]:
+        lines.append(table.romanized[i])
+    if table.translated[i]:
+        lines.append(table.translated[i])
+    return "\n".join(lines)
@@ -1,91 +1,306 @@
 import ffmpeg
+import math
 import os
+import subprocess
 import uuid
 from app.core.config import settings
-from app.services.subtitle_generator import generate_ass_subtitle
+from app.services import audio_io, render_profiles
+from app.services.subtitle_generator import (
+    LyricsTable,
+    generate_ass_subtitle,
+    subtitle_change_times,
+)
 
-def render_karaoke_video(job_result: dict) -> str:
+def probe_duration(media_path: str) -> float:
+    """
+    ffprobe 로 미디어 길이(초)를 반환합니다. 실패 시 0.
+    """
+    if media_path.endswith(".npy"):
+        return audio_io.npy_duration(media_path)
+    try:
+        info = ffmpeg.probe(media_path)
+        return float(info.get("format", {}).get("duration", 0) or 0)
+    except ffmpeg.Error as e:
+        print(f"FFprobe error: {e.stderr.decode() if e.stderr else str(e)}")
+        return 0.0
+
+
+def prepare_audio_track(instrumental_path: str, job_id: str) -> str:
+    """
+    반주 트랙을 라우드니스 정규화 후 AAC 로 미리 인코딩합니다.
+    최종 렌더링에서는 이 트랙을 재인코딩 없이 그대로 복사(mux)합니다.
+    """
+    output_path = os.path.join(settings.TEMP_DIR, f"{job_id}_audio.m4a")
+    try:
+        (
+            ffmpeg.input(instrumental_path, **audio_io.ffmpeg_input_options(instrumental_path))
+            .output(
+                output_path,
+                af="loudnorm=I=-14:TP=-1.5:LRA=11",
+                acodec="aac",
+                audio_bitrate="192k",
+            )
+            .run(overwrite_output=True, quiet=True)
+        )
+        return output_path
+    except ffmpeg.Error as e:
+        print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        raise e
+
+
+def prepare_background(background_path: str, job_id: str) -> str:
+    """
+    배경 영상을 1080x1920 (cover) 으로 미리 스케일/크롭하고 오디오를 제거합니다.
+    배경이 없으면 None 을 반환하여 렌더링 시 단색 배경을 사용합니다.
+    """
+    if not background_path or not os.path.exists(background_path):
+        return None
+
+    output_path = os.path.join(settings.TEMP_DIR, f"{job_id}_background.mp4")
+    try:
+        (
+            ffmpeg.input(background_path)
+            .video.filter('scale', -1, 1920)
+            .filter('crop', 1080, 1920)
+            .output(output_path, vcodec='libx264', preset='fast', an=None)
+            .run(overwrite_output=True, quiet=True)
+        )
+        return output_path
+    except ffmpeg.Error as e:
+        print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        raise e
+
+
+def output_filename(job_id: str, language: str = None, profile: str = None) -> str:
+    name = f"{job_id}_{language}" if language else job_id
+    # 기본(standard) 외 프로파일은 파일명에 프로파일 이름을 붙여 구분
+    profile = profile or settings.RENDER_PROFILE
+    if profile != "standard":
+        name = f"{name}_{profile}"
+    return f"{name}_output.mp4"
+
+
+def render_karaoke_video(
+    job_result: dict, language: str = None, sink=None, profile: str = None
+) -> str:
     """
     Combines background video, instrumental audio, and subtitles into a final video.
     job_result contains: 'job_id', 'instrumental', 'lyrics' (dict), 'background' (optional)
+    Optionally pre-rendered assets from prepare_render_assets:
+    'audio_track' (AAC, muxed as-is), 'prepared_background' (already 1080x1920), 'duration'
+    language 가 주어지면 해당 언어 번역을 자막으로 사용하고, 출력 파일명에 언어 코드를 붙입니다.
+    sink (write(bytes) 를 가진 객체, 예: storage.StreamingMultipartUpload) 가 주어지면
+    fragmented MP4 를 stdout 으로 출력하여, 인코딩 중에 로컬 파일과 sink 에 동시에 씁니다.
+    profile 은 render_profiles 의 프로파일 이름입니다 (기본값: RENDER_PROFILE 설정).
     """
     job_id = job_result.get("job_id", str(uuid.uuid4()))
     instrumental_path = job_result.get("instrumental")
     lyrics_data = job_result.get("lyrics", {})
     background_path = job_result.get("background")
+    audio_track = job_result.get("audio_track")
+    prepared_background = job_result.get("prepared_background")
+    duration = job_result.get("duration")
+    profile = render_profiles.get_profile(profile)
+    width, height, fps = profile["width"], profile["height"], profile["fps"]
 
     # Define output path
-    output_filename = f"{job_id}_output.mp4"
-    output_path = os.path.join(settings.TEMP_DIR, output_filename)
+    name = f"{job_id}_{language}" if language else job_id
+    output_path = os.path.join(
+        settings.TEMP_DIR, output_filename(job_id, language, profile["name"])
+    )
 
     # 1. Generate ASS Subtitle File
-    ass_filename = f"{job_id}.ass"
+    ass_filename = f"{name}.ass"
     ass_path = os.path.join(settings.TEMP_DIR, ass_filename)
-    generate_ass_subtitle(lyrics_data, ass_path)
+    # 세그먼트 → LyricsTable 변환은 한 번만 (자막 파일과 변화 프레임 계산이 공유)
+    lyrics_data = LyricsTable.from_segments(lyrics_data, language=language)
+    generate_ass_subtitle(lyrics_data, ass_path, language=language)
     print(f"Generated subtitles at: {ass_path}")
 
-    print(f"Rendering video to {output_path}")
+    print(f"Rendering video to {output_path} (profile={profile['name']})")
 
     # 2. Prepare FFmpeg Inputs
-    # Audio Input (Instrumental)
-    input_audio = ffmpeg.input(instrumental_path)
+    # Audio Input (Instrumental) - 미리 인코딩된 AAC 트랙이 있으면 그대로 사용
+    audio_source = audio_track or instrumental_path
+    input_audio = ffmpeg.input(audio_source, **audio_io.ffmpeg_input_options(audio_source))
+    if not duration:
+        duration = probe_duration(audio_source)
 
     # Video Input (Background)
-    if background_path and os.path.exists(background_path):
-        # Use provided background video
-        input_video = ffmpeg.input(background_path, stream_loop=-1)
-    else:
-        # Fallback: Generate solid color background (black or dark blue)
-        # Duration should match audio duration approximately, or let 'shortest' handle it
-        # However, 'shortest' with 'color' source might be tricky if color is infinite.
-        # We can probe audio duration or just let it run.
-        # Safer to just use a simple color source.
-        input_video = ffmpeg.input('color=c=black:s=1080x1920', f='lavfi')
-
-    # 3. Construct Filter Complex
-    # [0:v] -> scale/crop (optional) -> subtitles -> [outv]
-    # We apply subtitles using the 'ass' filter.
-    # Note: path for ass filter usually needs to be escaped properly or relative.
-    # We use absolute path.
-
-    # If using color source, it is infinite, so we need 'shortest=1' in output to stop at audio end.
-
-    # Video processing chain
-    # 1. Ensure resolution 1080x1920 (Vertical) - Just in case input video is different
-    # 2. Apply subtitles
-
-    # We can use ffmpeg-python's fluent interface
-    # v = input_video.filter('scale', 1080, 1920).filter('ass', ass_path)
-    # But scaling might distort aspect ratio. For now, assume color source is already correct.
-    # If real video, we might want 'scale=-1:1920,crop=1080:1920' logic (Cover).
-
-    if background_path:
-        # Scale to fill height 1920, then crop to 1080 width (Center)
-        video_stream = input_video.filter('scale', -1, 1920).filter('crop', 1080, 1920)
+    static_background = False
+    change_frames = None
+    # 렌더가 끝나면 지울 임시 파일 (자막, 프레임 목록, filtergraph 스크립트)
+    temp_paths = [ass_path]
+    if prepared_background and os.path.exists(prepared_background):
+        # Already scaled/cropped to 1080x1920 by prepare_background
+        video_stream = ffmpeg.input(prepared_background, stream_loop=-1).video
+        if (width, height) != (1080, 1920):
+            video_stream = video_stream.filter('scale', width, height)
+    elif background_path and os.path.exists(background_path):
+        # Scale to fill height, then crop to width (Center)
+        video_stream = (
+            ffmpeg.input(background_path, stream_loop=-1)
+            .video.filter('scale', -2, height)
+            .filter('crop', width, height)
+        )
     else:
-        video_stream = input_video # Already 1080x1920 black
+        static_background = True
+        if settings.RENDER_STATIC_FAST_PATH and duration:
+            change_frames = _change_frames(lyrics_data, fps, duration)
+            if len(change_frames) > settings.RENDER_STATIC_FAST_PATH_MAX_FRAMES:
+                print(
+                    f"Static background fast path skipped: {len(change_frames)} change frames "
+                    f"(> RENDER_STATIC_FAST_PATH_MAX_FRAMES), rendering every frame"
+                )
+                change_frames = None
 
-    # Apply subtitles
+        if change_frames is not None:
+            # 정지 배경 fast path: 자막 상태가 바뀌는 프레임만 concat 목록의 항목(표시 시간 포함)으로 입력하여
+            # libass 렌더링과 x264 인코딩을 그 프레임들에만 수행하고, 가변 프레임레이트(VFR)로 출력
+            frame_list = os.path.join(settings.TEMP_DIR, f"{name}_frames.txt")
+            temp_paths += _write_frame_list(frame_list, change_frames, fps)
+            video_stream = (
+                ffmpeg.input(frame_list, f='concat', safe=0)
+                .video.filter('scale', width, height, flags='neighbor')
+                .filter('format', 'yuv420p')
+            )
+        else:
+            # Solid color background: fps 와 길이를 명시하여 shortest 에 의존하지 않음
+            color = f"c=black:s={width}x{height}:r={fps}"
+            if duration:
+                color += f":d={duration}"
+            video_stream = ffmpeg.input(f"color={color}", f='lavfi')
+
+    # 3. Apply subtitles (ASS PlayRes 1080x1920 기준 → libass 가 출력 해상도로 스케일)
     video_stream = video_stream.filter('ass', ass_path)
 
     # 4. Run FFmpeg
     try:
+        output_kwargs = render_profiles.encoder_options(profile, static_background)
+        if change_frames is not None:
+            # 선택된 프레임의 타임스탬프를 유지 (CFR 로 복제하지 않음)
+            output_kwargs.pop("r", None)
+            output_kwargs["fps_mode"] = "vfr"
+            print(f"Static background fast path: {len(change_frames)} frames")
+        if audio_track:
+            # Already normalized + AAC encoded, mux only
+            output_kwargs["acodec"] = "copy"
+        else:
+            output_kwargs["acodec"] = "aac"
+            output_kwargs["audio_bitrate"] = "192k"
+        if duration:
+            # Bound the (possibly infinite) video source by the probed audio length
+            output_kwargs["t"] = duration
+
+        if sink is not None:
+            # Fragmented MP4: 한 번 쓴 바이트를 되돌아가 수정하지 않으므로 쓰는 즉시 업로드 가능
+            output_kwargs["f"] = "mp4"
+            output_kwargs["movflags"] = "frag_keyframe+empty_moov+default_base_moof"
+
         stream = ffmpeg.output(
             video_stream,
             input_audio,
-            output_path,
-            vcodec='libx264',
-            preset='fast',
-            acodec='aac',
-            audio_bitrate='192k',
+            "pipe:" if sink is not None else output_path,
             shortest=None, # If background is looped, stop when audio stops
+            **output_kwargs,
         )
 
-        # Overwrite output, run quietly
-        stream.run(overwrite_output=True, quiet=True)
+        # filtergraph 는 명령행 대신 파일로 전달 (긴 자막 경로/그래프로 argv 한도를 넘지 않도록)
+        script_path = os.path.join(settings.TEMP_DIR, f"{name}_filter.txt")
+        temp_paths.append(script_path)
+        args = _compile_with_filter_script(stream, script_path)
+
+        if sink is not None:
+            _run_to_sink(args, output_path, sink)
+        else:
+            # Overwrite output, run quietly
+            result = subprocess.run(args, capture_output=True)
+            if result.returncode != 0:
+                raise ffmpeg.Error("ffmpeg", result.stdout, result.stderr)
 
         return output_path
 
     except ffmpeg.Error as e:
         print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
         raise e
+    finally:
+        # 자막 파일 등은 이 렌더링에서만 사용 (TEMP_DIR 에 쌓이지 않도록 삭제)
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _change_frames(lyrics_data, fps: int, duration: float) -> list:
+    """
+    자막 상태가 바뀌는 시각을 프레임 번호로 변환합니다 (첫 프레임과 마지막 프레임 포함).
+    ass 필터는 프레임 k 를 int(k * (1/fps) * 1000) ms 시각으로 렌더링하므로 (부동소수점 내림),
+    같은 계산으로 변화 시각 이후 첫 프레임을 찾습니다 (예: 15fps 의 126.4s 프레임은 126399ms).
+    """
+    last = max(int(math.ceil(duration * fps)) - 1, 0)
+    step = 1.0 / fps
+    frames = {0, last}
+    for t in subtitle_change_times(lyrics_data):
+        ms = int(round(t * 1000))
+        frame = int(math.ceil(ms * fps / 1000 - 1e-6))
+        while int(frame * step * 1000) < ms:
+            frame += 1
+        if 0 <= frame <= last:
+            frames.add(frame)
+    return sorted(frames)
+
+
+def _write_frame_list(list_path: str, frames: list, fps: int) -> list:
+    """
+    변화 프레임마다 검은 이미지 한 장과 다음 변화까지의 표시 시간을 적은 concat demuxer 목록을 씁니다.
+    이미지는 16x16 PPM (항목마다 다시 열리므로 작게 두고 렌더 해상도로는 scale).
+    Returns 생성한 파일 경로 목록
+    """
+    image_path = f"{os.path.splitext(list_path)[0]}.ppm"
+    with open(image_path, "wb") as f:
+        f.write(b"P6\n16 16\n255\n" + bytes(16 * 16 * 3))
+
+    # framerate 를 렌더 fps 로 지정해야 타임스탬프가 이미지 기본값(25fps) 격자로 반올림되지 않음
+    entry = f"file '{image_path}'\noption framerate {fps}\n"
+    lines = ["ffconcat version 1.0\n"]
+    for frame, next_frame in zip(frames, frames[1:] + [frames[-1] + 1]):
+        lines.append(f"{entry}duration {(next_frame - frame) / fps:.6f}\n")
+    # 마지막 항목의 duration 이 적용되도록 같은 이미지를 한 번 더 (concat demuxer 동작)
+    lines.append(entry)
+    with open(list_path, "w") as f:
+        f.writelines(lines)
+    return [list_path, image_path]
+
+
+def _compile_with_filter_script(stream, script_path: str) -> list:
+    """
+    ffmpeg-python 이 만든 명령행의 -filter_complex 인자를 -filter_complex_script 파일로 옮깁니다.
+    """
+    args = ffmpeg.compile(stream, overwrite_output=True)
+    if "-filter_complex" in args:
+        index = args.index("-filter_complex")
+        with open(script_path, "w") as f:
+            f.write(args[index + 1])
+        args[index : index + 2] = ["-filter_complex_script", script_path]
+    return args
+
+
+def _run_to_sink(args: list, output_path: str, sink, block_size: int = 1024 * 1024) -> None:
+    """
+    FFmpeg stdout 을 읽어 로컬 파일과 sink 에 동시에 씁니다.
+    """
+    process = subprocess.Popen(
+        [args[0], "-loglevel", "error", *args[1:]],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        with open(output_path, "wb") as f:
+            for data in iter(lambda: process.stdout.read(block_size), b""):
+                f.write(data)
+                sink.write(data)
+    except Exception:
+        process.kill()
+        raise
+    finally:
+        returncode = process.wait()
+    if returncode != 0:
+        raise ffmpeg.Error("ffmpeg", None, f"exit code {returncode}".encode())
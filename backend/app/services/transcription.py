@@ -1,23 +1,161 @@
 import json
+import time
 import torch
 import gc
+import numpy as np
 # import whisperx
 from app.core.config import settings
+from app.services import audio_io, transcription_batcher, vad
+from app.services.model_registry import registry
+
+
+def _get_device() -> str:
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def get_whisper_model():
+    """
+    워커 프로세스에 상주하는 Whisper 모델을 반환합니다.
+    Returns (model, load_seconds) - 이미 로드되어 있으면 load_seconds 는 0.
+    """
+    import whisperx
+
+    device = _get_device()
+    compute_type = "float16" if device == "cuda" else "int8" # float16 only works on CUDA
+    model_name = settings.WHISPER_MODEL
+
+    def _load():
+        print(f"Loading Whisper model: {model_name}")
+        return whisperx.load_model(model_name, device, compute_type=compute_type)
+
+    return registry.get(f"whisper:{model_name}", _load)
+
+
+def get_align_model(language: str):
+    """
+    언어별 정렬 모델을 LRU 풀에서 반환합니다.
+    Returns ((model_a, metadata), load_seconds)
+    """
+    import whisperx
+
+    device = _get_device()
+
+    def _load():
+        print(f"Loading alignment model for language: {language}")
+        return whisperx.load_align_model(language_code=language, device=device)
+
+    return registry.get_lru(
+        "align",
+        language,
+        _load,
+        max_size=settings.ALIGN_MODEL_CACHE_SIZE,
+    )
+
+
+def preload_models():
+    """
+    worker_process_init 시점에 호출되어 Whisper 모델을 미리 로드합니다.
+    """
+    try:
+        get_whisper_model()
+        for language in filter(None, settings.WHISPER_PRELOAD_ALIGN_LANGUAGES.split(",")):
+            get_align_model(language.strip())
+    except ImportError:
+        print("WhisperX not installed. Skipping model preload.")
+
+
+def _detect_regions(audio) -> tuple:
+    """
+    VAD 로 음성 구간과 건너뛴 비율 메트릭을 반환합니다.
+    음성 구간이 없으면 (오검출 방지) 빈 목록을 반환하여 원본 전체를 사용하게 합니다.
+    """
+    if not settings.VAD_ENABLED:
+        return [], {}
+
+    regions = vad.detect_speech_regions(audio, audio_io.WHISPER_SAMPLE_RATE)
+    if not regions:
+        return [], {"speech_regions": 0, "skipped_fraction": 0.0}
+
+    speech_seconds = sum(end - start for start, end in regions)
+    total_seconds = max(len(audio) / audio_io.WHISPER_SAMPLE_RATE, 1e-6)
+    skipped = max(0.0, 1 - speech_seconds / total_seconds)
+    print(f"VAD: {len(regions)} speech regions, skipped {skipped:.1%} of audio")
+    return regions, {
+        "speech_regions": len(regions),
+        "skipped_fraction": round(skipped, 3),
+    }
+
+
+def _split_regions(audio, regions: list, max_seconds: float = 30.0) -> list:
+    """
+    Whisper 입력 창(30초)을 넘지 않도록 구간을 저에너지 지점에서 나눕니다.
+    """
+    return vad.split_long_regions(audio, audio_io.WHISPER_SAMPLE_RATE, regions, max_seconds)
+
+
+def _language_sample(pieces: list, max_seconds: float = 30.0):
+    """
+    언어 감지용 입력: 앞쪽 음성 청크들을 Whisper 입력 창 길이까지 이어붙입니다.
+    (첫 청크가 짧은 추임새/인트로여도 여러 청크의 노래를 보고 판단)
+    """
+    limit = int(max_seconds * audio_io.WHISPER_SAMPLE_RATE)
+    taken, size = [], 0
+    for piece in pieces:
+        taken.append(piece[: limit - size])
+        size += len(taken[-1])
+        if size >= limit:
+            break
+    return np.concatenate(taken)
+
+
+def _transcribe_batched(model, audio, regions: list, language: str = None) -> dict:
+    """
+    VAD 청크를 워커 공용 배처에 제출하여 다른 작업의 청크와 함께 배치로 전사합니다.
+    청크는 원래 타임라인 기준으로 잘리므로 타임스탬프 변환이 필요 없습니다.
+    """
+    sr = audio_io.WHISPER_SAMPLE_RATE
+    chunks = _split_regions(audio, regions or [(0.0, len(audio) / sr)])
+    pieces = [audio[int(start * sr) : int(end * sr)] for start, end in chunks]
+
+    if language is None:
+        # 무음 전주를 피하기 위해 음성 청크로만 언어 감지
+        language = model.detect_language(_language_sample(pieces) if pieces else audio)
+
+    texts = transcription_batcher.get_batcher(model).submit(pieces, language).result()
+    segments = [
+        {"text": text, "start": round(start, 3), "end": round(end, 3)}
+        for (start, end), text in zip(chunks, texts)
+        if text.strip()
+    ]
+    return {"segments": segments, "language": language}
+
+
+def _transcribe_compacted(model, audio, regions: list, language: str = None) -> dict:
+    """
+    음성 구간만 이어붙여 pipeline.transcribe 로 전사한 뒤 타임스탬프를 원래 타임라인으로 되돌립니다.
+    """
+    if not regions:
+        return model.transcribe(audio, batch_size=settings.WHISPER_BATCH_SIZE, language=language)
+
+    compact, offsets = vad.compact_audio(audio, audio_io.WHISPER_SAMPLE_RATE, regions)
+    result = model.transcribe(compact, batch_size=settings.WHISPER_BATCH_SIZE, language=language)
+    for seg in result["segments"]:
+        seg["start"] = vad.to_original_time(seg["start"], offsets)
+        seg["end"] = vad.to_original_time(seg["end"], offsets, is_end=True)
+    return result
+
 
 def transcribe_and_align(audio_path: str, language: str = None) -> dict:
     """
     Transcribes audio and aligns timestamps using WhisperX.
+    Models are kept warm in the worker-level registry between jobs.
     """
     print(f"Running WhisperX on {audio_path}")
 
     # Check for CUDA
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = _get_device()
     print(f"Using device: {device}")
 
-    # Batch size and compute type settings
-    batch_size = 16 # reduce if low GPU memory
-    compute_type = "float16" if device == "cuda" else "int8" # float16 only works on CUDA
-
     try:
         import whisperx
     except ImportError:
@@ -26,37 +164,51 @@ def transcribe_and_align(audio_path: str, language: str = None) -> dict:
 
     try:
         # 1. Transcribe with original Whisper (or Faster-Whisper via WhisperX)
-        # using 'large-v2' or 'large-v3' depending on requirements and VRAM
-        model_name = "large-v2"
-        print(f"Loading Whisper model: {model_name}")
-        model = whisperx.load_model(model_name, device, compute_type=compute_type)
+        model, load_seconds = get_whisper_model()
 
         print("Transcribing audio...")
-        audio = whisperx.load_audio(audio_path)
-        result = model.transcribe(audio, batch_size=batch_size, language=language)
+        started = time.perf_counter()
+        # vocals stem (DEMUCS_SAMPLE_RATE stereo) 을 16kHz mono 로 변환 (.npy 는 디코딩 없이 mmap)
+        audio = audio_io.load_whisper_input(audio_path)
 
-        # Free memory
-        model_a = None
-        model = None
-        gc.collect()
-        if device == "cuda":
-            torch.cuda.empty_cache()
+        # VAD: 노래 구간만 전사 (전주/간주/후주 ASR 연산 생략)
+        regions, vad_metrics = _detect_regions(audio)
+        if settings.TRANSCRIPTION_BATCHING:
+            result = _transcribe_batched(model, audio, regions, language)
+        else:
+            result = _transcribe_compacted(model, audio, regions, language)
+        transcribe_seconds = time.perf_counter() - started
 
         # 2. Align
         print("Aligning transcript...")
-        model_a, metadata = whisperx.load_align_model(language_code=result["language"], device=device)
+        (model_a, metadata), align_load_seconds = get_align_model(result["language"])
 
         # Align segments
+        started = time.perf_counter()
         aligned_result = whisperx.align(result["segments"], model_a, metadata, audio, device, return_char_alignments=False)
+        align_seconds = time.perf_counter() - started
 
-        # Free memory again
-        model_a = None
+        # 모델은 레지스트리에 남겨두고, 작업 중 생성된 중간 텐서만 정리
         gc.collect()
         if device == "cuda":
             torch.cuda.empty_cache()
 
-        print("Alignment completed.")
-        return {"segments": aligned_result["segments"], "language": result["language"]}
+        metrics = {
+            "model_load_seconds": round(load_seconds + align_load_seconds, 3),
+            "inference_seconds": round(transcribe_seconds + align_seconds, 3),
+            "transcribe_seconds": round(transcribe_seconds, 3),
+            "align_seconds": round(align_seconds, 3),
+            "warm": load_seconds == 0 and align_load_seconds == 0,
+            **vad_metrics,
+        }
+        if settings.TRANSCRIPTION_BATCHING:
+            metrics["batcher"] = transcription_batcher.get_batcher(model).stats()
+        print(f"Alignment completed. metrics={json.dumps(metrics)}")
+        return {
+            "segments": aligned_result["segments"],
+            "language": result["language"],
+            "metrics": metrics,
+        }
 
     except Exception as e:
         print(f"Error during WhisperX processing: {e}")
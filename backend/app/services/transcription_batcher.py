@@ -0,0 +1,161 @@
+"""
+워커 내 마이크로 배칭 전사 서비스
+
+여러 작업이 동시에 process_lyrics 에 도달하면, 각 작업의 짧은 VAD 청크를 짧은 시간 창(max_wait)
+동안 모아서 상주 Whisper 모델에 꽉 찬 배치로 한 번에 넣고, 결과를 각 작업으로 되돌려줍니다.
+
+transcription 큐 워커는 스레드 풀(-P threads)로 실행되어 한 프로세스(= 한 모델)에서
+여러 작업이 동시에 submit 할 수 있어야 합니다 (app/worker/topology.py 참고).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app.core.config import settings
+
+
+class _Request:
+    def __init__(self, chunks: list, language: str):
+        self.chunks = chunks
+        self.language = language
+        self.future = Future()
+
+
+class TranscriptionBatcher:
+    def __init__(self, model, batch_size: int = None, max_wait: float = None):
+        self.model = model
+        self.batch_size = batch_size or settings.WHISPER_BATCH_SIZE
+        self.max_wait = (
+            max_wait
+            if max_wait is not None
+            else settings.TRANSCRIPTION_BATCH_MAX_WAIT_MS / 1000
+        )
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._tokenizers = {}
+        self._thread = threading.Thread(
+            target=self._loop, name="transcription-batcher", daemon=True
+        )
+        self._started_at = time.time()
+        self._stats = {"batches": 0, "segments": 0, "slots": 0, "songs": 0}
+        self._stats_lock = threading.Lock()
+        self._thread.start()
+
+    def submit(self, chunks: list, language: str) -> Future:
+        """
+        16kHz mono 청크 목록(각 30초 이하)을 전사 요청합니다.
+        Future 결과는 청크 순서와 동일한 텍스트 목록입니다.
+        """
+        request = _Request(chunks, language)
+        if not chunks:
+            request.future.set_result([])
+            return request.future
+        self._queue.put(request)
+        return request.future
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        elapsed_hours = max(time.time() - self._started_at, 1e-6) / 3600
+        stats["avg_batch_fill"] = round(stats["segments"] / stats["slots"], 3) if stats["slots"] else 0.0
+        stats["songs_per_hour"] = round(stats["songs"] / elapsed_hours, 2)
+        return stats
+
+    # ===== 내부 구현 =====
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            pending = [first]
+            count = len(first.chunks)
+            deadline = time.monotonic() + self.max_wait
+
+            # 배치가 가득 차거나 대기 시간이 끝날 때까지 다른 작업의 청크를 모음
+            while count < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                pending.append(request)
+                count += len(request.chunks)
+
+            try:
+                self._run(pending)
+            except Exception as e:
+                for request in pending:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _run(self, pending: list):
+        # 언어별로 tokenizer 가 다르므로 같은 언어끼리 묶어서 실행
+        by_language = {}
+        for request in pending:
+            by_language.setdefault(request.language, []).append(request)
+
+        for language, requests in by_language.items():
+            inputs = [chunk for request in requests for chunk in request.chunks]
+            texts = self._transcribe(inputs, language)
+
+            # 각 작업으로 결과 분배 (scatter)
+            position = 0
+            for request in requests:
+                size = len(request.chunks)
+                request.future.set_result(texts[position : position + size])
+                position += size
+
+            with self._stats_lock:
+                batches = -(-len(inputs) // self.batch_size)
+                self._stats["batches"] += batches
+                self._stats["segments"] += len(inputs)
+                self._stats["slots"] += batches * self.batch_size
+                self._stats["songs"] += len(requests)
+
+    def _transcribe(self, inputs: list, language: str) -> list:
+        """
+        WhisperX FasterWhisperPipeline 의 모델에 청크 목록을 배치로 넣어 텍스트를 얻습니다.
+        (pipeline.transcribe 내부 루프와 동일하되, VAD 분할은 호출 측에서 이미 수행됨)
+        공유 모델의 model.tokenizer 는 바꾸지 않고, 언어별 tokenizer 를 배치마다 직접 넘깁니다.
+        """
+        import torch
+
+        model = self.model
+        tokenizer = self._tokenizer(language)
+        texts = []
+        for i in range(0, len(inputs), self.batch_size):
+            features = torch.stack(
+                [model.preprocess({"inputs": chunk})["inputs"] for chunk in inputs[i : i + self.batch_size]]
+            )
+            texts += model.model.generate_segment_batched(features, tokenizer, model.options)
+        return texts
+
+    def _tokenizer(self, language: str):
+        # 배처 스레드에서만 호출되므로 잠금 불필요
+        from faster_whisper.tokenizer import Tokenizer
+
+        if language not in self._tokenizers:
+            self._tokenizers[language] = Tokenizer(
+                self.model.model.hf_tokenizer,
+                self.model.model.model.is_multilingual,
+                task="transcribe",
+                language=language,
+            )
+        return self._tokenizers[language]
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher(model) -> TranscriptionBatcher:
+    """
+    프로세스 단위 배처 (상주 모델 1개당 1개).
+    """
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None or _batcher.model is not model:
+            _batcher = TranscriptionBatcher(model)
+        return _batcher
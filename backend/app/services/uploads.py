@@ -0,0 +1,288 @@
+"""
+청크 단위 재개 가능(resumable) 업로드
+
+tus 프로토콜과 유사한 오프셋 기반 방식입니다.
+1. 세션 생성: 파일 이름과 전체 크기를 등록하고 upload_id 를 받습니다.
+2. 청크 전송: Upload-Offset 헤더와 함께 바이트를 이어 보냅니다. 오프셋이 맞지 않으면 거절합니다.
+3. 중단 시: 세션 조회로 서버가 받은 오프셋을 확인하고 그 위치부터 다시 보냅니다.
+
+- 바이트는 임시 스풀 없이 최종 위치(UPLOAD_DIR/<upload_id>/<filename>)에 바로 기록됩니다.
+- SHA-256 은 바이트가 도착하는 대로 갱신됩니다. 해시 상태는 API 프로세스 메모리에 있으므로,
+  다른 프로세스가 이어받거나 재시작된 경우에만 기록된 앞부분을 다시 읽어 복원합니다.
+- 완료 시 파일을 산출물 저장소(콘텐츠 주소)로 옮기고, 가짜 작업 "uploads:<upload_id>" 가 세션 유지 기간
+  (UPLOAD_SESSION_TTL) 동안 참조를 유지합니다. 같은 내용이 이미 저장돼 있으면 새 파일을 지우고
+  기존 blob 에 참조만 추가합니다 (중복 제거). 작업은 이 ref 를 참조하므로 다른 업로드의 파일이
+  옮겨지거나 지워져도 영향이 없습니다.
+- 해시는 작업에 source_hash 로 전달되어, 이미 처리한 곡은 디코딩 없이 분리 캐시를 찾습니다.
+- 완료되지 않고 세션이 만료된 업로드, 작업에 쓰이지 않은 /upload 파일은
+  prune_uploads 가 지웁니다 (collect_artifacts 주기 작업).
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from app.core.config import settings
+from app.services import artifacts
+
+UPLOAD_KEY = "upload:{upload_id}"
+UPLOAD_LOCK_KEY = "upload:{upload_id}:lock"  # 쓰는 중인 요청의 토큰 (UPLOAD_LOCK_TTL, 쓰는 동안 갱신)
+UPLOAD_HOLDER = "uploads:{upload_id}"  # 완료된 업로드의 산출물 참조를 유지하는 가짜 작업 id
+
+# KEYS = lock, ARGV = token, ttl. 자기 토큰일 때만 만료 시각을 갱신 (ttl 0 이면 삭제)
+_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then return 0 end
+if tonumber(ARGV[2]) > 0 then return redis.call('EXPIRE', KEYS[1], ARGV[2]) end
+return redis.call('DEL', KEYS[1])
+"""
+
+# 이 크기만큼 모아서 디스크에 기록 (스레드 풀 왕복 횟수 감소)
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+# 프로세스에 보관하는 해시 상태 수 상한 (넘으면 가장 오래 쓰이지 않은 것부터 버림, 필요하면 파일에서 복원)
+MAX_HASHERS = 256
+
+# upload_id → (해시된 바이트 수, sha256 객체, 마지막 사용 시각). 사용 순서대로 정렬
+_hashers: "OrderedDict[str, Tuple[int, hashlib._Hash, float]]" = OrderedDict()
+
+
+class UploadNotFound(Exception):
+    pass
+
+
+class UploadConflict(Exception):
+    """
+    오프셋 불일치, 선언된 크기 초과, 동시 전송 등으로 청크를 받을 수 없는 경우.
+    """
+
+    def __init__(self, message: str, offset: int = None):
+        super().__init__(message)
+        self.offset = offset
+
+
+def upload_dir() -> str:
+    return settings.UPLOAD_DIR or os.path.join(settings.TEMP_DIR, "uploads")
+
+
+async def create_upload(redis, filename: str, size: int) -> dict:
+    if size <= 0 or size > settings.UPLOAD_MAX_BYTES:
+        raise UploadConflict(f"Upload size must be between 1 and {settings.UPLOAD_MAX_BYTES} bytes")
+
+    upload_id = uuid.uuid4().hex
+    # 클라이언트가 보낸 경로 구성요소는 버리고 파일 이름만 사용
+    name = os.path.basename(filename.replace("\\", "/")) or "upload"
+    path = os.path.join(upload_dir(), upload_id, name)
+    await asyncio.to_thread(_create_file, path)
+
+    session = {
+        "id": upload_id,
+        "filename": name,
+        "size": size,
+        "offset": 0,
+        "status": "uploading",
+        "path": path,
+        "createdAt": datetime.now().isoformat(),
+    }
+    key = UPLOAD_KEY.format(upload_id=upload_id)
+    pipe = redis.pipeline()
+    pipe.hset(key, mapping={k: str(v) for k, v in session.items()})
+    pipe.expire(key, settings.UPLOAD_SESSION_TTL)
+    await pipe.execute()
+    return session
+
+
+async def get_upload(redis, upload_id: str) -> Optional[dict]:
+    raw = await redis.hgetall(UPLOAD_KEY.format(upload_id=upload_id))
+    if not raw:
+        return None
+    raw["size"] = int(raw["size"])
+    raw["offset"] = int(raw["offset"])
+    return raw
+
+
+async def append_chunk(
+    redis, upload_id: str, offset: int, chunks: AsyncIterator[bytes]
+) -> dict:
+    """
+    offset 위치부터 chunks 를 파일에 이어 쓰고 갱신된 세션을 반환합니다.
+    연결이 중간에 끊겨도 받은 만큼은 기록되고 오프셋에 반영됩니다.
+    """
+    session = await get_upload(redis, upload_id)
+    if session is None:
+        raise UploadNotFound(upload_id)
+    if session["status"] == "complete":
+        return session
+    if offset != session["offset"]:
+        raise UploadConflict("Upload-Offset does not match", offset=session["offset"])
+
+    # 짧은 TTL 의 락을 쓰는 동안 갱신 → 프로세스가 죽어도 UPLOAD_LOCK_TTL 후 재개 가능
+    lock_key = UPLOAD_LOCK_KEY.format(upload_id=upload_id)
+    token = uuid.uuid4().hex
+    if not await redis.set(lock_key, token, nx=True, ex=settings.UPLOAD_LOCK_TTL):
+        raise UploadConflict("Another request is writing to this upload", offset=offset)
+    lock = redis.register_script(_LOCK_SCRIPT)
+
+    path, size = session["path"], session["size"]
+    written = offset
+    lock_lost = False
+    try:
+        hasher = await _get_hasher(upload_id, path, offset)
+        f = await asyncio.to_thread(_open_at, path, offset)
+        buffer = bytearray()
+        refreshed = time.monotonic()
+        try:
+            async for chunk in chunks:
+                if written + len(buffer) + len(chunk) > size:
+                    raise UploadConflict("Chunk exceeds declared upload size", offset=written)
+                buffer += chunk
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    await asyncio.to_thread(_write, f, hasher, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+                if time.monotonic() - refreshed > settings.UPLOAD_LOCK_TTL / 3:
+                    if not await lock(keys=[lock_key], args=[token, settings.UPLOAD_LOCK_TTL]):
+                        # 락이 만료되어 다른 요청이 이어받았을 수 있음 → 더 쓰지 않음
+                        lock_lost = True
+                        raise UploadConflict("Upload lock expired", offset=written)
+                    refreshed = time.monotonic()
+        finally:
+            # 연결이 끊겨도 이미 받은 바이트는 유효하므로 기록
+            if buffer and not lock_lost:
+                await asyncio.to_thread(_write, f, hasher, bytes(buffer))
+                written += len(buffer)
+            await asyncio.to_thread(f.close)
+            _remember_hasher(upload_id, written, hasher)
+    finally:
+        if not lock_lost:
+            await redis.hset(UPLOAD_KEY.format(upload_id=upload_id), "offset", written)
+            await lock(keys=[lock_key], args=[token, 0])
+
+    session["offset"] = written
+    if written == size:
+        session = await _finalize(redis, session)
+    return session
+
+
+def prune_uploads(redis_client, now: float = None) -> int:
+    """
+    세션이 없고 UPLOAD_SESSION_TTL 동안 수정되지 않은 업로드 디렉터리를 지웁니다.
+    (만료된 청크 업로드 세션, 작업에 쓰이지 않은 /upload 파일) Returns 삭제한 디렉터리 수
+    redis_client 는 동기 클라이언트입니다 (Celery 워커에서 실행).
+    """
+    root = upload_dir()
+    if not os.path.isdir(root):
+        return 0
+    cutoff = (now or time.time()) - settings.UPLOAD_SESSION_TTL
+    removed = 0
+    for entry in os.scandir(root):
+        if not entry.is_dir() or redis_client.exists(UPLOAD_KEY.format(upload_id=entry.name)):
+            continue
+        try:
+            modified = max(
+                [entry.stat().st_mtime]
+                + [child.stat().st_mtime for child in os.scandir(entry.path)]
+            )
+        except FileNotFoundError:
+            continue
+        if modified < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    if removed:
+        print(f"[Uploads] Removed {removed} expired upload directories")
+    return removed
+
+
+# ===== 내부 구현 =====
+
+
+async def _finalize(redis, session: dict) -> dict:
+    upload_id = session["id"]
+    # 저장이 실패해 마지막 청크 요청을 다시 받는 경우에도 해시 상태를 복원할 수 있도록 저장 후에 버림
+    hasher = await _get_hasher(upload_id, session["path"], session["size"])
+    digest = hasher.hexdigest()
+    ref, file_path = await asyncio.to_thread(_store_upload, upload_id, session["path"], digest)
+    _hashers.pop(upload_id, None)
+    print(f"Upload {upload_id} stored as {ref}")
+
+    session.update({"status": "complete", "sha256": digest, "ref": ref, "file_path": file_path})
+    await redis.hset(
+        UPLOAD_KEY.format(upload_id=upload_id),
+        mapping={"status": "complete", "sha256": digest, "ref": ref, "file_path": file_path},
+    )
+    return session
+
+
+def _store_upload(upload_id: str, path: str, digest: str) -> Tuple[str, str]:
+    """
+    완료된 파일을 산출물 저장소로 옮기고 세션 유지 기간 동안 참조를 고정합니다.
+    같은 내용이 이미 저장돼 있으면 (put_file 의 digest 조회) 새 파일은 지워지고 참조만 추가됩니다.
+    Returns (ref, 로컬 경로)
+    """
+    holder = UPLOAD_HOLDER.format(upload_id=upload_id)
+    ref = artifacts.put_file(holder, path, "source", move=True, digest=digest)
+    artifacts.release_job(holder, ttl=settings.UPLOAD_SESSION_TTL, pinned=True)
+    try:
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+    return ref, artifacts.local_path(ref)
+
+
+def _remember_hasher(upload_id: str, written: int, hasher) -> None:
+    """
+    해시 상태를 보관하고, 세션이 만료됐거나(UPLOAD_SESSION_TTL 동안 쓰이지 않음) 상한을 넘은 항목을 버립니다.
+    버려진 업로드가 다시 이어지면 _get_hasher 가 기록된 앞부분으로 복원합니다.
+    """
+    now = time.time()
+    _hashers[upload_id] = (written, hasher, now)
+    _hashers.move_to_end(upload_id)
+    while _hashers:
+        oldest_id, (_, _, used_at) = next(iter(_hashers.items()))
+        if len(_hashers) <= MAX_HASHERS and used_at > now - settings.UPLOAD_SESSION_TTL:
+            break
+        del _hashers[oldest_id]
+
+
+async def _get_hasher(upload_id: str, path: str, offset: int):
+    cached = _hashers.get(upload_id)
+    if cached and cached[0] == offset:
+        return cached[1]
+    # 다른 프로세스가 받던 업로드: 이미 기록된 앞부분으로 해시 상태 복원
+    return await asyncio.to_thread(_hash_prefix, path, offset)
+
+
+def _create_file(path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def _open_at(path: str, offset: int):
+    f = open(path, "r+b")
+    # 이전 요청이 오프셋 갱신 전에 중단되었다면 기록된 오프셋 이후는 버림
+    f.truncate(offset)
+    f.seek(offset)
+    return f
+
+
+def _write(f, hasher, data: bytes) -> None:
+    f.write(data)
+    hasher.update(data)
+
+
+def _hash_prefix(path: str, length: int):
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as f:
+        while remaining > 0:
+            data = f.read(min(WRITE_BUFFER_BYTES, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
@@ -0,0 +1,138 @@
+"""
+에너지 기반 음성 구간 검출 (VAD)
+
+Demucs 로 분리된 vocals stem 은 전주/간주/후주 구간이 거의 무음이므로,
+프레임 RMS(dBFS) 만으로 노래 구간을 충분히 가려낼 수 있습니다.
+검출된 구간만 이어붙여 WhisperX 에 넣고, 타임스탬프는 원래 타임라인으로 되돌립니다.
+"""
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def frame_rms_db(
+    audio: np.ndarray, sample_rate: int, frame_ms: float = 30, hop_ms: float = 10
+) -> np.ndarray:
+    """
+    프레임별 RMS 를 dBFS 로 계산합니다 (누적합 기반, 전체 벡터 연산).
+    """
+    frame = max(int(sample_rate * frame_ms / 1000), 1)
+    hop = max(int(sample_rate * hop_ms / 1000), 1)
+    if len(audio) < frame:
+        return np.full(1, -120.0, dtype=np.float32)
+
+    # 제곱 누적합으로 각 프레임의 평균 에너지를 O(n) 에 계산
+    cumsum = np.concatenate(([0.0], np.cumsum(np.square(audio, dtype=np.float64))))
+    starts = np.arange(0, len(audio) - frame + 1, hop)
+    energy = (cumsum[starts + frame] - cumsum[starts]) / frame
+    return (10 * np.log10(energy + 1e-12)).astype(np.float32)
+
+
+def detect_speech_regions(audio: np.ndarray, sample_rate: int) -> list:
+    """
+    음성(노래) 구간을 [(start_sec, end_sec), ...] 로 반환합니다.
+    """
+    hop_ms = settings.VAD_HOP_MS
+    db = frame_rms_db(audio, sample_rate, settings.VAD_FRAME_MS, hop_ms)
+    if db.size == 0:
+        return []
+
+    # 절대 임계값과 (상위 에너지 - 동적 범위) 중 큰 값을 사용하여 분리 잔여음(bleed) 무시
+    threshold = max(settings.VAD_THRESHOLD_DB, float(np.percentile(db, 95)) - settings.VAD_RELATIVE_DB)
+    active = (db > threshold).astype(np.int8)
+
+    # 활성 구간의 시작/끝 프레임 인덱스
+    edges = np.diff(np.concatenate(([0], active, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.size == 0:
+        return []
+
+    hop = hop_ms / 1000
+    frame = settings.VAD_FRAME_MS / 1000
+    start_sec = starts * hop
+    end_sec = (ends - 1) * hop + frame
+
+    # 짧은 무음으로 끊긴 구간은 병합
+    keep = np.concatenate(([True], start_sec[1:] - end_sec[:-1] >= settings.VAD_MIN_SILENCE_SECONDS))
+    merged_start = start_sec[keep]
+    merged_end = np.maximum.reduceat(end_sec, np.flatnonzero(keep))
+
+    # 너무 짧은 구간 제거 후 양쪽 패딩
+    long_enough = merged_end - merged_start >= settings.VAD_MIN_SPEECH_SECONDS
+    total = len(audio) / sample_rate
+    pad = settings.VAD_PAD_SECONDS
+    regions = []
+    for s, e in zip(merged_start[long_enough], merged_end[long_enough]):
+        s, e = max(0.0, s - pad), min(total, e + pad)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((float(s), float(e)))
+    return regions
+
+
+def split_long_regions(
+    audio: np.ndarray,
+    sample_rate: int,
+    regions: list,
+    max_seconds: float = 30.0,
+    search_seconds: float = None,
+) -> list:
+    """
+    max_seconds 를 넘는 구간을 나눕니다.
+    고정 간격으로 자르면 단어 중간이 잘리므로, 한계 직전 search_seconds 안에서
+    RMS 가 가장 낮은 프레임(숨 쉬는 곳 / 단어 사이)의 중앙을 경계로 사용합니다.
+    """
+    if search_seconds is None:
+        search_seconds = settings.VAD_SPLIT_SEARCH_SECONDS
+    search_seconds = min(max(search_seconds, 0.0), max_seconds / 2)
+    hop = settings.VAD_HOP_MS / 1000
+    frame = settings.VAD_FRAME_MS / 1000
+
+    chunks = []
+    for start, end in regions:
+        while end - start > max_seconds:
+            window_start = start + max_seconds - search_seconds
+            s = int(window_start * sample_rate)
+            e = int((start + max_seconds) * sample_rate)
+            db = frame_rms_db(audio[s:e], sample_rate, settings.VAD_FRAME_MS, settings.VAD_HOP_MS)
+            cut = window_start + int(np.argmin(db)) * hop + frame / 2
+            cut = min(cut, start + max_seconds)
+            chunks.append((start, cut))
+            start = cut
+        chunks.append((start, end))
+    return chunks
+
+
+def compact_audio(audio: np.ndarray, sample_rate: int, regions: list) -> tuple:
+    """
+    음성 구간만 이어붙인 오디오와, 압축 타임라인 → 원래 타임라인 매핑 정보를 반환합니다.
+    Returns (compact_audio, offsets) - offsets 는 [(compact_start, original_start), ...]
+    """
+    pieces = []
+    offsets = []
+    compact_pos = 0.0
+    for start, end in regions:
+        s, e = int(start * sample_rate), int(end * sample_rate)
+        pieces.append(audio[s:e])
+        offsets.append((compact_pos, s / sample_rate))
+        compact_pos += (e - s) / sample_rate
+    if not pieces:
+        return audio[:0], []
+    return np.concatenate(pieces), offsets
+
+
+def to_original_time(t: float, offsets: list, is_end: bool = False) -> float:
+    """
+    압축 타임라인의 시각을 원래 타임라인 시각으로 변환합니다.
+    구간 경계에 정확히 걸친 종료 시각(is_end=True)은 앞 구간의 끝으로 매핑합니다.
+    """
+    if not offsets:
+        return t
+    compact_starts = np.fromiter((c for c, _ in offsets), dtype=np.float64)
+    side = "left" if is_end else "right"
+    idx = max(int(np.searchsorted(compact_starts, t, side=side)) - 1, 0)
+    compact_start, original_start = offsets[idx]
+    return original_start + (t - compact_start)
@@ -1,5 +1,11 @@
 from celery import Celery
+import os
+import resource
+import signal
+
+from celery.signals import task_postrun, worker_init, worker_process_init
 from app.core.config import settings
+from app.worker import topology
 
 celery_app = Celery(
     "worker",
@@ -8,12 +14,9 @@ celery_app = Celery(
     include=["app.worker.tasks"],
 )
 
-celery_app.conf.task_routes = {
-    "app.worker.tasks.process_audio": "main-queue",
-    "app.worker.tasks.process_lyrics": "main-queue",
-    "app.worker.tasks.process_linguistics": "main-queue",
-    "app.worker.tasks.render_video": "main-queue",
-}
+# 단계별 리소스 큐 라우팅 (토폴로지는 app/worker/topology.py 참고)
+celery_app.conf.task_routes = (topology.route_task,)
+celery_app.conf.task_default_queue = "default"
 
 celery_app.conf.update(
     task_serializer="json",
@@ -21,4 +24,87 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # 워커 프로세스가 한 번에 하나의 메시지만 선점 (긴 작업 뒤에 짧은 작업이 묶이지 않도록)
+    worker_prefetch_multiplier=1,
+    # acks_late 작업은 워커가 비정상 종료되면 다시 큐에 적재
+    task_reject_on_worker_lost=True,
+    task_time_limit=settings.TASK_TIME_LIMIT,
+    broker_transport_options={
+        # Redis 브로커 메시지 우선순위 (큐마다 우선순위 단계별 하위 리스트, 0 이 가장 먼저 소비)
+        # queue_order_strategy 는 여러 큐 사이의 소비 순서이므로 기본값(round_robin) 유지
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        # ack 되지 않은 메시지를 재전달하기까지의 시간 (기본 1시간). 가장 긴 작업보다 길어야
+        # 실행 중인 acks_late 작업이 다른 워커에서 중복 실행되지 않음
+        "visibility_timeout": settings.TASK_TIME_LIMIT + 600,
+    },
 )
+
+# 주기 작업 (celery -A app.worker.celery_app beat)
+celery_app.conf.beat_schedule = {
+    "collect-artifacts": {
+        "task": "app.worker.tasks.collect_artifacts",
+        "schedule": settings.ARTIFACT_GC_INTERVAL,
+    },
+}
+
+
+# 워커 메인 프로세스 pid (threads / solo 풀은 이 프로세스에서 작업이 실행됨)
+_worker_pid = None
+_shutdown_requested = False
+
+
+def _preload_models():
+    models = {m.strip() for m in settings.WORKER_PRELOAD_MODELS.split(",") if m.strip()}
+    if "whisper" in models:
+        from app.services import transcription
+
+        transcription.preload_models()
+    if "demucs" in models:
+        from app.services import audio_separation
+
+        audio_separation.preload_models()
+
+
+@worker_process_init.connect
+def preload_worker_models(**kwargs):
+    """
+    워커 프로세스(fork 이후)마다 한 번 실행되어 모델을 미리 메모리에 올립니다.
+    이후 작업들은 model_registry 에 상주한 모델을 재사용합니다.
+    """
+    _preload_models()
+
+
+@worker_init.connect
+def preload_thread_pool_models(sender=None, **kwargs):
+    """
+    threads/solo 풀은 fork 하지 않아 worker_process_init 가 발생하지 않으므로,
+    워커 메인 프로세스에서 모델을 미리 로드합니다 (prefork 는 부모에서 로드하지 않음).
+    """
+    global _worker_pid
+    pool_cls = getattr(sender, "pool_cls", "")
+    pool_name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, "__module__", "")
+    if "prefork" not in pool_name:
+        _worker_pid = os.getpid()
+        _preload_models()
+
+
+@task_postrun.connect
+def enforce_worker_memory(**kwargs):
+    """
+    --max-memory-per-child 는 prefork 자식 프로세스에만 적용되므로, threads 풀 워커는 작업이 끝날 때마다
+    최대 RSS 를 WORKER_MAX_MEMORY_MB 와 비교합니다. 넘으면 warm shutdown(SIGTERM)으로 실행 중인 작업을
+    마친 뒤 종료되고, 컨테이너 재시작 정책이 새 프로세스를 띄웁니다.
+    """
+    global _shutdown_requested
+    if settings.WORKER_MAX_MEMORY_MB <= 0 or _shutdown_requested or os.getpid() != _worker_pid:
+        return
+    # Linux 에서 ru_maxrss 단위는 KB (prefork 의 --max-memory-per-child 와 같은 기준)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if rss_mb > settings.WORKER_MAX_MEMORY_MB:
+        print(
+            f"[Worker] RSS {rss_mb:.0f}MB exceeds WORKER_MAX_MEMORY_MB="
+            f"{settings.WORKER_MAX_MEMORY_MB}, shutting down after running tasks"
+        )
+        _shutdown_requested = True
+        os.kill(os.getpid(), signal.SIGTERM)
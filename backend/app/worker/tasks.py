@@ -1,9 +1,8 @@
 import os
+import shutil
 import time
-import json
-import ffmpeg
 from pathlib import Path
-from celery import chain
+from celery import chain, chord
 from app.worker.celery_app import celery_app
 from app.services import (
     audio_separation,
@@ -11,7 +10,14 @@ from app.services import (
     synthesis,
     media_downloader,
     linguistics,
+    result_cache,
+    audio_io,
+    artifacts,
+    storage,
+    subtitle_generator,
+    uploads,
 )
+from app.core import job_store
 from app.core.redis import get_redis_client
 from app.core.config import settings
 
@@ -21,33 +27,6 @@ RESOURCE_DIR = Path(__file__).parent.parent.parent / "resource"
 redis_client = get_redis_client()
 
 
-def convert_to_wav(input_path: str) -> str:
-    """
-    Converts input audio/video to 44.1kHz WAV for consistent processing.
-    """
-    try:
-        output_path = os.path.splitext(input_path)[0] + "_proc.wav"
-        print(f"Converting {input_path} to {output_path}")
-
-        stream = ffmpeg.input(input_path)
-        stream = ffmpeg.output(
-            stream, output_path, acodec="pcm_s16le", ar="44100", ac=2
-        )
-        ffmpeg.run(stream, overwrite_output=True, quiet=True)
-
-        return output_path
-    except FileNotFoundError:
-        error_msg = (
-            "FFmpeg not found. Please install ffmpeg (e.g., sudo apt install ffmpeg)."
-        )
-        print(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        print(f"Error converting audio: {e}")
-        # If conversion fails, return original and hope Demucs handles it
-        return input_path
-
-
 def update_job_progress(
     job_id: str,
     status: str,
@@ -56,82 +35,226 @@ def update_job_progress(
     error: str = None,
     detail: str = None,
 ):
-    data = {
-        "id": job_id,
-        "status": status,
-        "progress": progress,
-        "updated_at": time.time(),
-    }
-    if result:
-        data["result"] = result
-    if error:
-        data["error"] = error
-    if detail:
-        data["detail"] = detail
-
-    # Get existing data to preserve fields like title, artist if stored there
-    existing = redis_client.get(f"job:{job_id}")
-    if existing:
-        existing_data = json.loads(existing)
-        data = {**existing_data, **data}
-
-    redis_client.set(f"job:{job_id}", json.dumps(data))
+    # 변경된 필드만 HSET + 진행 이벤트 PUBLISH (job_store 참고)
+    job_store.update_job(
+        redis_client,
+        job_id,
+        {
+            "status": status,
+            "progress": progress,
+            "updated_at": time.time(),
+            "result": result or None,
+            "error": error or None,
+            "detail": detail or None,
+        },
+    )
+    if status in job_store.TERMINAL_STATUSES:
+        # ARTIFACT_TTL 후 GC 가 이 작업의 중간 파일 참조를 해제
+        artifacts.release_job(job_id)
 
 
 @celery_app.task(bind=True)
-def process_audio(self, job_id: str, file_path: str, use_mock: bool = False):
+def fetch_media(
+    self,
+    job_id: str,
+    file_path: str,
+    use_mock: bool = False,
+    target_languages: list = None,
+    source_hash: str = None,
+    submitted_at: float = None,
+    source_ref: str = None,
+):
     """
-    Step 1: Audio Separation using Demucs
+    Step 0: Download media (if URL)
+    디코딩은 separation 단계에서 메모리로 한 번만 수행합니다 (중간 WAV 없음).
+    source_ref: 청크 업로드가 완료 시 산출물 저장소에 등록한 ref (참조만 추가)
     """
     try:
         update_job_progress(
-            job_id, "PROCESSING", 10, detail="Separating vocals and instrumentals..."
+            job_id, "PROCESSING", 5, detail="Preparing source audio..."
         )
-        print(f"Processing audio for job {job_id}")
+        print(f"Fetching media for job {job_id}")
 
+        metrics = {}
         if use_mock:
             # Mock 모드: 기본 리소스 파일 사용
             mock_file = RESOURCE_DIR / "odoriko.m4a"
             file_path = str(mock_file)
             print(f"Using mock file: {file_path}")
+        if source_ref:
+            # 업로드 세션이 참조를 유지하는 동안(UPLOAD_SESSION_TTL)에는 GC 되지 않음
+            if not artifacts.attach(job_id, "original", source_ref):
+                raise FileNotFoundError("Uploaded file has expired. Please upload it again.")
+            original = source_ref
         elif file_path.startswith("http://") or file_path.startswith("https://"):
+            # 다운로드 캐시 조회 → 없으면 재인코딩 없이 다운로드하여 산출물 저장소로 이동
             print(f"Downloading media from {file_path}")
-            file_path = media_downloader.download_media(file_path)
+            original, metrics["download"] = media_downloader.fetch_to_artifacts(
+                job_id, file_path
+            )
+        else:
+            # 업로드 파일(UPLOAD_DIR, TEMP_DIR)은 저장소로 옮겨 GC 가 수명을 관리하고,
+            # 리소스 등 그 밖의 파일은 링크 또는 복사
+            # 청크 업로드에서 계산된 SHA-256 이 있으면 다시 해시하지 않음
+            temporary = _is_temporary(file_path)
+            original = artifacts.put_file(
+                job_id, file_path, "original", move=temporary, digest=source_hash
+            )
+            if temporary:
+                _remove_empty_dir(os.path.dirname(file_path))
+
+        return {
+            "job_id": job_id,
+            "original": original,
+            "use_mock": use_mock,
+            "target_languages": target_languages or ["ko"],
+            # 원본 파일 SHA-256 (산출물 ref 의 콘텐츠 해시와 동일)
+            "source_hash": artifacts.ref_digest(original),
+            "submitted_at": submitted_at,
+            "metrics": metrics,
+        }
+    except Exception as e:
+        update_job_progress(job_id, "FAILED", 0, error=str(e))
+        raise e
+
+
+def _is_temporary(path: str) -> bool:
+    path = os.path.realpath(path)
+    for root in (uploads.upload_dir(), settings.TEMP_DIR):
+        root = os.path.realpath(root)
+        if os.path.commonpath([path, root]) == root:
+            return True
+    return False
 
-        # Preprocessing: Convert to WAV
-        if not use_mock:
-            file_path = convert_to_wav(file_path)
+
+def _remove_empty_dir(path: str) -> None:
+    # 업로드마다 만든 디렉터리 (UPLOAD_DIR/<upload_id>/)
+    if os.path.realpath(path) in (
+        os.path.realpath(uploads.upload_dir()),
+        os.path.realpath(settings.TEMP_DIR),
+    ):
+        return
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
+@celery_app.task(bind=True, acks_late=True)
+def process_audio(self, prev_result: dict):
+    """
+    Step 1: Audio Separation using Demucs
+    """
+    job_id = prev_result["job_id"]
+    try:
+        use_mock = prev_result.get("use_mock", False)
+
+        update_job_progress(
+            job_id, "PROCESSING", 10, detail="Separating vocals and instrumentals..."
+        )
+        print(f"Processing audio for job {job_id}")
 
         # Call Demucs service
+        metrics = prev_result.get("metrics", {})
+        separation_key = None
+        audio = None
         if use_mock:
             time.sleep(2)
-            separated_paths = {"vocals": file_path, "instrumental": file_path}
+            vocals = instrumental = prev_result["original"]
         else:
-            separated_paths = audio_separation.separate_audio(file_path)
+            file_path = artifacts.local_path(prev_result["original"])
+            params = {
+                "model": settings.DEMUCS_MODEL,
+                "segment": settings.DEMUCS_SEGMENT,
+                "overlap": settings.DEMUCS_OVERLAP,
+                "shifts": settings.DEMUCS_SHIFTS,
+                "stems": audio_separation.STEM_VERSION,
+            }
+            cache = result_cache.get_result_cache()
+            cached = None
+            source_key = None
+            if cache:
+                # 1. 원본 파일 해시로 먼저 조회 → 이미 처리한 파일이면 디코딩 생략
+                source_hash = prev_result.get("source_hash") or result_cache.hash_file(file_path)
+                source_key = result_cache.make_key(source_hash, **params)
+                separation_key = cache.get_source_key(source_key)
+                if separation_key:
+                    # miss 면 아래 PCM 키 조회가 집계 (한 번의 실행에 miss 1회)
+                    cached = cache.get_files("separation", separation_key, record_miss=False)
+
+            if not cached:
+                # ffmpeg stdout → NumPy 버퍼로 한 번만 디코딩 (44.1kHz stereo)
+                audio = audio_io.decode_audio(file_path)
+                if cache:
+                    # 2. 디코딩된 PCM 해시 + 모델/파라미터로 조회 (컨테이너만 다른 같은 곡)
+                    separation_key = result_cache.make_key(
+                        result_cache.hash_audio_content(audio, audio_io.DEMUCS_SAMPLE_RATE),
+                        **params,
+                    )
+                    cached = cache.get_files("separation", separation_key)
+                    if cached:
+                        cache.put_source_key(source_key, separation_key)
+
+            if cached:
+                print(f"Separation cache hit: {separation_key}")
+                separated_paths = cached
+                metrics["separation"] = {
+                    "cache_hit": True,
+                    "decode_skipped": audio is None,
+                }
+            else:
+                separated_paths = audio_separation.separate_audio(
+                    audio, name=job_id
+                )
+                metrics["separation"] = {
+                    **separated_paths.get("metrics", {}),
+                    "cache_hit": False,
+                }
+                if separation_key:
+                    cache.put_files(
+                        "separation",
+                        separation_key,
+                        {
+                            "vocals": separated_paths["vocals"],
+                            "instrumental": separated_paths["instrumental"],
+                        },
+                    )
+                    cache.put_source_key(source_key, separation_key)
+
+            # stem 을 산출물 저장소에 등록 (캐시 항목은 링크/복사, 새로 분리한 파일은 이동)
+            vocals = artifacts.put_file(
+                job_id, separated_paths["vocals"], "vocals", move=not cached
+            )
+            instrumental = artifacts.put_file(
+                job_id, separated_paths["instrumental"], "instrumental", move=not cached
+            )
+            if not cached:
+                shutil.rmtree(os.path.dirname(separated_paths["vocals"]), ignore_errors=True)
 
         update_job_progress(
             job_id, "PROCESSING", 30, detail="Audio separation complete."
         )
-        return {
-            "job_id": job_id,
-            "vocals": separated_paths["vocals"],
-            "instrumental": separated_paths["instrumental"],
-            "original": file_path,
-            "use_mock": use_mock,
-        }
+        prev_result.update(
+            {
+                "vocals": vocals,
+                "instrumental": instrumental,
+                "separation_key": separation_key,
+                "metrics": metrics,
+            }
+        )
+        return prev_result
     except Exception as e:
         update_job_progress(job_id, "FAILED", 0, error=str(e))
         raise e
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, acks_late=True)
 def process_lyrics(self, prev_result: dict):
     """
     Step 2: Transcription & Alignment using WhisperX
     """
+    job_id = prev_result["job_id"]
     try:
-        job_id = prev_result["job_id"]
-        vocals_path = prev_result["vocals"]
         use_mock = prev_result.get("use_mock", False)
 
         update_job_progress(job_id, "PROCESSING", 40, detail="Transcribing lyrics...")
@@ -184,9 +307,44 @@ def process_lyrics(self, prev_result: dict):
                 "language": "ja",
             }
         else:
-            result = transcription.transcribe_and_align(vocals_path)
-
-        prev_result["lyrics"] = result
+            cache = result_cache.get_result_cache()
+            separation_key = prev_result.get("separation_key")
+            transcription_key = None
+            result = None
+            if cache and separation_key:
+                # vocals stem 은 separation_key 로 식별되므로 이를 콘텐츠 키로 사용
+                transcription_key = result_cache.make_key(
+                    separation_key, **result_cache.transcription_params()
+                )
+                result = cache.get_json("transcription", transcription_key)
+
+            if result:
+                print(f"Transcription cache hit: {transcription_key}")
+                result["metrics"] = {"cache_hit": True}
+            else:
+                vocals_path = artifacts.local_path(prev_result["vocals"])
+                result = transcription.transcribe_and_align(vocals_path)
+                if transcription_key:
+                    cache.put_json(
+                        "transcription",
+                        transcription_key,
+                        {k: v for k, v in result.items() if k != "metrics"},
+                    )
+                result.setdefault("metrics", {})["cache_hit"] = False
+            prev_result["transcription_key"] = transcription_key
+
+        # 모델 로드 시간 vs 추론 시간 메트릭은 lyrics 와 분리하여 보관
+        metrics = result.pop("metrics", None)
+        if metrics:
+            prev_result.setdefault("metrics", {})["transcription"] = metrics
+
+        # 가사는 평탄한 배열 산출물(npz)로 한 번 저장하고, 이후 단계에는 참조만 전달
+        # (세그먼트/단어 dict 를 매 단계 broker 메시지와 result backend 에 싣지 않음)
+        lyrics_ref = artifacts.save_lyrics(job_id, result)
+        prev_result["lyrics_ref"] = lyrics_ref
+        prev_result.setdefault("metrics", {})["lyrics_artifact"] = {
+            "bytes": artifacts.artifact_size(lyrics_ref)
+        }
         update_job_progress(
             job_id, "PROCESSING", 50, detail="Lyrics transcription complete."
         )
@@ -202,42 +360,47 @@ def process_linguistics(self, prev_result: dict):
     """
     Step 2.5: Linguistic Analysis (Translation & Romanization) using LLM
     """
+    job_id = prev_result["job_id"]
     try:
-        job_id = prev_result["job_id"]
         use_mock = prev_result.get("use_mock", False)
 
-        # lyrics 데이터 접근 (항상 dict 구조: {"segments": [...], "language": "..."})
-        lyrics_data = prev_result.get("lyrics", {})
-        if isinstance(lyrics_data, dict):
-            lyrics_segments = lyrics_data.get("segments", [])
-        else:
-            # Fallback: 혹시 list로 온 경우 대비
-            lyrics_segments = lyrics_data if isinstance(lyrics_data, list) else []
+        table = artifacts.load_lyrics(prev_result["lyrics_ref"])
 
         update_job_progress(
             job_id, "PROCESSING", 60, detail="Translating and romanizing lyrics..."
         )
-        print(
-            f"Processing linguistics for job {job_id}, segments count: {len(lyrics_segments)}"
-        )
+        print(f"Processing linguistics for job {job_id}, segments count: {len(table)}")
+
+        # 요청된 모든 목표 언어로 한 번에 fan-out (오디오 처리는 재실행하지 않음)
+        target_languages = prev_result.get("target_languages") or ["ko"]
 
         if use_mock:
             time.sleep(1)
-            # Mock 모드: 번역/로마자화 필드 추가
-            for seg in lyrics_segments:
-                seg["translated"] = f"[번역] {seg['text']}"
-                seg["romanized"] = f"[발음] {seg['text']}"
+            # Mock 모드: 번역/로마자화 열 추가
+            table.translations = {
+                lang: [f"[번역:{lang}] {text}" for text in table.texts]
+                for lang in target_languages
+            }
+            table.romanized = [f"[발음] {text}" for text in table.texts]
         else:
-            # 실제 Gemini API 호출 (target_lang은 추후 job 메타데이터에서 가져올 수 있음)
-            lyrics_segments = linguistics.translate_and_romanize(
-                lyrics_segments, target_lang="ko"
+            # 실제 Gemini API 호출 (로마자 1회 + 목표 언어별 번역 동시 요청)
+            # linguistics 는 세그먼트 dict 목록을 받으므로 텍스트만 담아 넘김
+            segments = linguistics.translate_and_romanize(
+                [{"text": text} for text in table.texts],
+                target_langs=target_languages,
+                cache_key=prev_result.get("transcription_key"),
+                source_lang=table.language,
             )
+            table.romanized = [seg.get("romanized") or "" for seg in segments]
+            table.translations = {
+                lang: [seg.get("translations", {}).get(lang) or "" for seg in segments]
+                for lang in target_languages
+            }
+        table.translated = table.translations[target_languages[0]]
 
-        # 결과 업데이트 (통일된 dict 구조 유지)
-        if isinstance(prev_result.get("lyrics"), dict):
-            prev_result["lyrics"]["segments"] = lyrics_segments
-        else:
-            prev_result["lyrics"] = {"segments": lyrics_segments, "language": "unknown"}
+        # 내용이 바뀌었으므로 새 ref (콘텐츠 해시) 로 저장. 작업의 "lyrics" 산출물이 새 ref 로 바뀌고
+        # 이전 blob 은 참조가 줄어 GC 대상이 됨. 입력 ref 는 그대로이므로 재시도해도 전사 결과부터 다시 처리
+        prev_result["lyrics_ref"] = artifacts.save_lyrics(job_id, table)
 
         update_job_progress(
             job_id, "PROCESSING", 75, detail="Linguistic processing complete."
@@ -245,109 +408,330 @@ def process_linguistics(self, prev_result: dict):
         return prev_result
 
     except Exception as e:
-        update_job_progress(job_id, "FAILED", 0, error=str(e))
-        print(f"Linguistics failed: {e}")
-        # 번역 실패해도 원본 가사로 계속 진행
+        # 번역은 best-effort: 작업을 실패 처리하지 않고 원본 가사로 렌더링까지 계속 진행
+        # (FAILED 로 바꾸면 이후 render_video 가 COMPLETED 로 덮어써 상태가 뒤집힘)
+        print(f"Linguistics failed for job {job_id}, continuing without translation: {e}")
+        update_job_progress(
+            job_id, "PROCESSING", 75, detail="Translation failed. Continuing with original lyrics."
+        )
         return prev_result
 
 
-def upload_to_storage(file_path: str, job_id: str) -> str:
+def upload_to_storage(file_path: str, job_id: str, content_type: str = "video/mp4") -> str:
     """
     Uploads the generated video to S3/R2 and returns the public URL.
     """
     try:
-        # Check R2 credentials
-        if not (
-            settings.R2_ACCESS_KEY_ID
-            and settings.R2_SECRET_ACCESS_KEY
-            and settings.R2_BUCKET_NAME
-        ):
+        if not storage.storage_enabled():
             print("R2 credentials not found. Skipping upload.")
-            return file_path  # Return local path if R2 not configured
+            # Return local path if R2 not configured
+            # (결과로 고정하여 작업 기록 보존 기간 동안 유지, 이후 GC 가 정리)
+            ref = artifacts.keep_result(job_id, file_path, os.path.basename(file_path))
+            return artifacts.local_path(ref)
 
-        import boto3
+        key = storage.output_key(job_id, os.path.basename(file_path))
+        url = storage.upload_file(file_path, key, content_type=content_type)
+        os.remove(file_path)
+        return url
 
-        # Cloudflare R2 endpoint URL
-        r2_endpoint = f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com"
+    except Exception as e:
+        print(f"Error uploading to S3: {e}")
+        return file_path  # Fallback to local path
 
-        s3 = boto3.client(
-            "s3",
-            aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-            endpoint_url=r2_endpoint,
-            region_name="auto",  # R2는 항상 auto
-        )
 
-        filename = os.path.basename(file_path)
-        s3_key = f"outputs/{job_id}/{filename}"
+def _render_input(prev_result: dict) -> dict:
+    """
+    렌더링 입력: 산출물 ref 를 로컬 경로로 바꾸고 가사 산출물을 로드해 붙인 prev_result 사본.
+    로드한 LyricsTable 과 로컬 경로는 이 프로세스 안에서만 쓰이며 Celery 메시지로 넘기지 않습니다.
+    """
+    render_input = dict(prev_result)
+    for field in ("instrumental", "audio_track", "prepared_background"):
+        if prev_result.get(field):
+            render_input[field] = artifacts.local_path(prev_result[field])
+    if prev_result.get("lyrics_ref"):
+        render_input["lyrics"] = artifacts.load_lyrics(prev_result["lyrics_ref"])
+    return render_input
+
+
+def _render_and_upload(
+    prev_result: dict, job_id: str, language: str, profile: str = None
+) -> str:
+    """
+    렌더링 후 업로드합니다. STORAGE_STREAMING_UPLOAD 가 켜져 있으면 인코딩 중에 업로드합니다.
+    스트리밍 업로드가 실패하면 렌더링된 로컬 파일로 일반 업로드를 다시 시도합니다.
+    """
+    upload = None
+    try:
+        upload = storage.open_streaming_upload(
+            job_id, synthesis.output_filename(job_id, language, profile)
+        )
+    except Exception as e:
+        print(f"Streaming upload unavailable, falling back to upload after render: {e}")
 
-        print(f"Uploading {file_path} to r2://{settings.R2_BUCKET_NAME}/{s3_key}")
+    if upload is None:
+        output_path = synthesis.render_karaoke_video(
+            prev_result, language=language, profile=profile
+        )
+        return upload_to_storage(output_path, job_id)
 
-        s3.upload_file(
-            file_path,
-            settings.R2_BUCKET_NAME,
-            s3_key,
-            ExtraArgs={
-                "ContentType": "video/mp4",
-            },  # R2는 ACL 미지원
+    try:
+        output_path = synthesis.render_karaoke_video(
+            prev_result, language=language, sink=upload, profile=profile
         )
+    except Exception:
+        upload.abort()
+        raise
+    try:
+        url = upload.complete()
+        os.remove(output_path)
+        return url
+    except Exception as e:
+        print(f"Streaming upload failed ({e}), retrying from local file")
+        return upload_to_storage(output_path, job_id)
 
-        # Construct public URL using R2 public URL
-        if settings.R2_PUBLIC_URL:
-            public_url = f"{settings.R2_PUBLIC_URL}/{s3_key}"
-        else:
-            # Fallback: S3 compatible URL (접근 불가할 수 있음)
-            public_url = f"{r2_endpoint}/{settings.R2_BUCKET_NAME}/{s3_key}"
 
-        return public_url
+@celery_app.task(bind=True)
+def prepare_render_assets(self, prev_result: dict):
+    """
+    Step 2' (parallel with lyrics): Prepare render inputs that don't need lyrics.
+    반주 정규화 + AAC 인코딩, 길이 측정, 배경 영상 준비를 WhisperX/Gemini 와 동시에 수행합니다.
+    """
+    try:
+        job_id = prev_result["job_id"]
+        print(f"Preparing render assets for job {job_id}")
 
+        started = time.perf_counter()
+        audio_track = synthesis.prepare_audio_track(
+            artifacts.local_path(prev_result["instrumental"]), job_id
+        )
+        duration = synthesis.probe_duration(audio_track)
+        audio_track = artifacts.put_file(job_id, audio_track, "audio_track", move=True)
+        prepared_background = synthesis.prepare_background(
+            prev_result.get("background"), job_id
+        )
+        if prepared_background:
+            prepared_background = artifacts.put_file(
+                job_id, prepared_background, "background", move=True
+            )
+
+        return {
+            "job_id": job_id,
+            "audio_track": audio_track,
+            "duration": duration,
+            "prepared_background": prepared_background,
+            "metrics": {
+                "render_prep": {
+                    "seconds": round(time.perf_counter() - started, 3),
+                }
+            },
+        }
     except Exception as e:
-        print(f"Error uploading to S3: {e}")
-        return file_path  # Fallback to local path
+        update_job_progress(job_id, "FAILED", 0, error=str(e))
+        raise e
+
+
+def _merge_branch_results(results) -> dict:
+    """
+    chord 헤더(가사 분기 + 렌더 준비 분기)의 결과들을 하나의 dict 로 병합합니다.
+    """
+    if isinstance(results, dict):
+        return results
+
+    merged = {}
+    metrics = {}
+    for result in results:
+        if not result:
+            continue
+        metrics.update(result.get("metrics", {}))
+        merged.update({k: v for k, v in result.items() if k != "metrics"})
+    merged["metrics"] = metrics
+    return merged
 
 
 @celery_app.task(bind=True)
-def render_video(self, prev_result: dict):
+def render_video(self, prev_result):
     """
-    Step 3: Render final video using FFmpeg
+    Step 3: Render final video using FFmpeg (final mux + subtitle burn)
+    prev_result 는 chord 결과 list 이거나 (이전 호환) 단일 dict 입니다.
+
+    RENDER_PREVIEW_ENABLED 이면 먼저 첫 번째 언어의 저해상도 미리보기(preview 프로파일, 오디오 복사)를
+    렌더링해 작업 결과에 게시하고, 고화질 렌더링은 낮은 우선순위의 render_full 작업으로 넘깁니다.
     """
+    prev_result = _merge_branch_results(prev_result)
+    job_id = prev_result["job_id"]
     try:
-        job_id = prev_result["job_id"]
+        if not settings.RENDER_PREVIEW_ENABLED:
+            return _render_full(prev_result)
+
         update_job_progress(
-            job_id, "PROCESSING", 80, detail="Rendering karaoke video..."
+            job_id, "PROCESSING", 80, detail="Rendering preview..."
         )
-        print(f"Rendering video for job {job_id}")
+        print(f"Rendering preview for job {job_id}")
 
-        # Call Synthesis service
-        # In mock mode, we might just return the original file path as "output"
-        output_path = synthesis.render_karaoke_video(prev_result)
+        started = time.perf_counter()
+        target_languages = prev_result.get("target_languages") or ["ko"]
+        preview_path = synthesis.render_karaoke_video(
+            _render_input(prev_result), language=target_languages[0], profile="preview"
+        )
+        preview_url = upload_to_storage(preview_path, job_id)
 
-        # Upload to S3 if configured
-        final_url = upload_to_storage(output_path, job_id)
+        metrics = prev_result.get("metrics", {})
+        metrics["preview"] = {"seconds": round(time.perf_counter() - started, 3)}
+        submitted_at = prev_result.get("submitted_at")
+        if submitted_at:
+            # 작업 제출 → 처음으로 재생 가능한 결과가 게시되기까지
+            metrics["time_to_first_output"] = round(time.time() - submitted_at, 3)
+        prev_result["metrics"] = metrics
+        prev_result["preview_url"] = preview_url
 
-        # Finalize
         update_job_progress(
             job_id,
-            "COMPLETED",
-            100,
-            result={"output_path": final_url},
-            detail="Job completed successfully.",
+            "PROCESSING",
+            85,
+            result={"preview_url": preview_url, "metrics": metrics},
+            detail="Preview ready. Rendering full quality video...",
         )
 
-        return {"job_id": job_id, "status": "completed", "output_path": final_url}
+        # 고화질 렌더링은 다른 작업의 미리보기보다 뒤에 처리 (topology.TASK_PRIORITIES)
+        render_full.delay(prev_result)
+        return {"job_id": job_id, "status": "preview", "preview_url": preview_url}
     except Exception as e:
         update_job_progress(job_id, "FAILED", 0, error=str(e))
         raise e
 
 
-def create_karaoke_job(job_id: str, file_path: str, use_mock: bool = False):
+@celery_app.task(bind=True)
+def render_full(self, prev_result: dict):
+    """
+    Step 4: 목표 언어별 고화질 렌더링 (RENDER_PROFILE) + 업로드
+    """
+    try:
+        return _render_full(prev_result)
+    except Exception as e:
+        update_job_progress(prev_result["job_id"], "FAILED", 0, error=str(e))
+        raise e
+
+
+def _export_subtitles(prev_result: dict, job_id: str, language: str) -> dict:
     """
-    Creates the Celery chain
+    SUBTITLE_EXPORT_FORMATS 의 사이드카 자막을 만들어 업로드합니다. Returns {format: url}
+    가사 → LyricsTable 변환은 언어마다 한 번만 하고 모든 포맷이 공유합니다.
+    """
+    formats = [f.strip() for f in settings.SUBTITLE_EXPORT_FORMATS.split(",") if f.strip()]
+    if not formats:
+        return {}
+    table = subtitle_generator.LyricsTable.from_segments(
+        prev_result.get("lyrics", {}), language=language
+    )
+    urls = {}
+    for fmt in formats:
+        spec = subtitle_generator.FORMATS[fmt]
+        path = os.path.join(settings.TEMP_DIR, f"{job_id}_{language}.{spec['extension']}")
+        subtitle_generator.generate_subtitle(table, path, fmt)
+        urls[fmt] = upload_to_storage(path, job_id, content_type=spec["content_type"])
+    return urls
+
+
+def _render_full(prev_result: dict) -> dict:
+    job_id = prev_result["job_id"]
+    update_job_progress(
+        job_id, "PROCESSING", 90, detail="Rendering karaoke video..."
+    )
+    print(f"Rendering video for job {job_id}")
+
+    # Call Synthesis service - 목표 언어별로 하나씩 렌더링
+    # 오디오는 prepare_render_assets 에서 한 번 인코딩된 트랙을 모든 출력이 복사(mux)하여 공유
+    target_languages = prev_result.get("target_languages") or ["ko"]
+    render_input = _render_input(prev_result)  # 가사 산출물은 언어 수와 무관하게 한 번만 로드
+    outputs = {}
+    subtitles = {}
+    for language in target_languages:
+        # Upload to S3 if configured
+        outputs[language] = _render_and_upload(render_input, job_id, language)
+        try:
+            subtitles[language] = _export_subtitles(render_input, job_id, language)
+        except Exception as e:
+            # 사이드카 자막 실패는 영상 결과에 영향 없음
+            print(f"Subtitle export failed for {language}: {e}")
+
+    final_url = outputs[target_languages[0]]
+
+    metrics = prev_result.get("metrics", {})
+    submitted_at = prev_result.get("submitted_at")
+    if submitted_at:
+        metrics["time_to_full_output"] = round(time.time() - submitted_at, 3)
+        metrics.setdefault("time_to_first_output", metrics["time_to_full_output"])
+
+    # Finalize
+    result = {
+        "output_path": final_url,
+        "outputs": outputs,
+        "metrics": metrics,
+    }
+    if subtitles:
+        result["subtitles"] = subtitles
+    if prev_result.get("preview_url"):
+        result["preview_url"] = prev_result["preview_url"]
+    update_job_progress(
+        job_id,
+        "COMPLETED",
+        100,
+        result=result,
+        detail="Job completed successfully.",
+    )
+
+    return {
+        "job_id": job_id,
+        "status": "completed",
+        "output_path": final_url,
+        "outputs": outputs,
+    }
+
+
+@celery_app.task
+def collect_artifacts():
+    """
+    주기 작업 (celery beat, ARTIFACT_GC_INTERVAL): 만료된 작업 산출물 정리 + 용량 상한 적용,
+    작업에 쓰이지 않고 세션이 만료된 업로드 파일 삭제
+    """
+    stats = artifacts.collect_garbage()
+    stats["pruned_uploads"] = uploads.prune_uploads(redis_client)
+    return stats
+
+
+def create_karaoke_job(
+    job_id: str,
+    file_path: str,
+    use_mock: bool = False,
+    target_languages: list = None,
+    source_hash: str = None,
+    source_ref: str = None,
+):
+    """
+    Creates the Celery workflow (DAG)
+
+    fetch_media → process_audio ─┬─ process_lyrics → process_linguistics ─┬─ render_video ┄> render_full
+                                 └─ prepare_render_assets ─────────────────┘
+    분리 이후 가사 처리와 렌더 준비 작업은 서로 독립적이므로 chord 로 동시에 실행합니다.
+    render_video 는 미리보기를 게시한 뒤 고화질 render_full 을 낮은 우선순위로 발행합니다.
     """
     workflow = chain(
-        process_audio.s(job_id, file_path, use_mock),
-        process_lyrics.s(),
-        process_linguistics.s(),
-        render_video.s(),
+        fetch_media.s(
+            job_id,
+            file_path,
+            use_mock,
+            target_languages,
+            source_hash,
+            submitted_at=time.time(),
+            source_ref=source_ref,
+        ),
+        process_audio.s(),
+        chord(
+            [
+                chain(process_lyrics.s(), process_linguistics.s()),
+                prepare_render_assets.s(),
+            ],
+            render_video.s(),
+        ),
     )
     return workflow.apply_async()
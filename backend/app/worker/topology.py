@@ -0,0 +1,132 @@
+"""
+Celery 워커 토폴로지 (리소스별 큐 구성)
+
+각 파이프라인 단계는 자원 특성이 다르므로 큐를 분리하여 독립적으로 확장합니다.
+
+| 큐             | 작업                | 자원 특성                  | 기본 동시성 | 메모리 예산 |
+|----------------|---------------------|----------------------------|-------------|-------------|
+| download       | fetch_media         | 네트워크 (재인코딩 없음)   | 4           | 1GB         |
+| separation     | process_audio       | Demucs (GPU 또는 CPU 다수)  | 1           | 6GB         |
+| transcription  | process_lyrics      | WhisperX (GPU 또는 CPU 다수)| 4 (threads) | 8GB         |
+| linguistics    | process_linguistics | 외부 API 대기 (I/O)        | 8           | 512MB       |
+| render         | prepare_render_assets, render_video, render_full | FFmpeg 인코딩 (CPU) | 2 | 2GB |
+
+- 무거운 단계(separation, transcription)는 acks_late + prefetch 1 로 동작하여
+  워커가 죽으면 작업이 다른 워커로 재전달되고, 한 프로세스가 여러 작업을 선점하지 않습니다.
+- 메모리 예산은 prefork 워커에서는 --max-memory-per-child 로 적용되어, 예산을 넘은 자식 프로세스는
+  현재 작업을 마친 뒤 교체됩니다. threads 풀(transcription)은 WORKER_MAX_MEMORY_MB 로 적용되어,
+  넘으면 실행 중인 작업을 마친 뒤 워커가 종료되고 재시작 정책(docker-compose restart)으로 다시 뜹니다.
+- 모든 작업은 TASK_TIME_LIMIT 안에 끝나야 하며, 브로커 visibility_timeout 은 그보다 길어
+  실행 중인 acks_late 작업이 재전달되지 않습니다.
+- fetch_media 는 URL 을 받거나(다운로드 캐시 조회) 업로드 파일을 산출물 저장소에 등록만 하고,
+  디코딩은 separation 단계에서 메모리로 한 번만 수행합니다.
+- transcription 큐는 스레드 풀로 실행되어 한 프로세스의 상주 모델 하나를 여러 작업이 공유하고,
+  transcription_batcher 가 작업들의 VAD 청크를 모아 꽉 찬 배치로 전사합니다.
+- render_full(고화질 렌더)은 낮은 우선순위로 발행되어, 같은 render 큐에서
+  다른 작업의 미리보기(render_video)가 먼저 처리됩니다 (TASK_PRIORITIES).
+- 산출물 GC(collect_artifacts)는 celery beat 가 주기적으로 default 큐에 발행합니다 (download 워커가 처리).
+- GPU 워커가 있는 단계는 GPU_QUEUES 설정에 추가하면 "<queue>-gpu" 큐로 라우팅됩니다.
+
+워커 실행 예:
+    python -m app.worker.topology separation          # 실행할 celery 명령 출력
+    celery -A app.worker.celery_app worker -Q render -c 2 --prefetch-multiplier 1 ...
+"""
+
+import sys
+
+from app.core.config import settings
+
+# 큐별 워커 설정
+QUEUES = {
+    "download": {"concurrency": 4, "memory_mb": 1024, "heavy": False, "pool": "prefork"},
+    "separation": {"concurrency": 1, "memory_mb": 6144, "heavy": True, "pool": "prefork"},
+    "transcription": {"concurrency": 4, "memory_mb": 8192, "heavy": True, "pool": "threads"},
+    "linguistics": {"concurrency": 8, "memory_mb": 512, "heavy": False, "pool": "prefork"},
+    "render": {"concurrency": 2, "memory_mb": 2048, "heavy": False, "pool": "prefork"},
+}
+
+# 작업 → 큐 매핑
+TASK_QUEUES = {
+    "app.worker.tasks.fetch_media": "download",
+    "app.worker.tasks.process_audio": "separation",
+    "app.worker.tasks.process_lyrics": "transcription",
+    "app.worker.tasks.process_linguistics": "linguistics",
+    "app.worker.tasks.prepare_render_assets": "render",
+    "app.worker.tasks.render_video": "render",
+    "app.worker.tasks.render_full": "render",
+}
+
+# 작업 → 메시지 우선순위 (Redis 브로커: 0 이 가장 높음, 9 가 가장 낮음)
+TASK_PRIORITIES = {
+    "app.worker.tasks.render_full": 9,
+}
+
+
+def _gpu_queues() -> set:
+    return {q.strip() for q in settings.GPU_QUEUES.split(",") if q.strip()}
+
+
+def queue_for(queue: str) -> str:
+    """
+    GPU 워커가 배치된 단계면 "-gpu" 큐 이름을 반환합니다.
+    """
+    return f"{queue}-gpu" if queue in _gpu_queues() else queue
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery task_routes 라우터. 매핑에 없는 작업은 기본 큐로 보냅니다.
+    """
+    queue = TASK_QUEUES.get(name)
+    if queue is None:
+        return None
+    route = {"queue": queue_for(queue)}
+    if name in TASK_PRIORITIES:
+        route["priority"] = TASK_PRIORITIES[name]
+    return route
+
+
+def all_queue_names() -> list:
+    names = list(QUEUES.keys())
+    names += [f"{q}-gpu" for q in _gpu_queues() if q in QUEUES]
+    return names
+
+
+def worker_command(queue: str) -> list:
+    """
+    큐 하나를 담당하는 celery worker 실행 인자를 생성합니다.
+    """
+    base = queue[: -len("-gpu")] if queue.endswith("-gpu") else queue
+    config = QUEUES[base]
+    args = []
+    if config["pool"] != "prefork":
+        # threads 풀은 --max-memory-per-child 가 적용되지 않으므로 celery_app.enforce_worker_memory 로 제한
+        args += ["env", f"WORKER_MAX_MEMORY_MB={config['memory_mb']}"]
+    args += [
+        "celery",
+        "-A",
+        "app.worker.celery_app",
+        "worker",
+        "--loglevel=info",
+        "-Q",
+        queue,
+        "-n",
+        f"{queue}@%h",
+        "-P",
+        config["pool"],
+        "-c",
+        str(config["concurrency"]),
+        "--prefetch-multiplier",
+        "1",
+    ]
+    if config["pool"] == "prefork":
+        # --max-memory-per-child 단위는 KB (prefork 자식 프로세스에만 적용됨)
+        args += ["--max-memory-per-child", str(config["memory_mb"] * 1024)]
+    return args
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in all_queue_names():
+        print(f"Usage: python -m app.worker.topology <{'|'.join(all_queue_names())}>")
+        sys.exit(1)
+    print(" ".join(worker_command(sys.argv[1])))
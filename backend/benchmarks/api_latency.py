@@ -0,0 +1,174 @@
+"""
+API 부하 테스트: GET /api/v1/jobs/{id} 지연 시간 (p50 / p99)
+
+고정 RPS 로 요청을 예약하는 open-loop 방식입니다. 지연 시간은 "예약된 시각"부터 측정하므로
+서버가 밀려 요청이 늦게 나가도 그 대기 시간이 결과에 포함됩니다 (coordinated omission 방지).
+외부 패키지 없이 asyncio 스트림으로 HTTP/1.1 keep-alive 연결을 재사용합니다.
+
+동기 Redis 클라이언트 사용 버전(변경 전)과 asyncio 풀 버전(변경 후)의 API 서버를 각각 띄우고
+같은 옵션으로 실행하여 비교합니다:
+
+Usage (backend/ 에서 실행, API 서버와 Redis 실행 중이어야 함):
+    python -m benchmarks.api_latency [--url http://localhost:8000] [--rps 1000] [--duration 30]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from urllib.parse import urlparse
+
+from app.core import job_store
+from app.core.config import settings
+from app.core.redis import get_redis_client
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def get(self, request: bytes) -> int:
+        self.writer.write(request)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        await self.reader.readexactly(length)
+        return status
+
+
+def _seed_job() -> str:
+    """
+    벤치마크용 완료 상태 작업을 Redis 에 직접 생성합니다 (워커 실행 없음).
+    """
+    job_id = f"bench-{uuid.uuid4()}"
+    redis_client = get_redis_client()
+    job_store.create_job(
+        redis_client,
+        {
+            "id": job_id,
+            "title": "Benchmark",
+            "artist": "Benchmark",
+            "platform": "youtube",
+            "status": "PENDING",
+            "progress": 0,
+            "createdAt": datetime.now().isoformat(),
+        },
+    )
+    segments = [
+        {"start": i * 3.0, "end": i * 3.0 + 2.5, "text": f"line {i}", "translated": f"줄 {i}"}
+        for i in range(60)
+    ]
+    job_store.update_job(
+        redis_client,
+        job_id,
+        {"status": "COMPLETED", "progress": 100, "result": {"lyrics": {"segments": segments}}},
+    )
+    return job_id
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run(url: str, job_id: str, rps: float, duration: float, connections: int) -> dict:
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    request = (
+        f"GET {settings.API_V1_STR}/jobs/{job_id} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(_Connection(*await asyncio.open_connection(host, port)))
+
+    latencies = []
+    errors = 0
+
+    async def fire(scheduled: float):
+        nonlocal errors
+        conn = await pool.get()
+        try:
+            status = await conn.get(request)
+            if status != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - scheduled)
+            pool.put_nowait(conn)
+        except Exception:
+            errors += 1
+            conn.writer.close()
+            pool.put_nowait(_Connection(*await asyncio.open_connection(host, port)))
+
+    total = int(rps * duration)
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    while not pool.empty():
+        pool.get_nowait().writer.close()
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "achieved_rps": total / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p90_ms": _percentile(latencies, 90) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--job-id", default=None, help="기존 작업 ID (없으면 벤치마크용 작업 생성)")
+    parser.add_argument("--rps", type=float, default=1000)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--warmup", type=float, default=3, help="측정 전 워밍업 시간 (초)")
+    args = parser.parse_args()
+
+    job_id = args.job_id or _seed_job()
+    print(f"Target: {args.url}{settings.API_V1_STR}/jobs/{job_id}")
+    print(f"Load: {args.rps:.0f} RPS for {args.duration:.0f}s over {args.connections} connections")
+
+    if args.warmup > 0:
+        asyncio.run(run(args.url, job_id, args.rps, args.warmup, args.connections))
+
+    report = asyncio.run(run(args.url, job_id, args.rps, args.duration, args.connections))
+    print(
+        f"Requests: {report['requests']} (errors {report['errors']}), "
+        f"achieved {report['achieved_rps']:.0f} RPS"
+    )
+    print(
+        f"Latency: p50 {report['p50_ms']:.1f}ms, p90 {report['p90_ms']:.1f}ms, "
+        f"p99 {report['p99_ms']:.1f}ms, max {report['max_ms']:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
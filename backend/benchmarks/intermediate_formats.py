@@ -0,0 +1,103 @@
+"""
+중간 stem 포맷 벤치마크 (flac / npy / wav)
+
+번들된 resource/odoriko.m4a 를 디코딩해 instrumental / vocals stem (둘 다 44.1kHz stereo) 대신
+사용하고, 포맷별로 다음을 비교합니다.
+- write   : audio_io.save_stem 으로 두 stem 을 저장하는 시간과 크기
+- transfer: s3 산출물 백엔드에서 노드 간에 오가는 바이트 (stem 마다 업로드 1회 + 소비 단계 다운로드 1회)
+- decode  : 소비 단계의 읽기 시간
+            vocals → process_lyrics (audio_io.load_whisper_input, 16kHz mono 변환 포함)
+            instrumental → prepare_render_assets (ffmpeg 가 stem 을 읽어 디코딩, 인코딩 없음)
+- error   : 원본 float32 대비 최대 절대 오차 (npy 는 0, flac 24-bit 는 약 1e-7, wav 16-bit 는 약 3e-5)
+
+Usage (backend/ 에서 실행, ffmpeg 필요):
+    python -m benchmarks.intermediate_formats [audio_path] [--formats flac,npy,wav] [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services import audio_io
+
+DEFAULT_AUDIO = Path(__file__).parent.parent / "resource" / "odoriko.m4a"
+
+
+def _best(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _ffmpeg_read(path: str) -> None:
+    # prepare_audio_track 와 같은 입력 옵션으로 읽기만 수행 (출력은 버림)
+    options = audio_io.ffmpeg_input_options(path)
+    args = [arg for key, value in options.items() for arg in (f"-{key}", str(value))]
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", *args, "-i", path, "-f", "null", "-"],
+        check=True,
+    )
+
+
+def _read_vocals(path: str) -> np.ndarray:
+    audio = audio_io.load_whisper_input(path)
+    float(np.sum(audio))  # mmap 페이지를 실제로 읽도록 모든 샘플 접근
+    return audio
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio_path", nargs="?", default=str(DEFAULT_AUDIO))
+    parser.add_argument("--formats", default="flac,npy,wav")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    instrumental = audio_io.decode_audio(args.audio_path)
+    # 정수 포맷의 rescale / float WAV 대체가 비교를 흐리지 않도록 피크를 1 이하로
+    instrumental *= 0.9 / max(float(np.abs(instrumental).max()), 1e-9)
+    vocals = 0.5 * instrumental
+    duration = instrumental.shape[1] / audio_io.DEMUCS_SAMPLE_RATE
+    print(f"Input: {args.audio_path} ({duration:.1f}s)")
+
+    print(
+        f"{'format':>6} {'write s':>8} {'written MB':>10} {'transfer MB':>11} "
+        f"{'vocals read s':>13} {'inst read s':>11} {'max error':>10}"
+    )
+    work_dir = tempfile.mkdtemp(prefix="stem-formats-")
+    for fmt in args.formats.split(","):
+        fmt = fmt.strip()
+        base = os.path.join(work_dir, fmt)
+
+        def write():
+            return (
+                audio_io.save_stem(vocals, f"{base}_vocals", audio_io.DEMUCS_SAMPLE_RATE, fmt),
+                audio_io.save_stem(
+                    instrumental, f"{base}_no_vocals", audio_io.DEMUCS_SAMPLE_RATE, fmt
+                ),
+            )
+
+        write_seconds, (vocals_path, instrumental_path) = _best(write, args.repeat)
+        written = os.path.getsize(vocals_path) + os.path.getsize(instrumental_path)
+        vocals_seconds, _ = _best(lambda: _read_vocals(vocals_path), args.repeat)
+        inst_seconds, _ = _best(lambda: _ffmpeg_read(instrumental_path), args.repeat)
+        error = max(
+            float(np.abs(np.asarray(audio_io.load_stem(path))[:, : original.shape[1]] - original).max())
+            for path, original in ((vocals_path, vocals), (instrumental_path, instrumental))
+        )
+        print(
+            f"{fmt:>6} {write_seconds:>8.2f} {written / 1024**2:>10.1f} {2 * written / 1024**2:>11.1f} "
+            f"{vocals_seconds:>13.3f} {inst_seconds:>11.3f} {error:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
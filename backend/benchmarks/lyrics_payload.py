@@ -0,0 +1,82 @@
+"""
+Celery 단계 간 가사 전달 벤치마크: prev_result 에 세그먼트 dict 를 싣는 방식 vs 산출물 참조
+
+합성 가사(로마자 + 목표 언어 번역 포함)로 한 단계(hop)의 비용을 비교합니다.
+1) inline: prev_result["lyrics"] 를 JSON 으로 직렬화/역직렬화 (broker 메시지 + result backend)
+2) artifact: prev_result["lyrics_ref"] 만 JSON 으로 보내고, 필요한 단계에서 npz 를 로드
+메시지 크기, 산출물 크기, hop 당 인코딩/디코딩 시간을 출력합니다.
+
+Usage (backend/ 에서 실행, 산출물 참조 카운트용 Redis 필요):
+    python -m benchmarks.lyrics_payload [--lines 200] [--words 8] [--languages ko,en] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app.core.config import settings
+from app.services import artifacts
+from app.services.subtitle_generator import LyricsTable
+from benchmarks.subtitle_generator import _synthetic_lyrics
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--words", type=int, default=8)
+    parser.add_argument("--languages", default="ko,en")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    languages = args.languages.split(",")
+    lyrics = _synthetic_lyrics(args.lines, args.words)
+    for seg in lyrics["segments"]:
+        seg["translations"] = {lang: f"[{lang}] {seg['text']}" for lang in languages}
+        seg["translated"] = seg["translations"][languages[0]]
+    lyrics["language"] = "ja"
+
+    base = {
+        "job_id": "bench-lyrics",
+        "vocals": "/tmp/vocals.wav",
+        "instrumental": "/tmp/instrumental.wav",
+        "target_languages": languages,
+        "metrics": {},
+    }
+    settings.ARTIFACT_DIR = tempfile.mkdtemp(prefix="lyrics-artifacts-")
+    ref = artifacts.save_lyrics(base["job_id"], lyrics)
+
+    inline = {**base, "lyrics": lyrics}
+    by_ref = {**base, "lyrics_ref": ref}
+    inline_message = json.dumps(inline)
+    ref_message = json.dumps(by_ref)
+
+    inline_hop = _best(lambda: json.loads(json.dumps(inline)), args.repeat)
+    ref_hop = _best(lambda: json.loads(json.dumps(by_ref)), args.repeat)
+    # 가사가 필요한 단계(번역, 렌더)에서만 발생하는 비용
+    table_from_dict = _best(lambda: LyricsTable.from_segments(lyrics), args.repeat)
+    table_from_artifact = _best(lambda: artifacts.load_lyrics(ref), args.repeat)
+    save = _best(lambda: artifacts.save_lyrics(base["job_id"], lyrics), args.repeat)
+
+    print(f"Synthetic lyrics: {args.lines} lines x {args.words} words, languages {languages}")
+    print(f"{'':>24} {'inline':>10} {'artifact':>10}")
+    print(f"{'message size KB':>24} {len(inline_message) / 1024:>10.1f} {len(ref_message) / 1024:>10.1f}")
+    print(f"{'artifact size KB':>24} {'-':>10} {os.path.getsize(artifacts.local_path(ref)) / 1024:>10.1f}")
+    print(f"{'hop encode+decode ms':>24} {inline_hop * 1000:>10.2f} {ref_hop * 1000:>10.2f}")
+    print(f"{'LyricsTable ready ms':>24} {table_from_dict * 1000:>10.2f} {table_from_artifact * 1000:>10.2f}")
+    print(f"{'artifact save ms':>24} {'-':>10} {save * 1000:>10.2f}")
+    artifacts.release_job(base["job_id"], ttl=0)
+
+
+if __name__ == "__main__":
+    main()
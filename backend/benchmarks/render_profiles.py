@@ -0,0 +1,84 @@
+"""
+렌더 프로파일 벤치마크
+
+번들된 resource/odoriko.m4a 를 프로파일별로 렌더링하여 인코딩 속도(fps, 실시간 배율)와
+출력 크기를 비교합니다. 자막은 일정 간격의 가짜 가사로 생성합니다 (전사/번역 없음).
+
+Usage (backend/ 에서 실행, ffmpeg 필요):
+    python -m benchmarks.render_profiles [audio_path] [--profiles preview,standard,archive] [--limit 60]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.services import render_profiles, synthesis
+
+DEFAULT_AUDIO = Path(__file__).parent.parent / "resource" / "odoriko.m4a"
+
+
+def _fake_lyrics(duration: float, line_seconds: float = 4.0) -> dict:
+    segments = []
+    t = 0.0
+    index = 0
+    while t + line_seconds <= duration:
+        words = [
+            {"word": f"word{i}", "start": t + i * line_seconds / 4, "end": t + (i + 1) * line_seconds / 4}
+            for i in range(4)
+        ]
+        segments.append(
+            {
+                "start": t,
+                "end": t + line_seconds - 0.2,
+                "text": " ".join(w["word"] for w in words),
+                "words": words,
+                "romanized": f"romanized line {index}",
+                "translated": f"translated line {index}",
+            }
+        )
+        t += line_seconds
+        index += 1
+    return {"segments": segments}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio_path", nargs="?", default=str(DEFAULT_AUDIO))
+    parser.add_argument("--profiles", default=",".join(render_profiles.RENDER_PROFILES))
+    parser.add_argument("--limit", type=float, default=0, help="렌더 길이 상한 (초, 0 = 전체)")
+    args = parser.parse_args()
+
+    os.makedirs(settings.TEMP_DIR, exist_ok=True)
+    job_id = "bench-render"
+    audio_track = synthesis.prepare_audio_track(args.audio_path, job_id)
+    duration = synthesis.probe_duration(audio_track)
+    if args.limit:
+        duration = min(duration, args.limit)
+    print(f"Input: {args.audio_path} (render {duration:.1f}s)")
+
+    job_result = {
+        "job_id": job_id,
+        "instrumental": args.audio_path,
+        "audio_track": audio_track,
+        "duration": duration,
+        "lyrics": _fake_lyrics(duration),
+    }
+
+    print(f"{'profile':>10} {'resolution':>10} {'fps':>4} {'seconds':>8} {'enc fps':>8} {'x rt':>6} {'size MB':>8}")
+    for name in args.profiles.split(","):
+        profile = render_profiles.get_profile(name.strip())
+        started = time.perf_counter()
+        output_path = synthesis.render_karaoke_video(job_result, profile=profile["name"])
+        seconds = time.perf_counter() - started
+        frames = duration * profile["fps"]
+        size_mb = os.path.getsize(output_path) / 1024**2
+        print(
+            f"{profile['name']:>10} {profile['width']}x{profile['height']:<5} {profile['fps']:>4} "
+            f"{seconds:>8.2f} {frames / seconds:>8.1f} {duration / seconds:>6.1f} {size_mb:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Demucs 청크 분리 벤치마크 / 정확도 검증
+
+단일 분리와 청크 병렬 분리(overlap-add)의 소요 시간과 결과 차이(SDR)를 비교합니다.
+
+Usage (backend/ 에서 실행):
+    python -m benchmarks.separation_chunked [audio_path] [--min-sdr 30]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import torch
+
+from app.core.config import settings
+from app.services import audio_io, audio_separation
+
+DEFAULT_AUDIO = Path(__file__).parent.parent / "resource" / "odoriko.m4a"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio_path", nargs="?", default=str(DEFAULT_AUDIO))
+    parser.add_argument("--min-sdr", type=float, default=30.0)
+    args = parser.parse_args()
+
+    audio = audio_io.decode_audio(args.audio_path)
+    duration = audio.shape[-1] / audio_io.DEMUCS_SAMPLE_RATE
+    print(
+        f"Input: {args.audio_path} ({duration:.1f}s), "
+        f"chunk={settings.DEMUCS_CHUNK_SECONDS}s overlap={settings.DEMUCS_CHUNK_OVERLAP_SECONDS}s "
+        f"workers={settings.DEMUCS_CHUNK_WORKERS}"
+    )
+
+    model, load_seconds = audio_separation.get_separator_model()
+    print(f"Model load: {load_seconds:.2f}s")
+    wav = torch.from_numpy(audio)
+
+    started = time.perf_counter()
+    audio_separation.separate_tensor(wav, model, shifts=0)
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    audio_separation.separate_tensor_chunked(wav, model, model.samplerate, shifts=0)
+    chunked_seconds = time.perf_counter() - started
+
+    print(f"Single : {single_seconds:.2f}s ({duration / single_seconds:.2f}x realtime)")
+    print(f"Chunked: {chunked_seconds:.2f}s ({duration / chunked_seconds:.2f}x realtime)")
+
+    report = audio_separation.verify_chunked_separation(audio)
+    ok = True
+    for name, values in report.items():
+        print(
+            f"{name:>12}: SDR {values['sdr_db']:.1f} dB, "
+            f"max abs error {values['max_abs_error']:.5f}"
+        )
+        ok = ok and values["sdr_db"] >= args.min_sdr
+
+    if not ok:
+        raise SystemExit(f"Chunked output deviates from single-pass output (< {args.min_sdr} dB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+렌더 결과 업로드 벤치마크: 렌더 후 업로드 vs 인코딩 중 스트리밍 업로드
+
+FFmpeg 인코딩을 일정 속도로 바이트를 내보내는 가짜 인코더로 흉내 내고,
+1) 인코딩이 끝난 뒤 storage.upload_file (병렬 멀티파트)
+2) 인코딩 중 storage.StreamingMultipartUpload
+의 "인코딩 시작 → 업로드 완료" 시간을 비교합니다. 업로드된 객체의 크기도 검증합니다.
+
+대상 스토리지:
+- 기본: 설정된 R2 / S3_ENDPOINT_URL (예: docker-compose --profile minio up 후 http://localhost:9000)
+- --moto: moto 의 in-process S3 mock (pip install "moto[s3]")
+
+Usage (backend/ 에서 실행):
+    python -m benchmarks.storage_upload [--size-mb 200] [--encode-mbps 40] [--moto]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.core.config import settings
+from app.services import storage
+
+
+def _fake_encode(size: int, rate: float, block: int = 1024 * 1024):
+    """
+    rate (bytes/s) 속도로 size 바이트를 block 단위로 생성합니다.
+    """
+    started = time.perf_counter()
+    produced = 0
+    while produced < size:
+        data = os.urandom(min(block, size - produced))
+        produced += len(data)
+        delay = started + produced / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        yield data
+
+
+def _object_size(key: str) -> int:
+    response = storage.get_s3_client().head_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+    return response["ContentLength"]
+
+
+def run(size: int, rate: float) -> None:
+    client = storage.get_s3_client()
+    try:
+        client.create_bucket(Bucket=settings.R2_BUCKET_NAME)
+    except Exception:
+        pass  # 이미 존재
+
+    # 1. 인코딩 완료 후 업로드
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+        path = f.name
+    try:
+        started = time.perf_counter()
+        with open(path, "wb") as f:
+            for data in _fake_encode(size, rate):
+                f.write(data)
+        encoded = time.perf_counter() - started
+        storage.upload_file(path, "benchmarks/after_render.mp4")
+        after_render = time.perf_counter() - started
+    finally:
+        os.remove(path)
+
+    # 2. 인코딩 중 스트리밍 업로드
+    started = time.perf_counter()
+    upload = storage.StreamingMultipartUpload("benchmarks/streaming.mp4")
+    for data in _fake_encode(size, rate):
+        upload.write(data)
+    upload.complete()
+    streaming = time.perf_counter() - started
+
+    for key in ("benchmarks/after_render.mp4", "benchmarks/streaming.mp4"):
+        actual = _object_size(key)
+        assert actual == size, f"{key}: expected {size} bytes, got {actual}"
+
+    print(f"Encode only     : {encoded:.2f}s")
+    print(f"Upload after    : {after_render:.2f}s (upload tail {after_render - encoded:.2f}s)")
+    print(f"Streaming upload: {streaming:.2f}s (upload tail {streaming - encoded:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=200)
+    parser.add_argument("--encode-mbps", type=float, default=40, help="가짜 인코더 출력 속도 (MB/s)")
+    parser.add_argument("--moto", action="store_true", help="moto in-process S3 mock 사용")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024**2)
+    rate = args.encode_mbps * 1024**2
+    print(
+        f"Size {args.size_mb:.0f}MB, encoder {args.encode_mbps:.0f}MB/s, "
+        f"part {settings.S3_MULTIPART_CHUNKSIZE // 1024**2}MB x {settings.S3_MAX_CONCURRENCY}"
+    )
+
+    if args.moto:
+        from moto import mock_aws
+
+        settings.R2_ACCESS_KEY_ID = settings.R2_ACCESS_KEY_ID or "testing"
+        settings.R2_SECRET_ACCESS_KEY = settings.R2_SECRET_ACCESS_KEY or "testing"
+        settings.S3_ENDPOINT_URL = None
+        settings.S3_REGION = "us-east-1"
+        with mock_aws():
+            # mock 이 가로챌 수 있도록 기본 AWS endpoint 로 클라이언트 생성
+            storage.endpoint_url = lambda: None
+            run(size, rate)
+    else:
+        run(size, rate)
+
+
+if __name__ == "__main__":
+    main()
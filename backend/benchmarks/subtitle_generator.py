@@ -0,0 +1,130 @@
+"""
+자막 생성 벤치마크
+
+합성한 대용량 가사(기본 10,000 라인 x 8 단어, 로마자/번역 포함)로
+1) 이전 구현 (세그먼트 dict 순회 + 단어마다 문자열 += + float 나머지 연산 시각 포맷)
+2) LyricsTable 변환 + 포맷별 렌더 (ass / srt / vtt / lrc)
+의 소요 시간과 최대 메모리(tracemalloc)를 비교합니다. 파일 쓰기는 제외합니다.
+
+Usage (backend/ 에서 실행):
+    python -m benchmarks.subtitle_generator [--lines 10000] [--words 8] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.services import subtitle_generator
+
+
+def _synthetic_lyrics(lines: int, words: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    for index in range(lines):
+        start = t
+        seg_words = []
+        for i in range(words):
+            w_start = t + rng.uniform(0.0, 0.1)
+            w_end = w_start + rng.uniform(0.15, 0.5)
+            seg_words.append({"word": f"word{index}_{i}", "start": w_start, "end": w_end})
+            t = w_end
+        segments.append(
+            {
+                "start": start,
+                "end": t,
+                "text": " ".join(w["word"] for w in seg_words),
+                "words": seg_words,
+                "romanized": f"romanized line {index}",
+                "translations": {"en": f"translated line {index}"},
+            }
+        )
+        t += rng.uniform(0.2, 1.5)
+    return {"segments": segments}
+
+
+# ===== 이전 구현 (비교 기준) =====
+
+
+def _legacy_format_time(seconds: float) -> str:
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    cs = int((seconds % 1) * 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{cs:02d}"
+
+
+def _legacy_ass(lyrics_data: dict, language: str = None) -> str:
+    events = []
+    for seg in lyrics_data.get("segments", []):
+        start_time = _legacy_format_time(seg.get("start", 0))
+        end_time = _legacy_format_time(seg.get("end", 0))
+
+        karaoke_text = ""
+        current_time = seg.get("start", 0)
+        for word in seg.get("words", []):
+            w_start = word.get("start", current_time)
+            w_end = word.get("end", w_start + 0.5)
+            karaoke_text += f"{{\\k{int((w_end - w_start) * 100)}}}{word['word']} "
+            current_time = w_end
+        events.append(f"Dialogue: 0,{start_time},{end_time},Original,,0,0,0,,{karaoke_text}")
+
+        if seg.get("romanized"):
+            events.append(f"Dialogue: 0,{start_time},{end_time},Romanized,,0,0,0,,{seg['romanized']}")
+        translated = seg.get("translations", {}).get(language) if language else None
+        if translated:
+            events.append(f"Dialogue: 0,{start_time},{end_time},Translated,,0,0,0,,{translated}")
+    return subtitle_generator.ASS_HEADER + "\n".join(events)
+
+
+def _measure(fn, repeat: int) -> tuple:
+    """
+    Returns (최소 소요 시간 초, 최대 메모리 MB, 결과 크기 bytes)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = fn()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    output = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024**2, len(output) if isinstance(output, str) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lyrics = _synthetic_lyrics(args.lines, args.words)
+    print(f"Synthetic lyrics: {args.lines} lines x {args.words} words")
+
+    LyricsTable = subtitle_generator.LyricsTable
+    cases = [
+        ("legacy ass", lambda: _legacy_ass(lyrics, "en")),
+        ("table build", lambda: LyricsTable.from_segments(lyrics, "en")),
+    ]
+    table = LyricsTable.from_segments(lyrics, "en")
+    for fmt, spec in subtitle_generator.FORMATS.items():
+        cases.append((f"{fmt} (render)", lambda render=spec["render"]: render(table)))
+    cases.append(
+        (
+            "ass (build+render)",
+            lambda: subtitle_generator.render_ass(LyricsTable.from_segments(lyrics, "en")),
+        )
+    )
+
+    print(f"{'case':>20} {'best ms':>9} {'peak MB':>8} {'size KB':>8}")
+    for name, fn in cases:
+        seconds, peak_mb, size = _measure(fn, args.repeat)
+        print(f"{name:>20} {seconds * 1000:>9.1f} {peak_mb:>8.1f} {size / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
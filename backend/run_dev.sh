@@ -23,8 +23,10 @@ fi
 source venv/bin/activate
 
 # Start Celery Worker
+# 개발 환경에서는 하나의 워커가 모든 단계 큐를 처리 (운영 토폴로지는 app/worker/topology.py 참고)
 echo "Starting Celery Worker..."
-celery -A app.worker.celery_app worker --loglevel=info -Q main-queue,celery &
+celery -A app.worker.celery_app worker --loglevel=info --prefetch-multiplier 1 \
+    -Q download,separation,transcription,linguistics,render,default &
 
 # Start API Server
 echo "Starting API Server..."
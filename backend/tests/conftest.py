@@ -0,0 +1,21 @@
+import fakeredis
+import pytest
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    """
+    Lua 스크립트(EVALSHA) 까지 지원하는 인메모리 Redis (fakeredis + lupa).
+    """
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+@pytest.fixture
+def async_redis_client(redis_server):
+    # redis_client 와 같은 데이터를 보는 redis.asyncio 클라이언트
+    return fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
@@ -0,0 +1,57 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from app.services import audio_io
+
+SR = audio_io.DEMUCS_SAMPLE_RATE
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def _stem(peak: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-1, 1, (2, SR // 2)).astype(np.float32)
+    return audio * (peak / np.abs(audio).max())
+
+
+def test_npy_stem_round_trip_is_exact(tmp_path):
+    audio = _stem(peak=1.7)
+
+    path = audio_io.save_stem(audio, str(tmp_path / "vocals"), SR, fmt="npy")
+
+    assert path.endswith(".npy")
+    np.testing.assert_array_equal(audio_io.load_stem(path), audio)
+    assert audio_io.npy_duration(path) == pytest.approx(0.5)
+
+
+@needs_ffmpeg
+def test_flac_stem_keeps_level(tmp_path):
+    audio = _stem(peak=0.8)
+
+    path = audio_io.save_stem(audio, str(tmp_path / "vocals"), SR, fmt="flac")
+
+    assert path.endswith(".flac")
+    # 24-bit 양자화 오차만 허용 (피크 정규화 없음)
+    np.testing.assert_allclose(audio_io.load_stem(path), audio, atol=1e-6)
+
+
+@needs_ffmpeg
+def test_flac_stem_over_full_scale_is_stored_as_float(tmp_path):
+    audio = _stem(peak=1.7)
+
+    path = audio_io.save_stem(audio, str(tmp_path / "vocals"), SR, fmt="flac")
+
+    assert path.endswith(".wav")
+    np.testing.assert_array_equal(audio_io.load_stem(path), audio)
+
+
+@needs_ffmpeg
+def test_whisper_input_is_derived_from_full_rate_stem(tmp_path):
+    audio = _stem(peak=0.5)
+    path = audio_io.save_stem(audio, str(tmp_path / "vocals"), SR, fmt="flac")
+
+    whisper = audio_io.load_whisper_input(path)
+
+    assert whisper.ndim == 1
+    assert abs(len(whisper) - audio_io.WHISPER_SAMPLE_RATE // 2) <= 1
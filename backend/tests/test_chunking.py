@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.services import chunking
+
+SR = 1000
+
+
+class _StandInModel:
+    """
+    Demucs 대신 쓰는 결정적 모델: 입력을 그대로 vocals 로, 0.5 배를 instrumental 로 반환.
+    샘플 단위 연산이므로 청크로 나눠도 단일 분리와 결과가 같아야 합니다.
+    """
+
+    def apply(self, mix: np.ndarray) -> dict:
+        return {"vocals": mix.copy(), "instrumental": 0.5 * mix}
+
+
+def _track(seconds: float, channels: int = 2) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((channels, int(seconds * SR))).astype(np.float32)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_chunks_matches_single_pass(workers):
+    model = _StandInModel()
+    mix = _track(95.3)
+    overlap = 5 * SR
+    windows = chunking.split_windows(mix.shape[-1], 20 * SR, overlap)
+
+    chunked = chunking.run_chunks(
+        lambda start, end: model.apply(mix[:, start:end]), windows, mix.shape[-1], overlap, workers
+    )
+    single = model.apply(mix)
+
+    assert set(chunked) == {"vocals", "instrumental"}
+    for name in single:
+        assert chunked[name].shape == single[name].shape
+        np.testing.assert_allclose(chunked[name], single[name], atol=1e-5)
+
+
+def test_overlap_add_matches_run_chunks():
+    mix = _track(50)
+    overlap = 3 * SR
+    windows = chunking.split_windows(mix.shape[-1], 12 * SR, overlap)
+
+    joined = chunking.overlap_add([mix[:, s:e] for s, e in windows], windows, mix.shape[-1], overlap)
+
+    np.testing.assert_allclose(joined, mix, atol=1e-5)
+
+
+def test_crossfade_weights_sum_to_one_in_overlap():
+    num_samples, chunk, overlap = 100, 40, 10
+    total = np.zeros(num_samples, dtype=np.float32)
+    for start, end in chunking.split_windows(num_samples, chunk, overlap):
+        total[start:end] += chunking.crossfade_weights(start, end, num_samples, overlap)
+
+    np.testing.assert_allclose(total, 1.0, atol=1e-6)
+
+
+def test_split_windows_covers_track():
+    windows = chunking.split_windows(100, 40, 10)
+
+    assert windows == [(0, 40), (30, 70), (60, 100)]
+    assert chunking.split_windows(30, 40, 10) == [(0, 30)]
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(10, 10), (10, 20), (10, -1)])
+def test_split_windows_rejects_non_advancing_windows(chunk_size, overlap):
+    with pytest.raises(ValueError):
+        chunking.split_windows(100, chunk_size, overlap)
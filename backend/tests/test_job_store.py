@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.core import job_store
+
+
+def _create(redis_client, job_id: str, created: float, status: str = "PENDING") -> None:
+    job_store.create_job(
+        redis_client, {"id": job_id, "status": status, "createdAt": created, "progress": 0}
+    )
+
+
+def _all_pages(list_page, limit: int, **kwargs) -> list:
+    seen = []
+    cursor = None
+    while True:
+        jobs, cursor = list_page(limit=limit, cursor=cursor, **kwargs)
+        seen += [job["id"] for job in jobs]
+        if cursor is None:
+            return seen
+
+
+def test_list_jobs_orders_by_created_desc(redis_client):
+    now = time.time()
+    for i in range(5):
+        _create(redis_client, f"job-{i}", now - i)
+
+    jobs, cursor = job_store.list_jobs(redis_client, limit=10)
+
+    assert [job["id"] for job in jobs] == [f"job-{i}" for i in range(5)]
+    assert cursor is None
+
+
+def test_list_jobs_keeps_ties_across_page_boundary(redis_client):
+    now = time.time()
+    _create(redis_client, "newest", now)
+    # 페이지 경계(limit=3)에 같은 createdAt 의 작업 4개가 걸침
+    for job_id in ("tie-a", "tie-b", "tie-c", "tie-d"):
+        _create(redis_client, job_id, now - 10)
+    _create(redis_client, "oldest", now - 20)
+
+    seen = _all_pages(lambda **kw: job_store.list_jobs(redis_client, **kw), limit=3)
+
+    assert seen == ["newest", "tie-d", "tie-c", "tie-b", "tie-a", "oldest"]
+
+
+def test_list_jobs_async_matches_sync(redis_client, async_redis_client):
+    now = time.time()
+    for i in range(7):
+        _create(redis_client, f"job-{i}", now - (i // 3))
+
+    async def pages():
+        seen, cursor = [], None
+        while True:
+            jobs, cursor = await job_store.list_jobs_async(
+                async_redis_client, limit=2, cursor=cursor
+            )
+            seen += [job["id"] for job in jobs]
+            if cursor is None:
+                return seen
+
+    sync = _all_pages(lambda **kw: job_store.list_jobs(redis_client, **kw), limit=2)
+    assert asyncio.run(pages()) == sync
+    assert sorted(sync) == sorted(f"job-{i}" for i in range(7))
+
+
+def test_list_jobs_filters_by_status(redis_client):
+    now = time.time()
+    _create(redis_client, "a", now, status="COMPLETED")
+    _create(redis_client, "b", now - 1, status="FAILED")
+    _create(redis_client, "c", now - 2, status="COMPLETED")
+
+    jobs, _ = job_store.list_jobs(redis_client, status="COMPLETED")
+
+    assert [job["id"] for job in jobs] == ["a", "c"]
+
+
+def test_list_jobs_drops_expired_entries(redis_client):
+    now = time.time()
+    _create(redis_client, "alive", now)
+    _create(redis_client, "gone", now - 1)
+    redis_client.delete(job_store.job_key("gone"))
+
+    jobs, _ = job_store.list_jobs(redis_client)
+
+    assert [job["id"] for job in jobs] == ["alive"]
+    assert redis_client.zscore(job_store.JOBS_INDEX, "gone") is None
+
+
+def test_parse_cursor_rejects_garbage():
+    assert job_store.parse_cursor(None) is None
+    assert job_store.parse_cursor("12.5:abc") == (12.5, "abc")
+    with pytest.raises(ValueError):
+        job_store.parse_cursor("not-a-number:abc")
+
+
+def test_update_job_moves_status_index_and_publishes(redis_client):
+    created = time.time()
+    _create(redis_client, "job-1", created)
+    pubsub = redis_client.pubsub()
+    pubsub.subscribe(job_store.job_channel("job-1"))
+    pubsub.get_message(timeout=1)  # subscribe 확인 메시지
+
+    job_store.update_job(
+        redis_client, "job-1", {"status": "PROCESSING", "progress": 40, "detail": "Separating..."}
+    )
+
+    assert redis_client.zscore(job_store.status_index("PENDING"), "job-1") is None
+    assert redis_client.zscore(job_store.status_index("PROCESSING"), "job-1") == created
+    event = json.loads(pubsub.get_message(timeout=1)["data"])
+    assert event == {"id": "job-1", "status": "PROCESSING", "progress": 40, "detail": "Separating..."}
+
+
+def test_update_job_writes_only_given_fields(redis_client):
+    _create(redis_client, "job-1", time.time())
+    job_store.update_job(redis_client, "job-1", {"detail": "first"})
+
+    job_store.update_job(
+        redis_client, "job-1", {"progress": 90, "result": {"video_url": "v.mp4"}, "error": None}
+    )
+
+    job = job_store.get_job(redis_client, "job-1")
+    assert job["status"] == "PENDING"
+    assert job["detail"] == "first"
+    assert job["progress"] == 90
+    assert job["result"] == {"video_url": "v.mp4"}
+    assert "error" not in job
+
+
+def test_update_job_result_is_not_published(redis_client):
+    _create(redis_client, "job-1", time.time())
+    pubsub = redis_client.pubsub()
+    pubsub.subscribe(job_store.job_channel("job-1"))
+    pubsub.get_message(timeout=1)
+
+    job_store.update_job(
+        redis_client, "job-1", {"status": "COMPLETED", "progress": 100, "result": {"big": "x" * 1000}}
+    )
+
+    event = json.loads(pubsub.get_message(timeout=1)["data"])
+    assert "result" not in event and event["has_result"] is True
+
+
+def test_update_job_sets_retention_ttl_once(redis_client, monkeypatch):
+    monkeypatch.setattr(job_store.settings, "JOB_RETENTION_SECONDS", 100)
+    # 인덱스에만 있고 HASH 에 만료가 없는 작업 (예: rebuild_index 로 색인된 작업)
+    redis_client.hset(job_store.job_key("job-1"), mapping={"id": "job-1", "status": "PENDING"})
+
+    job_store.update_job(redis_client, "job-1", {"progress": 10})
+    assert 0 < redis_client.ttl(job_store.job_key("job-1")) <= 100
+
+    redis_client.expire(job_store.job_key("job-1"), 5)
+    job_store.update_job(redis_client, "job-1", {"progress": 20})
+    assert redis_client.ttl(job_store.job_key("job-1")) <= 5
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from app.services import result_cache
+
+
+@pytest.fixture
+def cache(tmp_path, redis_client):
+    return result_cache.ResultCache(root=str(tmp_path / "cache"), max_bytes=10_000, redis_client=redis_client)
+
+
+def _file(tmp_path, name: str, size: int) -> str:
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_make_key_is_order_independent_and_param_sensitive():
+    key = result_cache.make_key("abc", model="htdemucs", shifts=1)
+
+    assert key == result_cache.make_key("abc", shifts=1, model="htdemucs")
+    assert key != result_cache.make_key("abc", model="htdemucs", shifts=2)
+    assert key != result_cache.make_key("abd", model="htdemucs", shifts=1)
+
+
+def test_hash_audio_content_ignores_memory_layout():
+    audio = np.arange(20, dtype=np.float32).reshape(10, 2)
+
+    assert result_cache.hash_audio_content(audio.T, 44100) == result_cache.hash_audio_content(
+        np.ascontiguousarray(audio.T), 44100
+    )
+    assert result_cache.hash_audio_content(audio.T, 44100) != result_cache.hash_audio_content(
+        audio.T, 16000
+    )
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("WHISPER_MODEL", "large-v3"),
+        ("VAD_THRESHOLD_DB", -40.0),
+        ("VAD_SPLIT_SEARCH_SECONDS", 2.0),
+        ("WHISPER_BATCH_SIZE", 4),
+        ("TRANSCRIPTION_BATCHING", False),
+    ],
+)
+def test_transcription_key_changes_with_tuning(monkeypatch, name, value):
+    before = result_cache.make_key("sep", **result_cache.transcription_params())
+
+    monkeypatch.setattr(result_cache.settings, name, value)
+
+    assert result_cache.make_key("sep", **result_cache.transcription_params()) != before
+
+
+def test_transcription_key_changes_with_language():
+    assert result_cache.transcription_params() != result_cache.transcription_params("ja")
+
+
+def test_files_round_trip_and_stats(cache, tmp_path):
+    assert cache.get_files("separation", "k1") is None
+
+    stored = cache.put_files("separation", "k1", {"vocals": _file(tmp_path, "v.flac", 100)})
+    hit = cache.get_files("separation", "k1")
+
+    assert hit == stored and hit["vocals"].endswith("vocals.flac")
+    stats = cache.stats()["separation"]
+    assert stats == {"hits": 1, "misses": 1, "bytes_saved": 100}
+
+
+def test_lookup_without_record_miss_counts_once(cache):
+    cache.get_files("separation", "by-source", record_miss=False)
+    cache.get_files("separation", "by-pcm")
+
+    assert cache.stats()["separation"]["misses"] == 1
+
+
+def test_eviction_drops_lru_entry_and_its_source_keys(cache, tmp_path):
+    cache.put_files("separation", "old", {"vocals": _file(tmp_path, "a.flac", 6000)})
+    cache.put_source_key("file-hash", "old")
+
+    cache.put_files("separation", "new", {"vocals": _file(tmp_path, "b.flac", 6000)})
+
+    assert cache.get_files("separation", "old") is None
+    assert cache.get_source_key("file-hash") is None
+    assert cache.get_files("separation", "new") is not None
+    assert cache.stats()["total_bytes"] == 6000
+
+
+def test_json_entries(cache):
+    cache.put_json("transcription", "t1", {"segments": [], "language": "ja"})
+
+    assert cache.get_json("transcription", "t1") == {"segments": [], "language": "ja"}
+    assert cache.get_json("transcription", "t2") is None
@@ -0,0 +1,102 @@
+from app.core.config import settings
+from app.services import artifacts, subtitle_generator
+from app.services.subtitle_generator import LyricsTable
+
+LYRICS = {
+    "language": "en",
+    "segments": [
+        {
+            "start": 1.0,
+            "end": 3.23,
+            "text": "Hello world",
+            "words": [
+                {"word": "Hello", "start": 1.2, "end": 1.7},
+                {"word": "world", "start": 2.0, "end": 3.23},
+            ],
+            "romanized": "heh-loh",
+            "translations": {"ko": "안녕 세상"},
+        },
+        # 단어 타임스탬프가 없는 라인 → 라인 전체가 단어 하나
+        {"start": 65.5, "end": 67.0, "text": " Second line "},
+    ],
+}
+
+
+def _events(ass: str) -> list:
+    return [line for line in ass.splitlines() if line.startswith("Dialogue:")]
+
+
+def test_ass_karaoke_uses_word_durations():
+    ass = subtitle_generator.render_ass(LyricsTable.from_segments(LYRICS, language="ko"))
+
+    assert _events(ass) == [
+        "Dialogue: 0,0:00:01.00,0:00:03.23,Original,,0,0,0,,{\\k50}Hello {\\k123}world",
+        "Dialogue: 0,0:00:01.00,0:00:03.23,Romanized,,0,0,0,,heh-loh",
+        "Dialogue: 0,0:00:01.00,0:00:03.23,Translated,,0,0,0,,안녕 세상",
+        "Dialogue: 0,0:01:05.50,0:01:07.00,Original,,0,0,0,,{\\k150}Second line",
+    ]
+
+
+def test_change_times_follow_karaoke_switches():
+    times = subtitle_generator.subtitle_change_times(LYRICS)
+
+    # \k 는 세그먼트 시작부터 누적: 1.00 + 0.50, 1.50 + 1.23
+    assert times == [0.0, 1.0, 1.5, 2.73, 3.23, 65.5, 67.0]
+
+
+def test_srt_and_vtt_cues():
+    table = LyricsTable.from_segments(LYRICS, language="ko")
+
+    srt = subtitle_generator.render_srt(table)
+    vtt = subtitle_generator.render_vtt(table)
+
+    assert srt.split("\n\n")[0] == "1\n00:00:01,000 --> 00:00:03,230\nHello world\nheh-loh\n안녕 세상"
+    assert "2\n00:01:05,500 --> 00:01:07,000\nSecond line\n" in srt
+    assert vtt.startswith("WEBVTT\n")
+    assert "00:00:01.000 --> 00:00:03.230\nHello <00:00:02.000>world\nheh-loh\n안녕 세상" in vtt
+
+
+def test_lrc_lines():
+    lrc = subtitle_generator.render_lrc(LyricsTable.from_segments(LYRICS))
+
+    assert lrc == (
+        "[00:01.00]<00:01.20>Hello <00:02.00>world <00:03.23>\n"
+        "[01:05.50]<01:05.50>Second line <01:07.00>\n"
+    )
+
+
+def test_generate_subtitle_writes_each_format(tmp_path):
+    for fmt, spec in subtitle_generator.FORMATS.items():
+        path = tmp_path / f"lyrics.{spec['extension']}"
+        subtitle_generator.generate_subtitle(LYRICS, str(path), fmt)
+        assert path.read_text(encoding="utf-8")
+
+
+def test_times_round_to_nearest_centisecond():
+    table = LyricsTable.from_segments([{"start": 1.23, "end": 2.999, "text": "x"}])
+
+    assert table.seg_start.tolist() == [123]
+    assert table.seg_end.tolist() == [300]
+
+
+def test_npz_round_trip_through_artifact_store(tmp_path, monkeypatch, redis_client):
+    monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(artifacts, "_backend", artifacts.LocalBackend(str(tmp_path / "artifacts")))
+    monkeypatch.setattr(artifacts, "_redis_client", redis_client)
+    table = LyricsTable.from_segments(LYRICS)
+
+    ref = artifacts.save_lyrics("job-1", table)
+    loaded = artifacts.load_lyrics(ref)
+
+    assert artifacts.get_ref("job-1", "lyrics") == ref
+    for name in ("seg_start", "seg_end", "word_offsets", "word_start", "word_end"):
+        assert getattr(loaded, name).tolist() == getattr(table, name).tolist()
+    assert loaded.words == ["Hello", "world", "Second line"]
+    assert loaded.texts == table.texts
+    assert loaded.romanized == ["heh-loh", ""]
+    assert loaded.translations == {"ko": ["안녕 세상", ""]}
+    assert loaded.language == "en"
+    # 다른 언어 번역을 고른 자막도 원본 테이블과 같게 렌더링됨
+    assert subtitle_generator.render_ass(loaded.with_language("ko")) == subtitle_generator.render_ass(
+        table.with_language("ko")
+    )
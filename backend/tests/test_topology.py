@@ -0,0 +1,30 @@
+from app.worker import topology
+
+
+def test_prefork_workers_get_memory_limit_flag():
+    args = topology.worker_command("render")
+
+    assert args[0] == "celery"
+    assert args[args.index("--max-memory-per-child") + 1] == str(2048 * 1024)
+    assert args[args.index("-c") + 1] == "2"
+
+
+def test_thread_pool_worker_gets_memory_budget_env():
+    args = topology.worker_command("transcription")
+
+    assert args[:2] == ["env", "WORKER_MAX_MEMORY_MB=8192"]
+    assert "--max-memory-per-child" not in args
+    assert args[args.index("-P") + 1] == "threads"
+
+
+def test_route_task_priority_and_gpu_queue(monkeypatch):
+    monkeypatch.setattr(topology.settings, "GPU_QUEUES", "separation")
+
+    assert topology.route_task("app.worker.tasks.render_full", (), {}, {}) == {
+        "queue": "render",
+        "priority": 9,
+    }
+    assert topology.route_task("app.worker.tasks.process_audio", (), {}, {}) == {
+        "queue": "separation-gpu"
+    }
+    assert topology.route_task("app.worker.tasks.collect_artifacts", (), {}, {}) is None
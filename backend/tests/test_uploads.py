@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import artifacts, uploads
+
+
+@pytest.fixture
+def upload_env(tmp_path, monkeypatch, redis_client):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "ARTIFACT_BACKEND", "local")
+    monkeypatch.setattr(artifacts, "_backend", artifacts.LocalBackend(str(tmp_path / "artifacts")))
+    monkeypatch.setattr(artifacts, "_redis_client", redis_client)
+    uploads._hashers.clear()
+    yield tmp_path
+    uploads._hashers.clear()
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _upload(redis, data: bytes, parts: int = 1) -> dict:
+    async def run():
+        session = await uploads.create_upload(redis, "song.mp3", len(data))
+        step = -(-len(data) // parts)
+        for offset in range(0, len(data), step):
+            session = await uploads.append_chunk(
+                redis, session["id"], offset, _chunks(data[offset : offset + step])
+            )
+        return session
+
+    return asyncio.run(run())
+
+
+def test_append_chunk_completes_into_artifact_store(upload_env, async_redis_client, redis_client):
+    data = b"karaoke" * 1000
+
+    session = _upload(async_redis_client, data, parts=3)
+
+    assert session["status"] == "complete"
+    assert session["sha256"] == hashlib.sha256(data).hexdigest()
+    assert session["ref"] == artifacts.make_ref(session["sha256"], ".mp3")
+    with open(session["file_path"], "rb") as f:
+        assert f.read() == data
+    # 스크래치 파일/디렉터리는 저장소로 옮겨지고, 세션이 참조를 유지
+    assert not os.path.exists(session["path"])
+    assert not os.path.exists(os.path.dirname(session["path"]))
+    holder = uploads.UPLOAD_HOLDER.format(upload_id=session["id"])
+    assert artifacts.get_ref(holder, "source", redis_client) == session["ref"]
+
+
+def test_duplicate_upload_resolves_to_artifact(upload_env, async_redis_client, redis_client):
+    data = b"same song" * 500
+
+    first = _upload(async_redis_client, data)
+    second = _upload(async_redis_client, data)
+
+    assert second["ref"] == first["ref"]
+    assert second["file_path"] == first["file_path"]
+    assert not os.path.exists(second["path"])
+    assert int(redis_client.hget(artifacts.ARTIFACT_REFS, first["ref"])) == 2
+
+    # 한 업로드로 시작한 작업이 blob 을 참조해도 다른 업로드가 가리키는 파일은 그대로 남음
+    assert artifacts.attach("job-1", "original", first["ref"], redis_client)
+    assert os.path.exists(second["file_path"])
+
+
+def test_offset_mismatch_is_rejected(upload_env, async_redis_client):
+    async def run():
+        session = await uploads.create_upload(async_redis_client, "song.mp3", 10)
+        await uploads.append_chunk(async_redis_client, session["id"], 0, _chunks(b"abcd"))
+        with pytest.raises(uploads.UploadConflict) as excinfo:
+            await uploads.append_chunk(async_redis_client, session["id"], 2, _chunks(b"cdef"))
+        return excinfo.value
+
+    error = asyncio.run(run())
+
+    assert error.offset == 4
+
+
+def test_chunk_exceeding_size_keeps_received_bytes(upload_env, async_redis_client):
+    async def run():
+        session = await uploads.create_upload(async_redis_client, "song.mp3", 6)
+        with pytest.raises(uploads.UploadConflict):
+            await uploads.append_chunk(
+                async_redis_client, session["id"], 0, _chunks(b"abcd", b"efgh")
+            )
+        return await uploads.get_upload(async_redis_client, session["id"])
+
+    session = asyncio.run(run())
+
+    assert session["offset"] == 4
+    assert session["status"] == "uploading"
+
+
+def test_concurrent_writer_is_rejected(upload_env, async_redis_client):
+    async def run():
+        session = await uploads.create_upload(async_redis_client, "song.mp3", 10)
+        lock_key = uploads.UPLOAD_LOCK_KEY.format(upload_id=session["id"])
+        await async_redis_client.set(lock_key, "other-request")
+        with pytest.raises(uploads.UploadConflict):
+            await uploads.append_chunk(async_redis_client, session["id"], 0, _chunks(b"abc"))
+        return await uploads.get_upload(async_redis_client, session["id"])
+
+    assert asyncio.run(run())["offset"] == 0
+
+
+def test_resume_in_another_process_restores_hash(upload_env, async_redis_client):
+    data = bytes(range(256)) * 40
+
+    async def run():
+        session = await uploads.create_upload(async_redis_client, "song.mp3", len(data))
+        await uploads.append_chunk(async_redis_client, session["id"], 0, _chunks(data[:3000]))
+        # 다른 API 프로세스가 이어받은 경우: 메모리의 해시 상태 없음
+        uploads._hashers.clear()
+        return await uploads.append_chunk(
+            async_redis_client, session["id"], 3000, _chunks(data[3000:])
+        )
+
+    session = asyncio.run(run())
+
+    assert session["sha256"] == hashlib.sha256(data).hexdigest()
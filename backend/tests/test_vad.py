@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.services import vad
+
+SR = 16000
+
+
+def _tone(seconds: float, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_detect_speech_regions_skips_silence():
+    audio = np.concatenate([np.zeros(5 * SR, np.float32), _tone(10), np.zeros(5 * SR, np.float32)])
+
+    regions = vad.detect_speech_regions(audio, SR)
+
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert abs(start - 5) < 0.5 and abs(end - 15) < 0.5
+
+
+def test_split_long_regions_cuts_at_quietest_frame():
+    # 70초 노래, 27초와 55초 지점에 짧은 숨 (저에너지)
+    audio = _tone(70)
+    for breath in (27.0, 55.0):
+        audio[int(breath * SR) : int((breath + 0.2) * SR)] *= 0.01
+
+    chunks = vad.split_long_regions(audio, SR, [(0.0, 70.0)], max_seconds=30, search_seconds=5)
+
+    assert len(chunks) == 3
+    assert all(end - start <= 30 for start, end in chunks)
+    assert 27.0 <= chunks[0][1] <= 27.2
+    assert 55.0 <= chunks[1][1] <= 55.2
+    # 경계가 이어져 빠지거나 겹치는 구간이 없음
+    assert chunks[0][0] == 0.0 and chunks[-1][1] == 70.0
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+
+def test_split_long_regions_keeps_short_regions():
+    audio = _tone(40)
+    regions = [(1.0, 10.0), (12.0, 30.0)]
+
+    assert vad.split_long_regions(audio, SR, regions, max_seconds=30) == regions
+
+
+def test_split_long_regions_without_quiet_frame_stays_under_limit():
+    audio = _tone(100)
+
+    chunks = vad.split_long_regions(audio, SR, [(0.0, 100.0)], max_seconds=30, search_seconds=5)
+
+    assert all(0 < end - start <= 30 for start, end in chunks)
+    assert chunks[-1][1] == 100.0
+
+
+def test_compact_audio_round_trip():
+    audio = _tone(20)
+    regions = [(2.0, 5.0), (10.0, 12.0)]
+
+    compact, offsets = vad.compact_audio(audio, SR, regions)
+
+    assert len(compact) == 5 * SR
+    assert vad.to_original_time(1.0, offsets) == 3.0
+    assert vad.to_original_time(3.5, offsets) == 10.5
+    assert vad.to_original_time(3.0, offsets, is_end=True) == 5.0